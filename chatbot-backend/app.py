@@ -4,11 +4,11 @@ Servidor Flask para el chatbot de atención al cliente con IA
 """
 import os
 import json
-import re
 from datetime import datetime
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-import smtplib
+import atexit
+from time import perf_counter
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
@@ -21,11 +21,54 @@ CORS(app)  # Permitir CORS para todas las rutas
 
 # Importar el sistema de IA
 from rsc_knowledge import RSCKnowledgeBase
+from locales import DEFAULT_LOCALE, LOCALES
+from knowledge_snapshot import SnapshotWatcher, load_snapshot
 from rsc_ai import RSCAI
+from session_store import SessionConflict, SessionStore, SQLiteSessionStore
+from support_mailer import SupportMailer
+from metrics import REGISTRY, CallbackMetric, Counter, Histogram
+from rate_limiter import AdmissionController
+from contact_extractor import ContactExtractor
+from knowledge_export import KnowledgeExport
+from conversation_journal import ConversationJournal
+from conversation_context import session_context
+from request_profiler import RequestProfiler
 
-# Inicializar componentes
-knowledge_base = RSCKnowledgeBase()
-ai_system = RSCAI(knowledge_base)
+# Inicializar componentes (desde el snapshot precompilado si está configurado)
+KNOWLEDGE_SNAPSHOT = os.getenv('KNOWLEDGE_SNAPSHOT', '')
+# Modo de búsqueda: 'bm25' (por defecto) o 'tfidf' (similitud coseno, requiere NumPy)
+RETRIEVAL_MODE = os.getenv('RETRIEVAL_MODE', 'bm25').lower()
+# Estados precompilados por idioma; los idiomas que no están se construyen desde locales/
+snapshot_states = {}
+if KNOWLEDGE_SNAPSHOT and os.path.exists(KNOWLEDGE_SNAPSHOT):
+    snapshot_states = load_snapshot(KNOWLEDGE_SNAPSHOT)['states']
+knowledge_base = RSCKnowledgeBase(state=snapshot_states.get(DEFAULT_LOCALE), retrieval=RETRIEVAL_MODE)
+# Idiomas que se detectan y responden; el de la base de conocimiento (español) siempre está cargado
+CHATBOT_LOCALES = tuple(
+    code.strip() for code in os.getenv('CHATBOT_LOCALES', ','.join(LOCALES)).split(',') if code.strip() in LOCALES
+)
+ai_system = RSCAI(
+    knowledge_base,
+    cache_size=int(os.getenv('RESPONSE_CACHE_SIZE', 1024)),
+    locales=CHATBOT_LOCALES,
+    max_loaded_locales=int(os.getenv('LOCALE_MAX_LOADED', 3)),
+    locale_idle_seconds=float(os.getenv('LOCALE_IDLE_SECONDS', 600)),
+    knowledge_states=snapshot_states
+)
+snapshot_watcher = None
+if KNOWLEDGE_SNAPSHOT:
+    snapshot_watcher = SnapshotWatcher(
+        KNOWLEDGE_SNAPSHOT,
+        ai_system.swap_knowledge,
+        interval=float(os.getenv('KNOWLEDGE_RELOAD_INTERVAL', 5)),
+        content_hashes={locale: state.content_hash for locale, state in snapshot_states.items()}
+    )
+# Construir todos los idiomas al arrancar (warm_up) en lugar de con su primer mensaje;
+# por defecto cada idioma se construye cuando llega y se libera si deja de usarse
+PRELOAD_LOCALES = os.getenv('PRELOAD_LOCALES', 'false').lower() == 'true'
+contact_extractor = ContactExtractor()
+# Exportación completa del conocimiento, serializada y comprimida una vez por contenido
+knowledge_export = KnowledgeExport(knowledge_base, max_age=int(os.getenv('KNOWLEDGE_EXPORT_MAX_AGE', 60)))
 
 # Configuración de email
 EMAIL_CONFIG = {
@@ -33,121 +76,595 @@ EMAIL_CONFIG = {
     'smtp_port': int(os.getenv('SMTP_PORT', 587)),
     'email_user': os.getenv('EMAIL_USER', ''),
     'email_password': os.getenv('EMAIL_PASSWORD', ''),
-    'support_email': os.getenv('SUPPORT_EMAIL', 'support@rscchain.com')
+    'support_email': os.getenv('SUPPORT_EMAIL', 'support@rscchain.com'),
+    'use_tls': os.getenv('SMTP_USE_TLS', 'true').lower() != 'false'
 }
 
-# Almacenamiento de sesiones (en producción usar Redis o DB)
-user_sessions = {}
+# Métricas de las peticiones (expuestas en /api/chatbot/metrics)
+REQUEST_STAGE_SECONDS = Histogram(
+    'chatbot_request_stage_seconds',
+    'Duración de cada etapa de handle_message',
+    label='stage'
+)
+SESSION_STAGE_SECONDS = REQUEST_STAGE_SECONDS.labels('session')
+AI_STAGE_SECONDS = REQUEST_STAGE_SECONDS.labels('ai')
+CONTACT_STAGE_SECONDS = REQUEST_STAGE_SECONDS.labels('contact_flow')
+SUPPORT_EMAIL_STAGE_SECONDS = REQUEST_STAGE_SECONDS.labels('support_email')
+REQUEST_SECONDS = REQUEST_STAGE_SECONDS.labels('total')
+FIRST_EVENT_SECONDS = REQUEST_STAGE_SECONDS.labels('stream_first_event')
+ESCALATIONS_TOTAL = Counter('chatbot_escalations_total', 'Conversaciones escaladas a soporte humano')
+SUPPORT_REQUESTS_TOTAL = Counter(
+    'chatbot_support_requests_total',
+    'Solicitudes de soporte según el resultado de encolarlas',
+    label='result'
+)
+SESSION_CONFLICTS_TOTAL = Counter(
+    'chatbot_session_conflicts_total',
+    'Turnos repetidos porque otro worker modificó la sesión al mismo tiempo'
+)
+CallbackMetric('chatbot_sessions_live', 'Sesiones activas', lambda: len(user_sessions))
+CallbackMetric('chatbot_sessions_evicted_total', 'Sesiones descartadas por LRU',
+               lambda: user_sessions.evictions, type='counter')
+CallbackMetric('chatbot_sessions_expired_total', 'Sesiones expiradas por inactividad',
+               lambda: user_sessions.expirations, type='counter')
+CallbackMetric('chatbot_sessions_approx_bytes', 'Memoria aproximada usada por las sesiones',
+               lambda: user_sessions.approx_bytes)
+CallbackMetric('chatbot_response_cache_hits_total', 'Aciertos de la caché de respuestas',
+               lambda: ai_system.response_cache.hits, type='counter')
+CallbackMetric('chatbot_response_cache_misses_total', 'Fallos de la caché de respuestas',
+               lambda: ai_system.response_cache.misses, type='counter')
+CallbackMetric('chatbot_response_cache_entries', 'Respuestas guardadas en la caché',
+               lambda: len(ai_system.response_cache))
+CallbackMetric('chatbot_locales_loaded', 'Idiomas con su índice y tablas cargados en este proceso',
+               lambda: len(ai_system.locales.loaded()))
+CallbackMetric('chatbot_locale_evictions_total', 'Idiomas liberados por falta de uso',
+               lambda: ai_system.locales.evictions, type='counter')
+CallbackMetric('chatbot_knowledge_export_builds_total', 'Veces que se serializó la exportación del conocimiento',
+               lambda: knowledge_export.builds, type='counter')
+CallbackMetric('chatbot_knowledge_export_not_modified_total', 'Exportaciones respondidas con 304',
+               lambda: knowledge_export.not_modified, type='counter')
+CallbackMetric('chatbot_support_queue_depth', 'Correos de soporte pendientes de envío',
+               lambda: support_mailer.stats()['queue_depth'])
+
+# Máximo de mensajes aceptados por /api/chatbot/messages
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 500))
+
+# Los correos de soporte se envían en segundo plano para no bloquear la respuesta
+support_mailer = SupportMailer(EMAIL_CONFIG)
+atexit.register(support_mailer.stop)
+
+# Almacenamiento de sesiones con expiración y límites de tamaño:
+# 'memory' para un solo proceso, 'sqlite' para compartirlas entre los workers del nodo
+SESSION_LIMITS = {
+    'ttl_seconds': int(os.getenv('SESSION_TTL_SECONDS', 1800)),
+    'max_sessions': int(os.getenv('SESSION_MAX_COUNT', 10000)),
+    'max_messages': int(os.getenv('SESSION_MAX_MESSAGES', 50))
+}
+SESSION_SAVE_ATTEMPTS = 3
+SESSION_CONFLICT_RESPONSE = ({
+    'success': False,
+    'error': 'La sesión está siendo modificada por otra petición, inténtalo de nuevo'
+}, 409)
+# Control de admisión: token buckets por cliente y por sesión y un máximo de peticiones en curso
+admission = None
+if os.getenv('RATE_LIMIT_ENABLED', 'true').lower() != 'false':
+    admission = AdmissionController(
+        client_rate=float(os.getenv('RATE_LIMIT_CLIENT_RATE', 5)),
+        client_burst=float(os.getenv('RATE_LIMIT_CLIENT_BURST', 20)),
+        session_rate=float(os.getenv('RATE_LIMIT_SESSION_RATE', 1)),
+        session_burst=float(os.getenv('RATE_LIMIT_SESSION_BURST', 5)),
+        max_concurrent=int(os.getenv('MAX_CONCURRENT_REQUESTS', 64))
+    )
+# Detrás de un proxy inverso la dirección real del cliente viene en X-Forwarded-For
+TRUST_PROXY = os.getenv('TRUST_PROXY', 'false').lower() == 'true'
+ADMISSION_TOTAL = Counter(
+    'chatbot_admission_decisions_total',
+    'Decisiones del control de admisión (admitted o el motivo del rechazo)',
+    label='decision'
+)
+CallbackMetric('chatbot_requests_in_flight', 'Peticiones de chat procesándose en este proceso',
+               lambda: admission.concurrency.in_flight if admission else 0)
+
+# Perfilado bajo demanda con cProfile (opcional): sin PROFILE_TOKEN no existe y no agrega costo
+request_profiler = None
+if os.getenv('PROFILE_TOKEN'):
+    request_profiler = RequestProfiler(
+        os.getenv('PROFILE_TOKEN'),
+        sample_rate=float(os.getenv('PROFILE_SAMPLE_RATE', 0)),
+        max_profiles=int(os.getenv('PROFILE_MAX_STORED', 200)),
+        directory=os.getenv('PROFILE_DIR') or None
+    )
+    CallbackMetric('chatbot_profiled_requests_total', 'Peticiones perfiladas con cProfile',
+                   lambda: request_profiler.profiled, type='counter')
+
+# Diario de conversaciones (opcional): transcripción para auditorías escrita en lotes
+# en segundo plano; con el backend en memoria también reconstruye las sesiones al arrancar
+conversation_journal = None
+CONVERSATION_JOURNAL_PATH = os.getenv('CONVERSATION_JOURNAL_PATH', '')
+if CONVERSATION_JOURNAL_PATH:
+    conversation_journal = ConversationJournal(
+        CONVERSATION_JOURNAL_PATH,
+        flush_interval=float(os.getenv('CONVERSATION_JOURNAL_FLUSH_INTERVAL', 0.5)),
+        batch_size=int(os.getenv('CONVERSATION_JOURNAL_BATCH_SIZE', 500))
+    )
+    atexit.register(conversation_journal.stop)
+    CallbackMetric('chatbot_journal_pending', 'Registros del diario esperando ser escritos',
+                   lambda: len(conversation_journal))
+    CallbackMetric('chatbot_journal_dropped_total', 'Registros del diario descartados por cola llena',
+                   lambda: conversation_journal.dropped, type='counter')
+
+if os.getenv('SESSION_BACKEND', 'memory').lower() == 'sqlite':
+    user_sessions = SQLiteSessionStore(os.getenv('SESSION_DB_PATH', 'sessions.db'),
+                                       journal=conversation_journal, **SESSION_LIMITS)
+else:
+    user_sessions = SessionStore(journal=conversation_journal, **SESSION_LIMITS)
+    if conversation_journal is not None:
+        restored = conversation_journal.load_sessions(
+            SESSION_LIMITS['ttl_seconds'], SESSION_LIMITS['max_sessions'], SESSION_LIMITS['max_messages']
+        )
+        for saved in restored:
+            user_sessions.restore(*saved)
+        if restored:
+            print(f"📼 {len(restored)} sesiones reconstruidas desde el diario de conversaciones")
+
+
+# Mensajes de ejemplo con los que warm_up() recorre el pipeline completo. Todos en
+# el idioma por defecto: los demás idiomas se cargan en cada worker cuando llegan
+WARM_UP_MESSAGES = (
+    'hola',
+    '¿cómo empiezo a minar?',
+    'no puedo iniciar la minería',
+    'mi wallet muestra un balance incorrecto',
+    'cómo hago staking',
+    '¿cómo funciona el trading p2p?',
+    'tengo un problema'
+)
+
+
+def warm_up():
+    """
+    Construye todo lo que se arma la primera vez que se usa (modelos de los
+    idiomas, índice TF-IDF, exportación del conocimiento, respuestas frecuentes
+    en la caché, series de métricas) para que los workers creados con fork lo
+    hereden ya listo. Al terminar pone a cero los contadores e histogramas y los
+    aciertos de la caché: /metrics solo cuenta el tráfico de los clientes
+    """
+    started = perf_counter()
+    if PRELOAD_LOCALES:
+        ai_system.preload_locales()
+    ai_system.process_messages(list(WARM_UP_MESSAGES))
+    for message in WARM_UP_MESSAGES:
+        ai_system.process_message(message)
+    knowledge_export.payload()
+    contact_extractor.extract('usuario: rsc_user rsc@example.com')
+    REGISTRY.render()
+    REGISTRY.reset()
+    ai_system.response_cache.reset_stats()
+    return perf_counter() - started
+
+
+@app.before_request
+def start_background_tasks():
+    """Arranca la vigilancia del snapshot en el proceso que atiende la petición"""
+    if snapshot_watcher is not None:
+        snapshot_watcher.ensure_started()
 
 
 @app.route('/api/chatbot/message', methods=['POST'])
 def handle_message():
     """Endpoint principal para recibir mensajes del chat"""
+    data = request.get_json(silent=True)
+    # Una petición inválida se rechaza sin gastar cupo de admisión
+    error = validate_chat_request(data)
+    if error is not None:
+        return jsonify(error[0]), error[1]
+    rejection = admit_request(client_address(request.remote_addr, request.headers), data)
+    if rejection is not None:
+        payload, status, headers = rejection
+        return jsonify(payload), status, headers
+    try:
+        payload, status, profile_id = run_chat_message(request.headers, data)
+    finally:
+        release_request()
+    return jsonify(payload), status, profile_headers(profile_id)
+
+
+def run_chat_message(headers, data):
+    """process_chat_message, con cProfile si la petición toca; devuelve (respuesta, estado, id del perfil o None)"""
+    if request_profiler is None:
+        payload, status = process_chat_message(data)
+        return payload, status, None
+    (payload, status), profile_id = request_profiler.call(headers, process_chat_message, data)
+    return payload, status, profile_id
+
+
+def profile_headers(profile_id):
+    """Encabezado con el id del perfil de la petición, si se perfiló"""
+    return {'X-Profile-Id': profile_id} if profile_id else {}
+
+
+def client_address(remote_addr, headers):
+    """Dirección del cliente; con TRUST_PROXY se toma la primera de X-Forwarded-For"""
+    if TRUST_PROXY:
+        forwarded_for = headers.get('X-Forwarded-For', '')
+        if forwarded_for:
+            return forwarded_for.split(',')[0].strip()
+    return remote_addr or 'unknown'
+
+
+def admit_request(client, data, cost=1):
+    """
+    Aplica el control de admisión antes de tocar sesiones o IA
+    
+    cost: mensajes de la petición (los lotes cuestan uno por mensaje)
+    
+    Returns:
+        None si la petición se admite (hay que llamar a release_request al
+        terminar) o (respuesta, 429, encabezados) si se rechaza
+    """
+    if admission is None:
+        return None
+    # Sin session_id explícito no hay bucket de sesión: todos compartirían 'default'
+    session_id = data.get('session_id') if isinstance(data, dict) else None
+    decision = admission.admit(client, session_id, cost)
+    ADMISSION_TOTAL.inc(label_value=decision.reason)
+    if decision.allowed:
+        return None
+    return {
+        'success': False,
+        'error': 'Demasiadas solicitudes, inténtalo de nuevo en unos segundos',
+        'retry_after': decision.retry_after
+    }, 429, {'Retry-After': str(decision.retry_after)}
+
+
+def release_request():
+    if admission is not None:
+        admission.release()
+
+
+def process_chat_message(data):
+    """
+    Procesa un mensaje del chat, independiente del servidor web
+
+    Returns:
+        tuple: (dict con la respuesta JSON, código de estado HTTP)
+    """
+    request_started = perf_counter()
     try:
-        data = request.json
         message = data.get('message', '').strip()
         session_id = data.get('session_id', 'default')
         user_email = data.get('user_email', '')
         username = data.get('username', '')
         
         if not message:
-            return jsonify({
+            return {
                 'success': False,
                 'error': 'Mensaje vacío'
-            }), 400
-        
-        # Inicializar sesión si no existe
-        if session_id not in user_sessions:
-            user_sessions[session_id] = {
-                'messages': [],
-                'requires_contact_info': False,
-                'contact_attempts': 0,
-                'email': user_email,
-                'username': username
-            }
+            }, 400
         
-        session = user_sessions[session_id]
+        # Si otro worker guardó la misma sesión entre la lectura y la escritura, se repite el turno
+        for attempt in range(SESSION_SAVE_ATTEMPTS):
+            try:
+                for event, value in _chat_turn(session_id, message, user_email, username):
+                    if event == 'result':
+                        return value
+            except SessionConflict:
+                SESSION_CONFLICTS_TOTAL.inc()
+        return SESSION_CONFLICT_RESPONSE
         
-        # Agregar mensaje del usuario
-        session['messages'].append({
-            'role': 'user',
-            'content': message,
-            'timestamp': datetime.now().isoformat()
-        })
+    except Exception as e:
+        print(f"Error en process_chat_message: {str(e)}")
+        return {
+            'success': False,
+            'error': f'Error procesando mensaje: {str(e)}'
+        }, 500
+    finally:
+        REQUEST_SECONDS.observe(perf_counter() - request_started)
+
+
+@app.route('/api/chatbot/message/stream', methods=['POST'])
+def handle_message_stream():
+    """Variante de /api/chatbot/message que envía la respuesta como Server-Sent Events"""
+    data = request.get_json(silent=True)
+    error = validate_chat_request(data)
+    if error is not None:
+        return jsonify(error[0]), error[1]
+    rejection = admit_request(client_address(request.remote_addr, request.headers), data)
+    if rejection is not None:
+        payload, status, headers = rejection
+        return jsonify(payload), status, headers
+    events = stream_chat_events(data)
+    # Si el cliente se desconecta, Werkzeug cierra el generador y el turno deja de enviarse
+    response = Response(
+        stream_with_context(format_sse(event, payload) for event, payload in events),
+        mimetype='text/event-stream',
+        headers=STREAM_HEADERS
+    )
+    # El lugar de concurrencia se libera cuando termina el envío, no al devolver la respuesta
+    response.call_on_close(release_request)
+    return response
+
+
+STREAM_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no'  # que nginx no acumule la respuesta
+}
+
+
+def validate_chat_request(data):
+    """Devuelve (respuesta, estado) si la petición no es válida, o None"""
+    message = data.get('message') if isinstance(data, dict) else None
+    if not isinstance(message, str) or not message.strip():
+        return {
+            'success': False,
+            'error': 'Mensaje vacío'
+        }, 400
+    # El session_id es la clave del bucket de sesión y del almacén de sesiones
+    if not isinstance(data.get('session_id', ''), (str, type(None))):
+        return {
+            'success': False,
+            'error': 'session_id inválido'
+        }, 400
+    return None
+
+
+def format_sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+def split_chunks(text):
+    """Divide una respuesta en párrafos, conservando los saltos de línea entre ellos"""
+    paragraphs = text.split('\n\n')
+    return [paragraph + '\n\n' for paragraph in paragraphs[:-1]] + [paragraphs[-1]]
+
+
+def stream_chat_events(data):
+    """
+    Procesa un mensaje del chat como una secuencia de eventos (nombre, datos)
+    
+    - 'meta': en cuanto se clasifica el mensaje (session_id, intent, category, locale)
+    - 'chunk': la respuesta por párrafos ({'text': ...})
+    - 'done': el resto de la respuesta de /api/chatbot/message, sin 'message'
+    
+    Solo 'meta' se adelanta: la respuesta se genera completa (no se produce
+    por partes) y la sesión se guarda antes del primer 'chunk', que es un
+    párrafo del texto ya terminado. Si el cliente cancela mientras recibe la
+    respuesta, la conversación ya quedó registrada.
+    """
+    request_started = perf_counter()
+    session_id = data.get('session_id', 'default')
+    
+    try:
+        message = data.get('message', '').strip()
+        user_email = data.get('user_email', '')
+        username = data.get('username', '')
+        result = None
+        sent_meta = False
+        for attempt in range(SESSION_SAVE_ATTEMPTS):
+            try:
+                for event, value in _chat_turn(session_id, message, user_email, username):
+                    if event == 'classified' and not sent_meta:
+                        sent_meta = True
+                        FIRST_EVENT_SECONDS.observe(perf_counter() - request_started)
+                        yield 'meta', {
+                            'session_id': session_id,
+                            'intent': value.intent,
+                            'category': value.category,
+                            'locale': value.locale
+                        }
+                    elif event == 'result':
+                        result = value
+                break
+            except SessionConflict:
+                SESSION_CONFLICTS_TOTAL.inc()
+        payload, status = result if result is not None else SESSION_CONFLICT_RESPONSE
+        payload = dict(payload)
         
-        # Verificar si necesita información de contacto
-        if session.get('requires_contact_info'):
-            return handle_contact_info_request(session, message, session_id)
+        if not sent_meta:
+            FIRST_EVENT_SECONDS.observe(perf_counter() - request_started)
+            yield 'meta', {'session_id': session_id, 'intent': None, 'category': None, 'locale': None}
+        text = payload.pop('message', '')
+        if text:
+            for chunk in split_chunks(text):
+                yield 'chunk', {'text': chunk}
+        payload['status'] = status
+        yield 'done', payload
+    except Exception as e:
+        print(f"Error en stream_chat_events: {str(e)}")
+        yield 'error', {
+            'success': False,
+            'error': f'Error procesando mensaje: {str(e)}'
+        }
+    finally:
+        REQUEST_SECONDS.observe(perf_counter() - request_started)
+
+
+def _chat_turn(session_id, message, user_email, username):
+    """
+    Un turno completo de conversación: lee la sesión, responde y la guarda una sola vez
+    
+    Es un generador para que el endpoint de streaming pueda avisar apenas se
+    clasifica el mensaje: produce ('classified', Classification) y termina
+    con ('result', (respuesta, estado)).
+    """
+    # Obtener la sesión (se crea si no existe o si expiró)
+    started = perf_counter()
+    session = user_sessions.get_or_create(session_id, email=user_email, username=username)
+    
+    # Agregar mensaje del usuario
+    user_sessions.append_message(session_id, session, 'user', message)
+    SESSION_STAGE_SECONDS.observe(perf_counter() - started)
+    
+    # Verificar si necesita información de contacto
+    if session.get('requires_contact_info'):
+        started = perf_counter()
+        try:
+            result = handle_contact_info_request(session_id, session, message)
+        finally:
+            CONTACT_STAGE_SECONDS.observe(perf_counter() - started)
+        _save_session(session_id, session)
+        yield 'result', result
+        return
+    
+    # Procesar con IA; el contexto de la conversación se actualiza en el mismo turno
+    started = perf_counter()
+    context = session_context(session)
+    message_lower, classification = ai_system.classify_message(message, context)
+    yield 'classified', classification
+    response = ai_system.respond(message, message_lower, classification, session['messages'], context)
+    AI_STAGE_SECONDS.observe(perf_counter() - started)
+    
+    # Verificar si la respuesta indica que necesita escalar
+    if response.get('needs_escalation', False):
+        session['requires_contact_info'] = True
+        session['contact_attempts'] = 0
+        session['issue_description'] = message
+        _save_session(session_id, session)
+        ESCALATIONS_TOTAL.inc()
         
-        # Procesar con IA
-        response = ai_system.process_message(
-            message, 
-            session['messages'],
-            user_email,
-            username
-        )
+        yield 'result', ({
+            'success': True,
+            'message': response['message'],
+            'needs_contact_info': True,
+            'session_id': session_id
+        }, 200)
+        return
+    
+    # Agregar respuesta del bot
+    user_sessions.append_message(session_id, session, 'assistant', response['message'])
+    _save_session(session_id, session)
+    
+    yield 'result', ({
+        'success': True,
+        'message': response['message'],
+        'session_id': session_id
+    }, 200)
+
+
+def _save_session(session_id, session):
+    started = perf_counter()
+    user_sessions.save(session_id, session)
+    SESSION_STAGE_SECONDS.observe(perf_counter() - started)
+
+
+@app.route('/api/chatbot/messages', methods=['POST'])
+def handle_message_batch():
+    """Procesa un lote de mensajes sin estado (triage e integraciones)"""
+    batch, error = parse_message_batch(request.get_json(silent=True))
+    if error is not None:
+        return jsonify(error[0]), error[1]
+    rejection = admit_request(client_address(request.remote_addr, request.headers), None, batch_cost(batch))
+    if rejection is not None:
+        payload, status, headers = rejection
+        return jsonify(payload), status, headers
+    try:
+        payload, status = process_message_batch(batch)
+    finally:
+        release_request()
+    return jsonify(payload), status
+
+
+def parse_message_batch(data):
+    """
+    Valida el cuerpo de /api/chatbot/messages antes de admitir la petición
+    
+    Returns:
+        tuple: ((ids, mensajes), None) o (None, (respuesta, estado)) si no es válido
+    """
+    items = data.get('messages') if isinstance(data, dict) else None
+    
+    if not isinstance(items, list) or not items:
+        return None, ({
+            'success': False,
+            'error': 'Se requiere una lista de mensajes'
+        }, 400)
+    
+    if len(items) > MAX_BATCH_SIZE:
+        return None, ({
+            'success': False,
+            'error': f'El lote supera el máximo de {MAX_BATCH_SIZE} mensajes'
+        }, 400)
+    
+    # Cada elemento puede ser un texto o un objeto {"id": ..., "message": ...}
+    ids = []
+    messages = []
+    for position, item in enumerate(items):
+        if isinstance(item, dict):
+            ids.append(item.get('id', position))
+            messages.append(str(item.get('message', '')).strip())
+        else:
+            ids.append(position)
+            messages.append(str(item).strip())
+    return (ids, messages), None
+
+
+def batch_cost(batch):
+    """Cupo de admisión de un lote: uno por mensaje no vacío (al menos uno)"""
+    return max(1, sum(1 for message in batch[1] if message))
+
+
+def process_message_batch(batch):
+    """Procesa un lote ya validado por parse_message_batch; devuelve (respuesta, estado)"""
+    try:
+        ids, messages = batch
+        valid = [message for message in messages if message]
+        answers = iter(ai_system.process_messages(valid))
         
-        # Verificar si la respuesta indica que necesita escalar
-        if response.get('needs_escalation', False):
-            session['requires_contact_info'] = True
-            session['contact_attempts'] = 0
-            session['issue_description'] = message
-            
-            return jsonify({
+        results = []
+        for item_id, message in zip(ids, messages):
+            if not message:
+                results.append({
+                    'id': item_id,
+                    'success': False,
+                    'error': 'Mensaje vacío'
+                })
+                continue
+            answer = next(answers)
+            results.append({
+                'id': item_id,
                 'success': True,
-                'message': response['message'],
-                'needs_contact_info': True,
-                'session_id': session_id
+                'message': answer['message'],
+                'confidence': answer['confidence'],
+                'needs_escalation': answer['needs_escalation'],
+                'intent': answer['intent'],
+                'category': answer['category'],
+                'locale': answer['locale']
             })
         
-        # Agregar respuesta del bot
-        session['messages'].append({
-            'role': 'assistant',
-            'content': response['message'],
-            'timestamp': datetime.now().isoformat()
-        })
-        
-        return jsonify({
+        return {
             'success': True,
-            'message': response['message'],
-            'session_id': session_id
-        })
+            'results': results
+        }, 200
         
     except Exception as e:
-        print(f"Error en handle_message: {str(e)}")
-        return jsonify({
+        print(f"Error en process_message_batch: {str(e)}")
+        return {
             'success': False,
-            'error': f'Error procesando mensaje: {str(e)}'
-        }), 500
+            'error': f'Error procesando lote: {str(e)}'
+        }, 500
 
 
-def handle_contact_info_request(session, message, session_id):
-    """Maneja la recopilación de información de contacto"""
+def handle_contact_info_request(session_id, session, message):
+    """Maneja la recopilación de información de contacto; devuelve (respuesta, estado)"""
     session['contact_attempts'] += 1
     
-    # Extraer email si está en el mensaje
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    emails = re.findall(email_pattern, message)
+    # Extraer email, username ("usuario:", "nombre:" o "username:") y wallet en una pasada
+    contact = contact_extractor.extract(message)
     
-    if emails:
-        session['email'] = emails[0]
+    if contact.emails:
+        session['email'] = contact.emails[0]
     
-    # Buscar username (palabras antes de @email o después de "usuario:" o "nombre:")
-    username_patterns = [
-        r'usuario[:\s]+([A-Za-z0-9_]+)',
-        r'nombre[:\s]+([A-Za-z0-9_\s]+)',
-        r'username[:\s]+([A-Za-z0-9_]+)'
-    ]
+    if contact.usernames and not session.get('username'):
+        session['username'] = contact.usernames[0]
     
-    username = session.get('username', '')
-    for pattern in username_patterns:
-        matches = re.findall(pattern, message, re.IGNORECASE)
-        if matches:
-            username = matches[0].strip()
-            break
+    if contact.wallets and not session.get('wallet'):
+        session['wallet'] = contact.wallets[0]
+    elif not session.get('wallet') and 'wallet' in session_context(session).entities:
+        # La wallet que el usuario ya había mencionado al describir el problema
+        session['wallet'] = session_context(session).entities['wallet']
     
-    if username and not session.get('username'):
-        session['username'] = username
+    # Las respuestas del flujo siguen en el idioma en que se reportó el problema
+    locale = session_context(session).locale
     
     # Verificar si tenemos toda la información
     has_email = bool(session.get('email'))
@@ -156,47 +673,51 @@ def handle_contact_info_request(session, message, session_id):
     if has_email and has_username:
         # Enviar email al soporte
         issue = session.get('issue_description', 'Problema no especificado')
+        started = perf_counter()
         success = send_support_email(
             session['email'],
             session['username'],
             issue,
-            session['messages']
+            session['messages'],
+            wallet=session.get('wallet', '')
         )
+        SUPPORT_EMAIL_STAGE_SECONDS.observe(perf_counter() - started)
+        SUPPORT_REQUESTS_TOTAL.inc(label_value='queued' if success else 'failed')
         
         if success:
             session['requires_contact_info'] = False
-            return jsonify({
+            return {
                 'success': True,
-                'message': '✅ Perfecto! He recibido tu información. Nuestro equipo de soporte se pondrá en contacto contigo pronto a través de tu email.',
+                'message': ai_system.contact_message('received', locale),
                 'session_id': session_id
-            })
+            }, 200
         else:
-            return jsonify({
+            return {
                 'success': False,
-                'message': '⚠️ Hubo un problema al enviar tu solicitud. Por favor, inténtalo de nuevo o contacta directamente a support@rscchain.com',
+                'message': ai_system.contact_message('failed', locale),
                 'session_id': session_id
-            })
+            }, 200
     
     # Solicitar información faltante
     if not has_email:
-        return jsonify({
+        return {
             'success': True,
-            'message': '📧 Por favor, comparte tu dirección de email para que nuestro equipo pueda contactarte.',
+            'message': ai_system.contact_message('ask_email', locale),
             'needs_contact_info': True,
             'session_id': session_id
-        })
+        }, 200
     
     if not has_username:
-        return jsonify({
+        return {
             'success': True,
-            'message': '👤 Por favor, comparte tu nombre de usuario en RSC Chain.',
+            'message': ai_system.contact_message('ask_username', locale),
             'needs_contact_info': True,
             'session_id': session_id
-        })
+        }, 200
 
 
-def send_support_email(user_email, username, issue, conversation_history):
-    """Envía email al equipo de soporte con la información del usuario"""
+def send_support_email(user_email, username, issue, conversation_history, wallet=''):
+    """Encola el email al equipo de soporte con la información del usuario"""
     try:
         if not EMAIL_CONFIG['email_user'] or not EMAIL_CONFIG['email_password']:
             print("⚠️ Configuración de email no disponible")
@@ -208,11 +729,8 @@ def send_support_email(user_email, username, issue, conversation_history):
         msg['To'] = EMAIL_CONFIG['support_email']
         msg['Subject'] = f'[RSC Chain Support] Nueva solicitud de: {username}'
         
-        # Formatear historial de conversación
-        conversation_text = "\n".join([
-            f"[{m.get('timestamp', 'N/A')}] {m.get('role', 'unknown').upper()}: {m.get('content', '')}"
-            for m in conversation_history[-10:]  # Últimos 10 mensajes
-        ])
+        # Formatear historial de conversación (últimos 10 mensajes)
+        conversation_text = conversation_history.format_transcript(10)
         
         body = f"""
         Nueva solicitud de soporte desde el chatbot RSC Chain
@@ -222,6 +740,7 @@ def send_support_email(user_email, username, issue, conversation_history):
         ==========================================
         Email: {user_email}
         Usuario: {username}
+        Wallet: {wallet or 'N/A'}
         Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         
         ==========================================
@@ -244,39 +763,109 @@ def send_support_email(user_email, username, issue, conversation_history):
         
         msg.attach(MIMEText(body, 'plain'))
         
-        # Enviar email
-        server = smtplib.SMTP(EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port'])
-        server.starttls()
-        server.login(EMAIL_CONFIG['email_user'], EMAIL_CONFIG['email_password'])
-        server.send_message(msg)
-        server.quit()
+        # Encolar email; el hilo de envío lo entrega por la conexión SMTP abierta
+        if not support_mailer.enqueue(msg):
+            print(f"⚠️ Cola de emails llena, no se pudo encolar la solicitud de: {user_email}")
+            return False
         
-        print(f"✅ Email enviado al soporte para: {user_email}")
+        print(f"📨 Email de soporte encolado para: {user_email}")
         return True
         
     except Exception as e:
-        print(f"❌ Error enviando email: {str(e)}")
+        print(f"❌ Error preparando email: {str(e)}")
         return False
 
 
 @app.route('/api/chatbot/health', methods=['GET'])
 def health_check():
     """Endpoint de salud del servicio"""
-    return jsonify({
+    return jsonify(health_payload())
+
+
+def health_payload():
+    """Estado del servicio y contadores de sus componentes"""
+    return {
         'status': 'healthy',
         'service': 'RSC Chain Chatbot',
+        'sessions': user_sessions.stats(),
+        'support_mailer': support_mailer.stats(),
+        'response_cache': ai_system.response_cache.stats(),
+        'knowledge_version': knowledge_base.version,
+        'locales': ai_system.locale_stats(),
+        'knowledge_snapshot': snapshot_watcher.stats() if snapshot_watcher else None,
+        'knowledge_export': knowledge_export.stats(),
+        'conversation_journal': conversation_journal.stats() if conversation_journal else None,
+        'admission': admission.stats() if admission else None,
+        'request_profiler': request_profiler.stats() if request_profiler else None,
         'timestamp': datetime.now().isoformat()
-    })
+    }
 
 
 @app.route('/api/chatbot/knowledge', methods=['GET'])
 def get_knowledge_stats():
     """Endpoint para obtener estadísticas de la base de conocimiento"""
-    return jsonify({
+    return jsonify(knowledge_stats_payload())
+
+
+def knowledge_stats_payload():
+    """Resumen de los temas de la base de conocimiento"""
+    return {
         'total_topics': len(knowledge_base.knowledge_base),
         'categories': list(knowledge_base.knowledge_base.keys()),
         'timestamp': datetime.now().isoformat()
-    })
+    }
+
+
+@app.route('/api/chatbot/knowledge/export', methods=['GET'])
+def export_knowledge():
+    """Base de conocimiento completa (para mostrarla sin conexión), con ETag y gzip"""
+    status, headers, body = knowledge_export.respond(
+        request.headers.get('If-None-Match'),
+        request.headers.get('Accept-Encoding')
+    )
+    return Response(body, status=status, headers=headers)
+
+
+@app.route('/api/chatbot/admin/profiles', methods=['GET'])
+@app.route('/api/chatbot/admin/profiles/<request_id>', methods=['GET'])
+def get_profiles(request_id=None):
+    """Funciones más costosas de las peticiones perfiladas (requiere X-Profile-Token)"""
+    payload, status = profiles_payload(request.headers, request.args, request_id)
+    return jsonify(payload), status
+
+
+def profiles_payload(headers, params, request_id=None):
+    """
+    Perfiles guardados en este proceso: las funciones más costosas agregadas o
+    de una petición (?sort=tottime|cumtime|calls&limit=30)
+
+    Returns:
+        tuple: (dict con la respuesta JSON, código de estado HTTP); 404 si el
+        perfilado está desactivado o el token no coincide
+    """
+    if request_profiler is None or not request_profiler.authorized(headers):
+        return {'success': False, 'error': 'No encontrado'}, 404
+    try:
+        limit = min(max(int(params.get('limit', 30)), 1), 500)
+    except ValueError:
+        limit = 30
+    sort = params.get('sort', 'tottime')
+    functions = request_profiler.hot_functions(request_id, sort, limit)
+    if functions is None:
+        return {'success': False, 'error': 'Perfil no encontrado'}, 404
+    payload = {'success': True, 'sort': sort, 'functions': functions}
+    if request_id is None:
+        payload['profiles'] = request_profiler.profiles()
+    else:
+        record = request_profiler.get(request_id)
+        payload.update(request_id=request_id, elapsed_ms=round(record.elapsed_ms, 3), message=record.message)
+    return payload, 200
+
+
+@app.route('/api/chatbot/metrics', methods=['GET'])
+def get_metrics():
+    """Métricas en formato de texto de Prometheus"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,219 @@
+"""
+Servidor asíncrono para el chatbot de RSC Chain
+Atiende los mismos endpoints JSON que app.py sobre asyncio (aiohttp), de modo
+que miles de conexiones de chat abiertas caben en pocos procesos
+
+Uso:
+    python async_server.py --port 5000
+
+El pipeline de IA corre directamente en el event loop porque es CPU ligero
+(microsegundos por mensaje). El envío SMTP nunca bloquea el loop: los correos
+de soporte solo se encolan y los entrega el hilo de support_mailer. Las
+operaciones bloqueantes deben pasar por run_blocking() para no frenar el loop;
+también los mensajes en un idioma cuyo modelo todavía no está construido.
+"""
+import argparse
+import asyncio
+import functools
+import os
+
+from aiohttp import web
+
+import app as chatbot
+
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type'
+}
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Ejecuta una función bloqueante en el pool de hilos sin detener el event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+@web.middleware
+async def cors_middleware(request, handler):
+    # Mismo comportamiento que CORS(app) en la versión Flask: cualquier origen
+    if request.method == 'OPTIONS':
+        return web.Response(status=204, headers=CORS_HEADERS)
+    response = await handler(request)
+    response.headers.update(CORS_HEADERS)
+    return response
+
+
+async def read_json(request):
+    """Lee el cuerpo JSON; devuelve None si no es JSON válido (igual que get_json(silent=True))"""
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+def needs_pool(*messages):
+    """
+    Indica si el turno tiene que correr en el pool de hilos: las sesiones viven
+    en disco o hay que construir el idioma de algún mensaje (15-60 ms)
+    """
+    if chatbot.user_sessions.blocking:
+        return True
+    return not all(chatbot.ai_system.locale_loaded(message) for message in messages if message)
+
+
+def admit(request, data, cost=1):
+    """Control de admisión; devuelve la respuesta 429 o None si se admite"""
+    rejection = chatbot.admit_request(chatbot.client_address(request.remote, request.headers), data, cost)
+    if rejection is None:
+        return None
+    payload, status, headers = rejection
+    return web.json_response(payload, status=status, headers=headers)
+
+
+async def handle_message(request):
+    data = await read_json(request)
+    error = chatbot.validate_chat_request(data)
+    if error is not None:
+        return web.json_response(error[0], status=error[1])
+    rejection = admit(request, data)
+    if rejection is not None:
+        return rejection
+    try:
+        if needs_pool(data['message']):
+            payload, status, profile_id = await run_blocking(chatbot.run_chat_message, request.headers, data)
+        else:
+            payload, status, profile_id = chatbot.run_chat_message(request.headers, data)
+    finally:
+        chatbot.release_request()
+    return web.json_response(payload, status=status, headers=chatbot.profile_headers(profile_id))
+
+
+async def handle_message_stream(request):
+    data = await read_json(request)
+    error = chatbot.validate_chat_request(data)
+    if error is not None:
+        return web.json_response(error[0], status=error[1])
+    rejection = admit(request, data)
+    if rejection is not None:
+        return rejection
+
+    try:
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream; charset=utf-8',
+            **chatbot.STREAM_HEADERS
+        })
+        await response.prepare(request)
+        events = chatbot.stream_chat_events(data)
+        blocking = needs_pool(data['message'])
+        try:
+            while True:
+                item = await run_blocking(next, events, None) if blocking else next(events, None)
+                if item is None:
+                    break
+                await response.write(chatbot.format_sse(*item).encode('utf-8'))
+        except (ConnectionResetError, asyncio.CancelledError):
+            # El cliente cerró la conexión: se deja de generar la respuesta
+            events.close()
+            raise
+        await response.write_eof()
+        return response
+    finally:
+        chatbot.release_request()
+
+
+async def handle_message_batch(request):
+    batch, error = chatbot.parse_message_batch(await read_json(request))
+    if error is not None:
+        return web.json_response(error[0], status=error[1])
+    rejection = admit(request, None, chatbot.batch_cost(batch))
+    if rejection is not None:
+        return rejection
+    try:
+        if needs_pool(*batch[1]):
+            payload, status = await run_blocking(chatbot.process_message_batch, batch)
+        else:
+            payload, status = chatbot.process_message_batch(batch)
+    finally:
+        chatbot.release_request()
+    return web.json_response(payload, status=status)
+
+
+async def health_check(request):
+    if chatbot.user_sessions.blocking:
+        return web.json_response(await run_blocking(chatbot.health_payload))
+    return web.json_response(chatbot.health_payload())
+
+
+async def get_knowledge_stats(request):
+    return web.json_response(chatbot.knowledge_stats_payload())
+
+
+async def export_knowledge(request):
+    status, headers, body = chatbot.knowledge_export.respond(
+        request.headers.get('If-None-Match'),
+        request.headers.get('Accept-Encoding')
+    )
+    return web.Response(body=body, status=status, headers=headers)
+
+
+async def get_profiles(request):
+    payload, status = chatbot.profiles_payload(request.headers, request.query, request.match_info.get('request_id'))
+    return web.json_response(payload, status=status)
+
+
+async def get_metrics(request):
+    return web.Response(
+        body=chatbot.REGISTRY.render().encode('utf-8'),
+        headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+    )
+
+
+async def on_startup(application):
+    chatbot.start_background_tasks()
+    if chatbot.PRELOAD_LOCALES:
+        await run_blocking(chatbot.ai_system.preload_locales)
+
+
+async def on_cleanup(application):
+    await run_blocking(chatbot.support_mailer.stop)
+
+
+def create_app():
+    """Construye la aplicación aiohttp con las mismas rutas que la app Flask"""
+    application = web.Application(middlewares=[cors_middleware], client_max_size=1024 ** 2)
+    application.router.add_post('/api/chatbot/message', handle_message)
+    application.router.add_post('/api/chatbot/message/stream', handle_message_stream)
+    application.router.add_post('/api/chatbot/messages', handle_message_batch)
+    application.router.add_get('/api/chatbot/health', health_check)
+    application.router.add_get('/api/chatbot/knowledge', get_knowledge_stats)
+    application.router.add_get('/api/chatbot/knowledge/export', export_knowledge)
+    application.router.add_get('/api/chatbot/admin/profiles', get_profiles)
+    application.router.add_get('/api/chatbot/admin/profiles/{request_id}', get_profiles)
+    application.router.add_get('/api/chatbot/metrics', get_metrics)
+    application.on_startup.append(on_startup)
+    application.on_cleanup.append(on_cleanup)
+    return application
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor asíncrono del chatbot RSC Chain')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', 5000)))
+    parser.add_argument('--reuse-port', action='store_true',
+                        help='permite lanzar varios procesos en el mismo puerto (SO_REUSEPORT)')
+    args = parser.parse_args()
+
+    print(f"""
+    🤖 RSC Chain Chatbot Backend (asyncio)
+    ======================================
+    Servidor iniciando en puerto {args.port}
+    Base de conocimiento: {len(chatbot.knowledge_base.knowledge_base)} temas
+    """)
+    web.run_app(create_app(), host=args.host, port=args.port, reuse_port=args.reuse_port or None,
+                print=None)
+
+
+if __name__ == '__main__':
+    main()
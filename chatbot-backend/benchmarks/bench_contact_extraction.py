@@ -0,0 +1,149 @@
+"""
+Benchmark de contact_extractor.py
+
+Uso:
+    python benchmarks/bench_contact_extraction.py --size-mb 1 --rounds 200
+
+1. Mide el extractor con entradas adversarias largas (logs pegados de ~1 MB);
+   la implementación anterior (las expresiones que estaban en
+   handle_contact_info_request) se mide con entradas 50 veces más cortas para
+   mostrar su costo cuadrático.
+2. Mide el costo por mensaje y por historial completo de una sesión.
+
+Que los resultados sean correctos (también con estas entradas) lo comprueba
+tests/test_contact_extractor.py, sin depender de tiempos. Aquí solo se falla,
+con código 1, si alguna entrada supera un presupuesto holgado: el costo
+lineal queda muy por debajo y el cuadrático tardaría minutos.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from corpus import CONTACT_MESSAGES  # noqa: E402
+from contact_extractor import MAX_LOCAL_LENGTH, MAX_NAME_LENGTH, ContactExtractor  # noqa: E402
+from message_history import MessageHistory  # noqa: E402
+
+
+# Segundos tolerados por MB de entrada adversaria (unos 0.4 s en una máquina lenta)
+BUDGET_SECONDS_PER_MB = 2.0
+
+
+def legacy_extract(message, bounded=False):
+    """
+    La extracción tal como estaba en handle_contact_info_request
+
+    Con bounded=True se aplican las diferencias intencionales del extractor nuevo:
+    - las capturas que quedan vacías al quitarles los espacios ("nombre: ,"
+      captura " ") se ignoran; la versión anterior se quedaba con ese nombre
+      vacío y dejaba de buscar
+    - los emails con más de MAX_LOCAL_LENGTH caracteres antes de la @ se descartan
+    - "nombre: ..." se corta a MAX_NAME_LENGTH caracteres
+    """
+    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    emails = re.findall(email_pattern, message)
+    if bounded:
+        emails = [email for email in emails if email.index('@') <= MAX_LOCAL_LENGTH]
+    username_patterns = [
+        r'usuario[:\s]+([A-Za-z0-9_]+)',
+        r'nombre[:\s]+([A-Za-z0-9_\s]+)',
+        r'username[:\s]+([A-Za-z0-9_]+)'
+    ]
+    username = ''
+    for pattern in username_patterns:
+        matches = re.findall(pattern, message, re.IGNORECASE)
+        if bounded:
+            if pattern.startswith('nombre'):
+                matches = [match[:MAX_NAME_LENGTH] for match in matches]
+            matches = [match for match in matches if match.strip()]
+        if matches:
+            username = matches[0].strip()
+            break
+    return (emails[0] if emails else None), (username or None)
+
+
+def adversarial_inputs(size):
+    return {
+        'puntos_sin_arroba': 'a.' * (size // 2),
+        'local_gigante_con_arroba': 'a' * size + '@',
+        'arroba_sin_tld': 'a@' + 'b' * size,
+        'dominio_con_puntos': 'x@' + 'b.' * (size // 2),
+        'usuario_repetido': 'usuario: ' * (size // 9),
+        'nombre_con_espacios': 'nombre: ' + 'a ' * (size // 2),
+        'nombre_repetido': 'nombre: ab ' * (size // 11),
+        'hex_largo': '0x' + 'f' * size,
+        'log_pegado': ('ERROR 2024-01-01 conn=0x1f user@ worker.pool.thread-12 retry '
+                       * (size // 62)),
+    }
+
+
+def timed(func, text):
+    started = time.perf_counter()
+    func(text)
+    return time.perf_counter() - started
+
+
+def check_adversarial(extractor, size_mb, budget_per_mb):
+    size = int(size_mb * 1024 * 1024)
+    budget = budget_per_mb * size_mb
+    ok = True
+    print(f"\nEntradas adversarias de {size_mb:g} MB (presupuesto {budget:.2f}s):")
+    small = size // 50
+    legacy_inputs = adversarial_inputs(small)
+    for name, text in adversarial_inputs(size).items():
+        elapsed = timed(extractor.extract, text)
+        legacy = timed(legacy_extract, legacy_inputs[name])
+        flag = '✅' if elapsed <= budget else '❌'
+        ok = ok and elapsed <= budget
+        print(f"  {flag} {name:26} {elapsed * 1000:9.1f} ms   (anterior con {small // 1024} KB: {legacy * 1000:9.1f} ms)")
+    return ok
+
+
+def throughput(extractor, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for message in CONTACT_MESSAGES:
+            extractor.extract(message)
+    per_message = (time.perf_counter() - started) * 1e6 / (rounds * len(CONTACT_MESSAGES))
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for message in CONTACT_MESSAGES:
+            legacy_extract(message)
+    legacy_per_message = (time.perf_counter() - started) * 1e6 / (rounds * len(CONTACT_MESSAGES))
+
+    history = MessageHistory(50)
+    for position in range(50):
+        history.append('user' if position % 2 == 0 else 'assistant', CONTACT_MESSAGES[position % len(CONTACT_MESSAGES)])
+    started = time.perf_counter()
+    for _ in range(rounds):
+        extractor.extract_history(history)
+    per_history = (time.perf_counter() - started) * 1e6 / rounds
+
+    print(f"\nPor mensaje: {per_message:.2f} µs (anterior: {legacy_per_message:.2f} µs)")
+    print(f"Historial de 50 mensajes: {per_history:.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del extractor de datos de contacto')
+    parser.add_argument('--size-mb', type=float, default=1, help='tamaño de las entradas adversarias en MB')
+    parser.add_argument('--rounds', type=int, default=200, help='rondas sobre los mensajes de contacto del corpus')
+    parser.add_argument('--budget', type=float, default=BUDGET_SECONDS_PER_MB,
+                        help='segundos tolerados por MB de entrada adversaria')
+    args = parser.parse_args()
+
+    extractor = ContactExtractor()
+    ok = check_adversarial(extractor, args.size_mb, args.budget)
+    throughput(extractor, args.rounds)
+    if not ok:
+        print('\n❌ Alguna entrada superó el presupuesto')
+        sys.exit(1)
+    print('\n✅ Todo correcto')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark del diario de conversaciones (conversation_journal.py)
+
+Uso:
+    python benchmarks/bench_journal.py --turns 20000 --sessions 500
+
+1. Costo de un turno en el almacén de sesiones en memoria (dos mensajes y un
+   save) sin diario, con diario pero sin que el hilo escriba (solo encolar) y
+   con el hilo escribiendo a la par. Este último bucle genera registros más
+   rápido de lo que el disco los absorbe, así que incluye la competencia por
+   el GIL con el escritor: es el peor caso, no el de un servidor real.
+2. Registros por segundo que escribe el hilo del diario (group commit).
+3. Tiempo de reconstruir las sesiones al arrancar.
+4. Pérdida acotada: un proceso hijo registra mensajes, espera dos intervalos
+   de flush, registra más y muere sin cerrar el diario; todo lo registrado
+   antes de la espera tiene que estar en el archivo.
+
+Termina con código 1 si la reconstrucción o la pérdida acotada fallan.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from corpus import MESSAGES  # noqa: E402
+from conversation_journal import ConversationJournal  # noqa: E402
+from session_store import SessionStore  # noqa: E402
+
+
+LIMITS = {'ttl_seconds': 1800, 'max_sessions': 10000, 'max_messages': 50}
+
+
+def run_turns(store, turns, sessions):
+    """Simula turnos de conversación; devuelve µs por turno"""
+    started = time.perf_counter()
+    for turn in range(turns):
+        session_id = f'session-{turn % sessions}'
+        session = store.get_or_create(session_id)
+        message = MESSAGES[turn % len(MESSAGES)]
+        store.append_message(session_id, session, 'user', message)
+        store.append_message(session_id, session, 'assistant', 'Respuesta a: ' + message)
+        if turn % 7 == 0:
+            session['contact_attempts'] += 1
+        store.save(session_id, session)
+    return (time.perf_counter() - started) * 1e6 / turns
+
+
+def bench_turns(path, turns, sessions):
+    baseline = run_turns(SessionStore(**LIMITS), turns, sessions)
+
+    idle = ConversationJournal(path + '.idle', flush_interval=3600, batch_size=10 ** 9, max_pending=10 ** 9)
+    enqueue_only = run_turns(SessionStore(journal=idle, **LIMITS), turns, sessions)
+    idle.stop()
+
+    journal = ConversationJournal(path)
+    store = SessionStore(journal=journal, **LIMITS)
+    with_journal = run_turns(store, turns, sessions)
+    queued = len(journal)
+
+    started = time.perf_counter()
+    journal.stop()
+    drain = time.perf_counter() - started
+    stats = journal.stats()
+    print(f"Turno sin diario:   {baseline:8.2f} µs")
+    print(f"Turno solo encolar: {enqueue_only:8.2f} µs  (+{enqueue_only - baseline:.2f} µs)")
+    print(f"Turno con diario:   {with_journal:8.2f} µs  (+{with_journal - baseline:.2f} µs, escritor saturado)")
+    print(f"Escritos: {stats['written']} registros en {stats['batches']} lotes; "
+          f"{queued} pendientes al terminar, vaciados en {drain * 1000:.1f} ms")
+    return store
+
+
+def bench_writer(path, records):
+    journal = ConversationJournal(path, flush_interval=0.05)
+    started = time.perf_counter()
+    for position in range(records):
+        journal.record_message(f'writer-{position % 1000}', 'user', MESSAGES[position % len(MESSAGES)], time.time())
+    while len(journal):
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - started
+    journal.stop()
+    print(f"Hilo escritor: {records / elapsed:,.0f} registros/s "
+          f"({journal.batches} lotes, último lote {journal.last_flush_ms:.2f} ms)")
+
+
+def check_restore(path, store):
+    journal = ConversationJournal(path)
+    started = time.perf_counter()
+    restored_store = SessionStore(**LIMITS)
+    restored = journal.load_sessions(LIMITS['ttl_seconds'], LIMITS['max_sessions'], LIMITS['max_messages'])
+    for saved in restored:
+        restored_store.restore(*saved)
+    elapsed = time.perf_counter() - started
+    ok = len(restored_store) == len(store)
+    for session_id in list(store._sessions):
+        original = store.get(session_id)
+        copy = restored_store.get(session_id)
+        if (copy is None or [(m.role, m.content) for m in copy['messages']]
+                != [(m.role, m.content) for m in original['messages']]
+                or copy['contact_attempts'] != original['contact_attempts']):
+            ok = False
+            break
+    print(f"Reconstrucción: {len(restored)} sesiones en {elapsed * 1000:.1f} ms {'✅' if ok else '❌'}")
+    return ok
+
+
+CHILD = """
+import os, sys, time
+sys.path.insert(0, {backend!r})
+from conversation_journal import ConversationJournal
+journal = ConversationJournal({path!r}, flush_interval={interval})
+for position in range({before}):
+    journal.record_message('loss', 'user', str(position), time.time())
+time.sleep({interval} * 2 + 0.2)
+for position in range({after}):
+    journal.record_message('loss', 'user', str(position), time.time())
+os._exit(0)
+"""
+
+
+def check_bounded_loss(path, interval=0.2, before=5000, after=5000):
+    code = CHILD.format(backend=BACKEND_DIR, path=path, interval=interval, before=before, after=after)
+    subprocess.run([sys.executable, '-c', code], check=True)
+    saved = len(ConversationJournal(path).transcript('loss'))
+    ok = saved >= before
+    print(f"Pérdida acotada: {saved}/{before + after} registros guardados tras morir el proceso, "
+          f"{before} garantizados {'✅' if ok else '❌'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del diario de conversaciones')
+    parser.add_argument('--turns', type=int, default=20000)
+    parser.add_argument('--sessions', type=int, default=500)
+    parser.add_argument('--records', type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = bench_turns(os.path.join(directory, 'turns.db'), args.turns, args.sessions)
+        bench_writer(os.path.join(directory, 'writer.db'), args.records)
+        ok = check_restore(os.path.join(directory, 'turns.db'), store)
+        ok = check_bounded_loss(os.path.join(directory, 'loss.db')) and ok
+    if not ok:
+        print('\n❌ Hay fallos')
+        sys.exit(1)
+    print('\n✅ Todo correcto')
+
+
+if __name__ == '__main__':
+    main()
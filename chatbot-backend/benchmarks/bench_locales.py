@@ -0,0 +1,86 @@
+"""
+Benchmark de los paquetes de idioma (locales/)
+
+Uso:
+    python benchmarks/bench_locales.py --rounds 2000
+
+1. Mide el detector de idioma (µs por mensaje) sobre el corpus.
+2. Mide cuánto cuesta construir RSCAI (solo se arma el idioma por defecto) y
+   cuánto tiempo y memoria agrega el primer mensaje en inglés.
+3. Mide cuánta memoria se recupera al liberarse el inglés por falta de uso.
+
+Que el detector acierte y que los idiomas se carguen y se liberen lo
+comprueba tests/test_locales.py; aquí solo se informan los números.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from corpus import MESSAGES  # noqa: E402
+from language_detector import LanguageDetector  # noqa: E402
+from rsc_ai import RSCAI  # noqa: E402
+from rsc_knowledge import RSCKnowledgeBase  # noqa: E402
+
+
+def bench_detector(rounds):
+    detector = LanguageDetector()
+    lowered = [' '.join(message.lower().split()) for message in MESSAGES]
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for message in lowered:
+            detector.detect(message)
+    per_message = (time.perf_counter() - started) * 1e6 / (rounds * len(lowered))
+    print('Detector de idioma:')
+    print(f"  {per_message:.2f} µs por mensaje ({len(lowered)} mensajes x {rounds} rondas)")
+
+
+def traced(func):
+    """(resultado, segundos, bytes que quedan asignados después de llamar a func)"""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    return result, elapsed, tracemalloc.get_traced_memory()[0] - before
+
+
+def bench_lazy_loading(idle_seconds):
+    tracemalloc.start()
+    ai, elapsed, allocated = traced(lambda: RSCAI(RSCKnowledgeBase(), locale_idle_seconds=idle_seconds))
+    print('\nCarga de idiomas:')
+    print(f"  Arranque (solo 'es'):       {elapsed * 1000:7.1f} ms  {allocated / 1024:8.0f} KB")
+
+    _, elapsed, allocated = traced(lambda: ai.process_message('how do I start mining?'))
+    print(f"  Primer mensaje en inglés:   {elapsed * 1000:7.1f} ms  {allocated / 1024:8.0f} KB")
+
+    _, elapsed, _ = traced(lambda: ai.process_message('how do I create a wallet?'))
+    print(f"  Siguiente mensaje en inglés: {elapsed * 1000:6.2f} ms")
+
+    # Sin mensajes en inglés durante idle_seconds: el modelo se libera con el próximo mensaje
+    time.sleep(idle_seconds * 1.5)
+    ai.response_cache.clear()
+    _, _, released = traced(lambda: ai.process_message('hola'))
+    print(f"  Tras liberar 'en':          {released / 1024:8.0f} KB  (idiomas cargados: {ai.locales.loaded()})")
+    tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de los paquetes de idioma del chatbot RSC Chain')
+    parser.add_argument('--rounds', type=int, default=2000, help='rondas sobre el corpus para el detector')
+    parser.add_argument('--idle-seconds', type=float, default=0.2,
+                        help='segundos sin uso antes de liberar un idioma (LOCALE_IDLE_SECONDS)')
+    args = parser.parse_args()
+
+    bench_detector(args.rounds)
+    bench_lazy_loading(args.idle_seconds)
+
+
+if __name__ == '__main__':
+    main()
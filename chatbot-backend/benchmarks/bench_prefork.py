@@ -0,0 +1,201 @@
+"""
+Benchmark del servidor de producción pre-fork (gunicorn.conf.py)
+
+Uso:
+    python benchmarks/bench_prefork.py --workers 1 2 4 --duration 10
+
+Para cada cantidad de workers, con y sin preload_app, arranca gunicorn con
+gunicorn.conf.py, mide la memoria de cada worker, lo carga durante --duration
+segundos con varios procesos cliente que envían mensajes del corpus a
+/api/chatbot/message y vuelve a medir la memoria después de la carga.
+
+Memoria por worker (de /proc/<pid>/smaps_rollup, solo Linux):
+- RSS: todo lo que el worker tiene en memoria, compartido o no
+- PSS: RSS con las páginas compartidas repartidas entre los procesos que las usan
+- privada: páginas que el worker ya no comparte (las que copió al escribir)
+Con preload_app y gc.freeze la memoria privada de cada worker debería ser
+una fracción de la RSS, y seguir así después de la carga.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from corpus import MESSAGES  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def request(port, method, path, body=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    try:
+        conn.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def start_server(port, workers, preload, extra_env=None):
+    env = dict(os.environ)
+    env.update({
+        'PORT': str(port),
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'WEB_CONCURRENCY': str(workers),
+        'GUNICORN_PRELOAD': 'true' if preload else 'false',
+        'RATE_LIMIT_ENABLED': 'false'
+    })
+    env.update(extra_env or {})
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if request(port, 'GET', '/api/chatbot/health') == 200 and len(worker_pids(process.pid)) == workers:
+                return process
+        except OSError:
+            pass
+        time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError('gunicorn no arrancó a tiempo')
+
+
+def stop_server(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def worker_pids(master_pid):
+    try:
+        with open(f'/proc/{master_pid}/task/{master_pid}/children') as children:
+            return [int(pid) for pid in children.read().split()]
+    except OSError:
+        return []
+
+
+def memory(pid):
+    """(rss, pss, privada) en MB"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(':')] = int(parts[1])
+    private = values.get('Private_Dirty', 0) + values.get('Private_Clean', 0)
+    return values.get('Rss', 0) / 1024, values.get('Pss', 0) / 1024, private / 1024
+
+
+def average_memory(pids):
+    samples = [memory(pid) for pid in pids]
+    return tuple(sum(sample[i] for sample in samples) / len(samples) for i in range(3))
+
+
+def client(port, duration, client_id, results):
+    completed = 0
+    errors = 0
+    deadline = time.monotonic() + duration
+    position = client_id
+    while time.monotonic() < deadline:
+        body = json.dumps({
+            'message': MESSAGES[position % len(MESSAGES)],
+            'session_id': f'bench-{client_id}-{position % 50}'
+        })
+        position += 1
+        try:
+            if request(port, 'POST', '/api/chatbot/message', body) == 200:
+                completed += 1
+            else:
+                errors += 1
+        except OSError:
+            errors += 1
+    results.put((completed, errors))
+
+
+def load(port, clients, duration):
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=client, args=(port, duration, client_id, results))
+        for client_id in range(clients)
+    ]
+    for process in processes:
+        process.start()
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    completed = sum(total[0] for total in totals)
+    errors = sum(total[1] for total in totals)
+    return completed / duration, errors
+
+
+def run(workers, preload, clients, duration):
+    port = free_port()
+    server = start_server(port, workers, preload)
+    try:
+        pids = worker_pids(server.pid)
+        before = average_memory(pids)
+        throughput, errors = load(port, clients or workers * 2, duration)
+        after = average_memory(pids)
+    finally:
+        stop_server(server)
+    return {
+        'workers': workers,
+        'preload': preload,
+        'requests_per_sec': round(throughput, 1),
+        'errors': errors,
+        'rss_mb': round(before[0], 1),
+        'pss_mb': round(before[1], 1),
+        'private_mb': round(before[2], 1),
+        'private_after_load_mb': round(after[2], 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del servidor pre-fork')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--clients', type=int, default=0, help='procesos cliente (por defecto 2 por worker)')
+    parser.add_argument('--output', help='guardar los resultados en JSON')
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print('❌ Este benchmark necesita Linux (/proc/<pid>/smaps_rollup)')
+        sys.exit(1)
+
+    print(f"CPUs: {os.cpu_count()}")
+    print(f"{'workers':>7} {'preload':>8} {'req/s':>9} {'errores':>8} {'RSS MB':>8} {'PSS MB':>8} "
+          f"{'privada MB':>11} {'tras carga':>11}")
+    results = []
+    for workers in args.workers:
+        for preload in (True, False):
+            result = run(workers, preload, args.clients, args.duration)
+            results.append(result)
+            print(f"{result['workers']:>7} {'sí' if preload else 'no':>8} {result['requests_per_sec']:>9} "
+                  f"{result['errors']:>8} {result['rss_mb']:>8} {result['pss_mb']:>8} "
+                  f"{result['private_mb']:>11} {result['private_after_load_mb']:>11}")
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'cpus': os.cpu_count(), 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
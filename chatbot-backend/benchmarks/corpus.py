@@ -0,0 +1,76 @@
+"""
+Corpus de mensajes para los benchmarks del chatbot
+Mezcla de saludos, preguntas frecuentes, problemas técnicos y mensajes ambiguos en español e inglés
+"""
+
+GREETINGS = [
+    'hola',
+    'Hola, buenos días',
+    'buenas tardes!',
+    'hey, hay alguien?',
+    'hello there',
+    'hi, I need some help',
+]
+
+FAQ = [
+    '¿Cómo minar RSC?',
+    'como empiezo a minar',
+    'cuánto dura una sesión de minería?',
+    'qué es staking',
+    '¿Qué es RSC Chain?',
+    'como crear una wallet',
+    'cómo envío una transacción desde mi wallet',
+    'quiero vender tokens en p2p',
+    'como funciona el intercambio p2p con escrow',
+    'cual es la url de la api',
+    'qué consenso usa la blockchain',
+    'cuántas transacciones por segundo soporta la red',
+    'dónde veo los bloques en el explorador',
+    'how do I stake my tokens',
+    'what is the total supply of RSC',
+    'how can I create a wallet',
+    'where can I see my transactions in the explorer',
+    'estrategias de staking para diversificar',
+    'es segura la wallet? dónde se guarda mi clave privada',
+    'consejos para minar mejor',
+]
+
+TROUBLESHOOTING = [
+    'no puedo iniciar la minería',
+    'minar no funciona desde ayer',
+    'no recibo recompensas de la minería',
+    'tengo un problema, no me deja crear wallet',
+    'mi balance es incorrecto, no se actualiza',
+    'error al delegar mis tokens',
+    'no recibo recompensas de staking',
+    'la página no carga, tengo un problema',
+    'bug en la pagina del explorer',
+    'my wallet balance is wrong',
+    'error 503 when I try to start mining',
+]
+
+AMBIGUOUS = [
+    'el precio va a subir?',
+    'donde esta mi dinero',
+    'tengo un problema con el código de error 503 en el log',
+    'necesito hablar con un humano',
+    'when moon?',
+    'me robaron los tokens, qué hago',
+    'mi cuenta fue bloqueada sin razón',
+]
+
+MESSAGES = GREETINGS + FAQ + TROUBLESHOOTING + AMBIGUOUS
+
+# Respuestas típicas del flujo de contacto (después de una escalación)
+CONTACT_MESSAGES = [
+    'mi email es juan.perez@gmail.com',
+    'usuario: juanp_92',
+    'Mi nombre de usuario: maria_rsc y mi correo maria@rscchain.com',
+    'nombre: Carlos Gómez',
+    'username: cryptofan email cryptofan+rsc@proton.me',
+    'mi wallet es 0x8ba1f109551bD432803012645Ac136ddd64DBA72 y el email ana@mail.co',
+    'no tengo email todavía',
+    'USUARIO: Pedro_2024, correo pedro.2024@empresa.com.ar',
+    'ok',
+    'te paso mis datos: lucia@outlook.es / usuario lucia_m',
+]
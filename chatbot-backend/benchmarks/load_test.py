@@ -0,0 +1,380 @@
+"""
+Prueba de carga del chatbot con tráfico sintético
+
+Uso:
+    python benchmarks/load_test.py --duration 60 --clients 8 --sessions 2000 \\
+        --mix greeting=2,faq=5,troubleshooting=2,escalation=1
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --pid <pid del maestro>
+
+Sin --url arranca un servidor SMTP falso (tools/fake_smtp.py) y el chatbot con
+gunicorn.conf.py en un puerto local, con los correos de soporte apuntando al
+servidor falso. Varios procesos cliente repiten flujos elegidos al azar con
+los pesos de --mix:
+- greeting: un saludo
+- faq: una pregunta frecuente
+- troubleshooting: un reporte de problema y un seguimiento corto en la misma sesión
+- escalation: un mensaje que se escala a soporte y después los datos de
+  contacto, que terminan en un correo al servidor SMTP falso
+Los tres primeros usan uno de --sessions session_id posibles; cada escalación
+usa uno nuevo, así que las sesiones crecen hasta SESSION_MAX_COUNT.
+
+Informe:
+- peticiones por segundo, latencia p50/p95/p99 y porcentaje de errores por
+  paso (error: estado distinto de 200, success falso o sin respuesta)
+- cada --sample-interval segundos, las sesiones activas (/api/chatbot/health)
+  y la memoria del servidor (RSS y PSS de maestro y workers, solo Linux), para
+  ver si crecen sin límite durante la carga
+
+Con varios workers y SESSION_BACKEND=memory cada worker tiene sus propias
+sesiones y /api/chatbot/health muestra solo las del worker que responde: para
+seguir las sesiones usa --workers 1 o SESSION_BACKEND=sqlite.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from corpus import FAQ, GREETINGS, TROUBLESHOOTING  # noqa: E402
+from bench_prefork import free_port, memory, start_server, stop_server, worker_pids  # noqa: E402
+from tools.fake_smtp import FakeSMTPServer  # noqa: E402
+
+
+DEFAULT_MIX = 'greeting=2,faq=5,troubleshooting=2,escalation=1'
+
+FOLLOW_UPS = [
+    'sigue sin funcionar',
+    'y ahora qué hago?',
+    'ya probé eso',
+    'still not working',
+]
+
+# Mensajes que el bot no sabe responder y escala a soporte
+ESCALATIONS = [
+    'necesito hablar con un humano',
+    'donde esta mi dinero',
+    'el precio va a subir?',
+    'when moon?',
+]
+
+
+def parse_mix(text):
+    """'greeting=2,faq=5' -> ([flujos], [pesos])"""
+    flows, weights = [], []
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in FLOWS:
+            raise argparse.ArgumentTypeError(f'flujo desconocido: {name} (opciones: {", ".join(FLOWS)})')
+        flows.append(name)
+        weights.append(float(weight or 1))
+    return flows, weights
+
+
+class Client:
+    """Cliente HTTP de un proceso de carga; guarda la latencia de cada paso"""
+
+    def __init__(self, host, port, client_id, sessions, seed):
+        self.host = host
+        self.port = port
+        self.client_id = client_id
+        self.sessions = sessions
+        self.random = random.Random(seed + client_id)
+        self.latencies = {}  # paso -> [ms]
+        self.errors = {}  # paso -> cantidad
+        self.escalations = 0
+        self.not_escalated = 0
+
+    def post(self, path_name, session_id, message):
+        """Envía un mensaje; devuelve la respuesta en JSON o None si falló"""
+        body = json.dumps({'message': message, 'session_id': session_id})
+        started = time.perf_counter()
+        payload = None
+        try:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                conn.request('POST', '/api/chatbot/message', body=body,
+                             headers={'Content-Type': 'application/json'})
+                response = conn.getresponse()
+                data = response.read()
+                if response.status == 200:
+                    payload = json.loads(data)
+            finally:
+                conn.close()
+        except (OSError, ValueError):
+            pass
+        self.latencies.setdefault(path_name, []).append((time.perf_counter() - started) * 1000)
+        if payload is None or not payload.get('success'):
+            self.errors[path_name] = self.errors.get(path_name, 0) + 1
+            return None
+        return payload
+
+    def pooled_session(self):
+        return f'load-{self.random.randrange(self.sessions)}'
+
+    def greeting(self):
+        self.post('greeting', self.pooled_session(), self.random.choice(GREETINGS))
+
+    def faq(self):
+        self.post('faq', self.pooled_session(), self.random.choice(FAQ))
+
+    def troubleshooting(self):
+        session_id = self.pooled_session()
+        if self.post('troubleshooting', session_id, self.random.choice(TROUBLESHOOTING)) is not None:
+            self.post('follow_up', session_id, self.random.choice(FOLLOW_UPS))
+
+    def escalation(self):
+        self.escalations += 1
+        session_id = f'load-escalation-{self.client_id}-{self.escalations}'
+        response = self.post('escalation', session_id, self.random.choice(ESCALATIONS))
+        if response is None:
+            return
+        if not response.get('needs_contact_info'):
+            self.not_escalated += 1
+            return
+        user = f'load{self.client_id}x{self.escalations}'
+        self.post('contact_info', session_id, f'mi email es {user}@example.com y mi usuario: {user}')
+
+
+FLOWS = {
+    'greeting': Client.greeting,
+    'faq': Client.faq,
+    'troubleshooting': Client.troubleshooting,
+    'escalation': Client.escalation,
+}
+
+
+def run_client(host, port, client_id, args, results):
+    client = Client(host, port, client_id, args.sessions, args.seed)
+    flows, weights = parse_mix(args.mix)
+    deadline = time.monotonic() + args.duration
+    while time.monotonic() < deadline:
+        FLOWS[client.random.choices(flows, weights)[0]](client)
+    results.put((client.latencies, client.errors, client.not_escalated))
+
+
+def get_json(host, port, path):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    try:
+        conn.request('GET', path)
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+
+def server_memory(pid):
+    """(rss, pss) en MB del proceso y sus hijos (maestro y workers de gunicorn)"""
+    rss = pss = 0.0
+    for process in [pid] + worker_pids(pid):
+        try:
+            process_rss, process_pss, _ = memory(process)
+        except OSError:
+            continue
+        rss += process_rss
+        pss += process_pss
+    return rss, pss
+
+
+class Sampler(threading.Thread):
+    """Toma cada interval segundos las sesiones activas y la memoria del servidor"""
+
+    def __init__(self, host, port, pid, interval):
+        super().__init__(name='load-sampler', daemon=True)
+        self.host = host
+        self.port = port
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._finished = threading.Event()
+        self._origin = time.monotonic()
+
+    def sample(self):
+        try:
+            health = get_json(self.host, self.port, '/api/chatbot/health')
+        except (OSError, ValueError):
+            health = {}
+        sessions = health.get('sessions', {})
+        rss, pss = server_memory(self.pid) if self.pid else (None, None)
+        entry = {
+            'elapsed_s': round(time.monotonic() - self._origin, 1),
+            'live_sessions': sessions.get('live_sessions'),
+            'session_evictions': sessions.get('evictions'),
+            'support_emails_sent': health.get('support_mailer', {}).get('sent'),
+            'rss_mb': round(rss, 1) if rss is not None else None,
+            'pss_mb': round(pss, 1) if pss is not None else None
+        }
+        self.samples.append(entry)
+        print(f"{entry['elapsed_s']:>8} {format_value(entry['live_sessions']):>9} "
+              f"{format_value(entry['rss_mb']):>9} {format_value(entry['pss_mb']):>9} "
+              f"{format_value(entry['support_emails_sent']):>8}")
+
+    def run(self):
+        self.sample()
+        while not self._finished.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._finished.set()
+        self.join()
+        self.sample()
+
+
+def format_value(value):
+    return '-' if value is None else value
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(totals, duration):
+    latencies, errors = {}, {}
+    for client_latencies, client_errors, _ in totals:
+        for name, values in client_latencies.items():
+            latencies.setdefault(name, []).extend(values)
+        for name, count in client_errors.items():
+            errors[name] = errors.get(name, 0) + count
+
+    paths = {}
+    for name, values in sorted(latencies.items()):
+        values.sort()
+        paths[name] = {
+            'requests': len(values),
+            'requests_per_sec': round(len(values) / duration, 1),
+            'p50_ms': round(percentile(values, 0.50), 2),
+            'p95_ms': round(percentile(values, 0.95), 2),
+            'p99_ms': round(percentile(values, 0.99), 2),
+            'error_rate': round(errors.get(name, 0) / len(values), 4)
+        }
+    requests = sum(path['requests'] for path in paths.values())
+    return {
+        'requests': requests,
+        'requests_per_sec': round(requests / duration, 1),
+        'error_rate': round(sum(errors.values()) / requests, 4) if requests else 0.0,
+        'not_escalated': sum(total[2] for total in totals),
+        'paths': paths
+    }
+
+
+def growth(samples, key):
+    """(primero, último, cambio por minuto) de una serie de muestras"""
+    values = [(sample['elapsed_s'], sample[key]) for sample in samples if sample[key] is not None]
+    if len(values) < 2 or values[-1][0] == values[0][0]:
+        return None
+    (start, first), (end, last) = values[0], values[-1]
+    return first, last, round((last - first) * 60 / (end - start), 1)
+
+
+def load(host, port, pid, args):
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=run_client, args=(host, port, client_id, args, results))
+        for client_id in range(args.clients)
+    ]
+    print(f"{'segundos':>8} {'sesiones':>9} {'RSS MB':>9} {'PSS MB':>9} {'correos':>8}")
+    sampler = Sampler(host, port, pid, args.sample_interval)
+    sampler.start()
+    for process in processes:
+        process.start()
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    sampler.stop()
+    return summarize(totals, args.duration), sampler.samples
+
+
+def report(summary, samples, smtp):
+    print(f"\n{'paso':<16} {'peticiones':>10} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errores':>8}")
+    for name, path in summary['paths'].items():
+        print(f"{name:<16} {path['requests']:>10} {path['requests_per_sec']:>8} {path['p50_ms']:>8} "
+              f"{path['p95_ms']:>8} {path['p99_ms']:>8} {path['error_rate'] * 100:>7.2f}%")
+    print(f"{'total':<16} {summary['requests']:>10} {summary['requests_per_sec']:>8} "
+          f"{'':>8} {'':>8} {'':>8} {summary['error_rate'] * 100:>7.2f}%")
+    if summary['not_escalated']:
+        print(f"⚠️ {summary['not_escalated']} mensajes de escalación se respondieron sin pedir contacto")
+
+    for key, label, unit in (('live_sessions', 'Sesiones activas', ''), ('rss_mb', 'RSS', ' MB'),
+                             ('pss_mb', 'PSS', ' MB')):
+        change = growth(samples, key)
+        if change:
+            print(f"{label}: {change[0]}{unit} -> {change[1]}{unit} ({change[2]:+}{unit} por minuto)")
+    if smtp is not None:
+        print(f"Correos recibidos por el SMTP falso: {len(smtp.messages)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga del chatbot con tráfico sintético')
+    parser.add_argument('--duration', type=float, default=30.0, help='segundos de carga')
+    parser.add_argument('--clients', type=int, default=4, help='procesos cliente en paralelo')
+    parser.add_argument('--sessions', type=int, default=1000, help='session_id distintos para los flujos sin escalación')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'pesos de cada flujo (por defecto {DEFAULT_MIX})')
+    parser.add_argument('--workers', type=int, default=1, help='workers de gunicorn del servidor que se arranca')
+    parser.add_argument('--sample-interval', type=float, default=5.0, help='segundos entre muestras de sesiones y memoria')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--url', help='probar un servidor ya levantado en lugar de arrancar uno')
+    parser.add_argument('--pid', type=int, help='con --url: pid del servidor para medir su memoria')
+    parser.add_argument('--output', help='guardar los resultados en JSON')
+    args = parser.parse_args()
+    parse_mix(args.mix)
+
+    smtp = server = None
+    if args.url:
+        target = urlsplit(args.url)
+        host, port, pid = target.hostname, target.port or 80, args.pid
+    else:
+        smtp = FakeSMTPServer()
+        smtp_port = smtp.start()
+        host, port = '127.0.0.1', free_port()
+        server = start_server(port, args.workers, True, {
+            'SMTP_SERVER': '127.0.0.1',
+            'SMTP_PORT': str(smtp_port),
+            'SMTP_USE_TLS': 'false',
+            'EMAIL_USER': 'chatbot@example.com',
+            'EMAIL_PASSWORD': 'load-test'
+        })
+        pid = server.pid
+    if pid and not os.path.exists(f'/proc/{pid}/smaps_rollup'):
+        print('⚠️ Sin /proc/<pid>/smaps_rollup (solo Linux): no se mide la memoria')
+        pid = None
+
+    try:
+        summary, samples = load(host, port, pid, args)
+        if smtp is not None:
+            # El envío es en segundo plano: esperar a que el emisor vacíe la cola
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline:
+                if not get_json(host, port, '/api/chatbot/health')['support_mailer']['queue_depth']:
+                    break
+                time.sleep(0.2)
+    finally:
+        if server is not None:
+            stop_server(server)
+        if smtp is not None:
+            smtp.stop()
+
+    report(summary, samples, smtp)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({
+                'cpus': os.cpu_count(),
+                'duration_s': args.duration,
+                'clients': args.clients,
+                'sessions': args.sessions,
+                'mix': args.mix,
+                'workers': None if args.url else args.workers,
+                'summary': summary,
+                'samples': samples,
+                'support_emails_received': len(smtp.messages) if smtp is not None else None
+            }, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmarks del pipeline del chatbot
+
+Uso:
+    python benchmarks/run_benchmarks.py --output baseline.json
+    python benchmarks/run_benchmarks.py --compare baseline.json --threshold 0.15
+
+Cada benchmark recorre el corpus completo varias veces y reporta el tiempo por
+operación (mediana, mínimo y p95 entre rondas) en microsegundos. Con --compare
+se marca como regresión todo benchmark cuya mediana supere la del baseline en
+más del umbral indicado, y el proceso termina con código 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from corpus import MESSAGES  # noqa: E402
+from rsc_knowledge import RSCKnowledgeBase  # noqa: E402
+from rsc_ai import RSCAI  # noqa: E402
+
+
+def measure(func, items, rounds, warmup=1):
+    """Ejecuta func sobre todos los items en cada ronda y devuelve µs por operación"""
+    for _ in range(warmup):
+        for item in items:
+            func(item)
+    per_op = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for item in items:
+            func(item)
+        per_op.append((time.perf_counter() - started) * 1e6 / len(items))
+    per_op.sort()
+    return {
+        'median_us': round(statistics.median(per_op), 3),
+        'min_us': round(per_op[0], 3),
+        'p95_us': round(per_op[min(len(per_op) - 1, int(len(per_op) * 0.95))], 3),
+        'ops_per_sec': round(1e6 / statistics.median(per_op), 1),
+        'rounds': rounds,
+        'ops_per_round': len(items)
+    }
+
+
+def microbenchmarks(rounds):
+    knowledge = RSCKnowledgeBase()
+    ai = RSCAI(knowledge)
+    uncached_ai = RSCAI(knowledge, cache_size=0)
+    lowered = [' '.join(message.lower().split()) for message in MESSAGES]
+    classified = [(message, ai._detect_category(message)) for message in lowered]
+    searched = [(message, knowledge.search(message, category), category) for message, category in classified]
+
+    results = {
+        'knowledge_search': measure(lambda item: knowledge.search(item[0], item[1]), classified, rounds),
+        'detect_intent': measure(ai._detect_intent, lowered, rounds),
+        'detect_category': measure(ai._detect_category, lowered, rounds),
+        'calculate_confidence': measure(lambda item: ai._calculate_confidence(*item), searched, rounds),
+        'process_message_uncached': measure(uncached_ai.process_message, MESSAGES, rounds),
+        'process_message_cached': measure(ai.process_message, MESSAGES, rounds),
+        'process_messages_batch': measure(lambda batch: ai.process_messages(batch), [MESSAGES], rounds)
+    }
+    try:
+        tfidf_knowledge = RSCKnowledgeBase(retrieval='tfidf')
+        tfidf_knowledge.search('wallet')  # construir la matriz fuera de la medición
+    except ImportError:
+        print('⚠️ NumPy no está instalado: se omite knowledge_search_tfidf')
+    else:
+        results['knowledge_search_tfidf'] = measure(
+            lambda item: tfidf_knowledge.search(item[0], item[1]), classified, rounds
+        )
+    return results
+
+
+def endpoint_benchmark(rounds):
+    """Benchmark extremo a extremo de /api/chatbot/message con el cliente de pruebas de Flask"""
+    # Sin credenciales SMTP las escalaciones no intentan enviar correos
+    os.environ['EMAIL_USER'] = ''
+    os.environ['EMAIL_PASSWORD'] = ''
+    # Todas las peticiones vienen del mismo cliente: sin desactivar el límite se medirían respuestas 429
+    os.environ['RATE_LIMIT_ENABLED'] = 'false'
+    import app as chatbot_app
+
+    client = chatbot_app.app.test_client()
+    counter = iter(range(10 ** 9))
+
+    def post(message):
+        # Sesión nueva por mensaje para no quedar atrapados en el flujo de contacto
+        response = client.post('/api/chatbot/message', json={
+            'message': message,
+            'session_id': f'bench-{next(counter)}'
+        })
+        if response.status_code != 200:
+            raise RuntimeError(f'Respuesta inesperada {response.status_code}: {response.get_data(as_text=True)}')
+
+    return {'endpoint_message': measure(post, MESSAGES, rounds)}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Devuelve la lista de benchmarks que empeoraron más que el umbral"""
+    regressions = []
+    print(f"\n{'benchmark':30} {'baseline µs':>12} {'actual µs':>12} {'cambio':>9}")
+    for name, current in results['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if not previous:
+            print(f"{name:30} {'-':>12} {current['median_us']:>12.2f} {'nuevo':>9}")
+            continue
+        change = current['median_us'] / previous['median_us'] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  ⚠️ REGRESIÓN'
+            regressions.append(name)
+        print(f"{name:30} {previous['median_us']:>12.2f} {current['median_us']:>12.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks del chatbot RSC Chain')
+    parser.add_argument('--rounds', type=int, default=30, help='rondas sobre el corpus por benchmark')
+    parser.add_argument('--output', help='archivo JSON donde guardar los resultados')
+    parser.add_argument('--compare', help='archivo JSON de baseline contra el que comparar')
+    parser.add_argument('--threshold', type=float, default=0.15, help='empeoramiento tolerado (0.15 = 15%%)')
+    parser.add_argument('--skip-endpoint', action='store_true', help='omitir el benchmark extremo a extremo')
+    args = parser.parse_args()
+
+    benchmarks = microbenchmarks(args.rounds)
+    if not args.skip_endpoint:
+        benchmarks.update(endpoint_benchmark(args.rounds))
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'corpus_size': len(MESSAGES)
+        },
+        'benchmarks': benchmarks
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    else:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regresión(es): {', '.join(regressions)}")
+            sys.exit(1)
+        print('\n✅ Sin regresiones')
+
+
+if __name__ == '__main__':
+    main()
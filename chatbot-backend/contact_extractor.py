@@ -0,0 +1,113 @@
+"""
+Extracción de datos de contacto de los mensajes del chat
+Emails, nombres de usuario y direcciones de wallet en una sola pasada con una
+expresión compilada una vez y de costo lineal aunque el mensaje sea un log enorme
+"""
+import re
+from collections import namedtuple
+
+
+ContactInfo = namedtuple('ContactInfo', ['emails', 'usernames', 'wallets'])
+
+# Largo máximo de la parte local de un email (RFC 5321)
+MAX_LOCAL_LENGTH = 64
+LOCAL_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._%+-')
+
+# Largo máximo de un nombre tomado de "nombre: ..." (puede incluir espacios)
+MAX_NAME_LENGTH = 100
+
+# Las partes del email están acotadas (MAX_LOCAL_LENGTH caracteres antes de la @ y
+# 255 después, como en el RFC 5321): sin esos límites un texto largo como "a.a.a.a..." sin @
+# hace que cada posición recorra el resto del mensaje y el costo sea cuadrático.
+# Emails y nombres de usuario se capturan con lookahead, sin consumir texto, para
+# que uno no tape al otro: "usuario: pepe@mail.com" da el usuario y el email, y
+# en "ana@mail.comusuario: x" el email no se come la palabra "usuario".
+CONTACT_PATTERN = re.compile(r"""
+    (?P<wallet>\b0x[a-fA-F0-9]{40}\b)
+  | (?=(?P<email>\b[A-Za-z0-9._%+-]{1,MAX_LOCAL_LENGTH}@[A-Za-z0-9.-]{1,255}\.[A-Z|a-z]{2,}\b))
+  | (?i:usuario)[:\s]+(?=(?P<usuario>[A-Za-z0-9_]+))
+  | (?i:nombre)[:\s]+(?=(?P<nombre>[A-Za-z0-9_\s]{1,MAX_NAME_LENGTH}))
+  | (?i:username)[:\s]+(?=(?P<username>[A-Za-z0-9_]+))
+""".replace('MAX_LOCAL_LENGTH', str(MAX_LOCAL_LENGTH)).replace('MAX_NAME_LENGTH', str(MAX_NAME_LENGTH)),
+    re.VERBOSE)
+
+# Orden de preferencia del nombre de usuario cuando el mensaje trae varios
+USERNAME_GROUPS = ('usuario', 'nombre', 'username')
+
+
+class ContactExtractor:
+    """Extrae emails, nombres de usuario y wallets de uno o muchos mensajes"""
+
+    def __init__(self, pattern=CONTACT_PATTERN):
+        self.pattern = pattern
+
+    def extract(self, text):
+        """
+        Recorre el texto una vez
+
+        Returns:
+            ContactInfo: listas en orden de aparición; los nombres de usuario
+            ordenados primero por tipo ("usuario:", "nombre:", "username:")
+        """
+        emails = []
+        wallets = []
+        found = {group: [] for group in USERNAME_GROUPS}
+        email_end = 0
+        for match in self.pattern.finditer(text):
+            kind = match.lastgroup
+            if kind == 'email':
+                # Dentro de un email el lookahead vuelve a coincidir con sus sufijos: se ignoran
+                if match.start() >= email_end:
+                    email_end = match.end('email')
+                    if not self._local_part_too_long(text, match.start(), match.group('email')):
+                        emails.append(match.group('email'))
+            elif kind == 'wallet':
+                wallets.append(match.group('wallet'))
+            else:
+                value = match.group(kind).strip()
+                if value:
+                    found[kind].append(value)
+        usernames = [value for group in USERNAME_GROUPS for value in found[group]]
+        return ContactInfo(emails, usernames, wallets)
+
+    @staticmethod
+    def _local_part_too_long(text, start, email):
+        """
+        True si la parte local sigue antes de start y en total pasa del máximo
+
+        El patrón solo mira MAX_LOCAL_LENGTH caracteres antes de la @, así que
+        de una parte local más larga (inválida) encontraría un sufijo; se
+        descarta el email completo. Se retrocede como mucho MAX_LOCAL_LENGTH
+        caracteres.
+        """
+        length = email.index('@')
+        position = start - 1
+        while position >= 0 and text[position] in LOCAL_CHARS:
+            length += 1
+            if length > MAX_LOCAL_LENGTH:
+                return True
+            position -= 1
+        return False
+
+    def extract_many(self, texts):
+        """Un ContactInfo por texto"""
+        return [self.extract(text) for text in texts]
+
+    def extract_history(self, history, role='user'):
+        """
+        Junta los datos de contacto de todos los mensajes de un rol de la sesión
+
+        Returns:
+            ContactInfo: valores sin repetir, en el orden en que aparecieron
+        """
+        merged = ContactInfo([], [], [])
+        seen = (set(), set(), set())
+        for record in history:
+            if role is not None and record.role != role:
+                continue
+            for values, target, known in zip(self.extract(record.content), merged, seen):
+                for value in values:
+                    if value not in known:
+                        known.add(value)
+                        target.append(value)
+        return merged
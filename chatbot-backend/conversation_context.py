@@ -0,0 +1,148 @@
+"""
+Contexto incremental de una conversación
+Lo que el bot recuerda de los turnos anteriores (última categoría, problema
+activo, entidades mencionadas, contadores) se actualiza en O(1) por turno,
+sin volver a recorrer el historial
+"""
+import re
+
+
+# Un mensaje sin categoría hereda la anterior si llega dentro de estos turnos
+# y es corto ("y cuánto tarda?"); uno largo sin categoría es un tema nuevo
+FOLLOW_UP_TURNS = 3
+FOLLOW_UP_MAX_WORDS = 8
+
+# Veces que se reporta el mismo problema antes de pasar a soporte humano
+REPEATED_ISSUE_TURNS = 3
+
+# Direcciones, hashes de transacción y montos en RSC mencionados por el usuario
+ENTITY_PATTERN = re.compile(r"""
+    \b(?: (?P<tx_hash>0x[a-fA-F0-9]{64}) | (?P<wallet>0x[a-fA-F0-9]{40}) )\b
+  | \b(?P<amount>\d{1,12}(?:[.,]\d{1,8})?\s?(?i:rsc))\b
+""", re.VERBOSE)
+
+
+class ConversationContext:
+    """
+    Estado acumulado de la conversación de una sesión
+
+    resolve() se llama al clasificar el mensaje del turno y update() después de
+    responder; entre ambos, turn_issue indica si el mensaje del turno en curso
+    reporta un problema (no se persiste). Cuenta como reporte cualquier mensaje
+    con palabras de problema técnico aunque gane otra intención ("no funciona"
+    también es 'help').
+    """
+
+    __slots__ = ('last_category', 'active_issue', 'issue_turns', 'entities', 'turns',
+                 'category_turns', 'turns_since_category', 'turn_issue', 'locale')
+
+    def __init__(self):
+        self.last_category = None
+        self.active_issue = None  # (categoría, clave del problema o None)
+        self.issue_turns = 0  # turnos seguidos reportando el problema activo
+        self.entities = {}  # tipo -> último valor visto
+        self.turns = 0
+        self.category_turns = {}  # categoría -> turnos en que se habló de ella
+        self.turns_since_category = 0
+        self.turn_issue = False
+        self.locale = None  # idioma del último mensaje; sigue valiendo si el próximo no trae pistas
+
+    def resolve(self, classification, message_lower):
+        """Completa la clasificación del turno con el contexto (hereda la categoría en un seguimiento)"""
+        self.turn_issue = reports_issue(classification)
+        if (classification.category is None
+                and self.last_category is not None
+                and classification.intent != 'greeting'
+                and self.turns_since_category < FOLLOW_UP_TURNS
+                and len(message_lower.split()) <= FOLLOW_UP_MAX_WORDS):
+            return classification._replace(category=self.last_category)
+        return classification
+
+    def issue_for(self, category):
+        """Clave del problema activo si es de esa categoría"""
+        if self.active_issue is not None and self.active_issue[0] == category:
+            return self.active_issue[1]
+        return None
+
+    def repeated_issue(self, category):
+        """True si en este turno el usuario vuelve a reportar el mismo problema por enésima vez"""
+        return (self.turn_issue
+                and self.active_issue is not None
+                and self.active_issue[0] == category
+                and self.issue_turns + 1 >= REPEATED_ISSUE_TURNS)
+
+    def response_key(self, category):
+        """Parte de la clave de caché de respuestas que depende del contexto"""
+        if not self.turn_issue:
+            return None
+        return self.issue_for(category), self.repeated_issue(category)
+
+    def update(self, classification, issue_key, message, escalated=False):
+        """Registra el turno ya respondido (escalated: se pasó a soporte humano)"""
+        self.turns += 1
+        if classification.locale is not None:
+            self.locale = classification.locale
+        category = classification.category
+        if classification.categories:
+            self.turns_since_category = 0
+        else:
+            self.turns_since_category += 1
+        if category is not None:
+            self.last_category = category
+            self.category_turns[category] = self.category_turns.get(category, 0) + 1
+
+        if category is not None and reports_issue(classification):
+            issue = (category, issue_key or self.issue_for(category))
+            if self.active_issue is not None and self.active_issue[0] == category:
+                self.issue_turns += 1
+            else:
+                self.issue_turns = 1
+            self.active_issue = issue
+        if escalated:
+            # El problema ya quedó en manos de soporte: si vuelve a aparecer se empieza de cero
+            self.active_issue = None
+            self.issue_turns = 0
+
+        for match in ENTITY_PATTERN.finditer(message):
+            self.entities[match.lastgroup] = match.group(match.lastgroup)
+        self.turn_issue = False
+
+    def to_dict(self):
+        return {
+            'last_category': self.last_category,
+            'active_issue': list(self.active_issue) if self.active_issue else None,
+            'issue_turns': self.issue_turns,
+            'entities': dict(self.entities),
+            'turns': self.turns,
+            'category_turns': dict(self.category_turns),
+            'turns_since_category': self.turns_since_category,
+            'locale': self.locale
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        context = cls()
+        if data:
+            context.last_category = data.get('last_category')
+            active_issue = data.get('active_issue')
+            context.active_issue = tuple(active_issue) if active_issue else None
+            context.issue_turns = data.get('issue_turns', 0)
+            context.entities = dict(data.get('entities') or {})
+            context.turns = data.get('turns', 0)
+            context.category_turns = dict(data.get('category_turns') or {})
+            context.turns_since_category = data.get('turns_since_category', 0)
+            context.locale = data.get('locale')
+        return context
+
+
+def reports_issue(classification):
+    """True si el mensaje describe un problema técnico"""
+    return 'technical_issue' in classification.intents
+
+
+def session_context(session):
+    """Contexto de la sesión; se crea (o se reconstruye desde el estado guardado) la primera vez"""
+    context = session.get('context')
+    if not isinstance(context, ConversationContext):
+        context = session['context'] = ConversationContext.from_dict(context)
+    return context
@@ -0,0 +1,253 @@
+"""
+Diario de conversaciones con escritura diferida
+Los almacenes de sesiones solo agregan registros a una cola en memoria; un hilo
+los escribe en un archivo SQLite de solo inserción, un lote por transacción
+(group commit), cada flush_interval segundos o antes si se juntan batch_size
+
+Sirve como transcripción para auditorías y para reconstruir las sesiones en
+memoria al reiniciar el servidor. Si el proceso muere de golpe se pierden como
+mucho los registros de los últimos flush_interval segundos (más el lote que se
+estaba escribiendo); al terminar normalmente stop() escribe todo lo pendiente.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import closing
+
+from metrics import Histogram
+
+
+FLUSH_SECONDS = Histogram(
+    'chatbot_journal_flush_seconds',
+    'Duración de cada escritura de un lote del diario de conversaciones'
+)
+
+# Tipos de registro: un mensaje, el estado de la sesión (JSON sin los mensajes)
+# o un reinicio (sesión nueva o eliminada: lo anterior ya no forma parte de ella)
+MESSAGE = 'message'
+STATE = 'state'
+RESET = 'reset'
+
+RestoredSession = namedtuple('RestoredSession', ['session_id', 'state', 'messages', 'last_activity'])
+
+
+class ConversationJournal:
+    """Cola de registros de conversación con un hilo que los escribe en lotes"""
+
+    def __init__(self, path, flush_interval=0.5, batch_size=500, max_pending=100000,
+                 max_backoff=30):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending  # por encima de esto los registros nuevos se descartan
+        self.max_backoff = max_backoff
+        # Registros (session_id, kind, role, content, created) como tuplas simples;
+        # deque.append es atómico, así que registrar no toma ningún lock
+        self._pending = deque()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._conn = None
+        self._conn_pid = None
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_flush_ms = 0.0
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS journal (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    role TEXT,
+                    content TEXT NOT NULL,
+                    created REAL NOT NULL
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS journal_session ON journal(session_id, seq)')
+            conn.execute('CREATE INDEX IF NOT EXISTS journal_created ON journal(created)')
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record_message(self, session_id, role, content, created):
+        self._record((session_id, MESSAGE, role, content, created))
+
+    def record_state(self, session_id, state):
+        """state: estado de la sesión ya serializado en JSON"""
+        self._record((session_id, STATE, None, state, time.time()))
+
+    def record_reset(self, session_id):
+        self._record((session_id, RESET, None, '', time.time()))
+
+    def flush(self):
+        """Escribe ya todo lo pendiente (desde el hilo que llama); devuelve cuántos registros escribió"""
+        written = 0
+        with self._flush_lock:
+            while self._pending:
+                batch = []
+                while self._pending and len(batch) < self.batch_size:
+                    batch.append(self._pending.popleft())
+                try:
+                    self._write(batch)
+                except sqlite3.Error:
+                    # Se devuelven al frente de la cola en el mismo orden y se reintenta después
+                    self._pending.extendleft(reversed(batch))
+                    raise
+                written += len(batch)
+        return written
+
+    def stop(self, timeout=10):
+        """Detiene el hilo escritor después de escribir lo pendiente"""
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid():
+            self._stopping.set()
+            self._wake.set()
+            thread.join(timeout)
+        if self._pending and self._conn_pid == os.getpid():
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"❌ No se pudo escribir el diario de conversaciones: {str(e)}")
+
+    def stats(self):
+        return {
+            'pending': len(self._pending),
+            'written': self.written,
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'errors': self.errors,
+            'last_flush_ms': round(self.last_flush_ms, 2),
+            'flush_interval': self.flush_interval
+        }
+
+    def load_sessions(self, ttl_seconds, max_sessions, max_messages, now=None):
+        """
+        Reconstruye las sesiones que seguían activas
+
+        Returns:
+            list[RestoredSession]: de la menos a la más reciente, como mucho
+            max_sessions, cada una con sus últimos max_messages mensajes
+            ([(rol, contenido, created)]) y su último estado en JSON (o None)
+        """
+        if now is None:
+            now = time.time()
+        with closing(self._read_connection()) as conn:
+            return self._load_sessions(conn, now - ttl_seconds, max_sessions, max_messages)
+
+    def transcript(self, session_id):
+        """Todos los mensajes guardados de una sesión, para auditoría: [(rol, contenido, created)]"""
+        with closing(self._read_connection()) as conn:
+            return conn.execute(
+                'SELECT role, content, created FROM journal WHERE session_id = ? AND kind = ? ORDER BY seq',
+                (session_id, MESSAGE)
+            ).fetchall()
+
+    def _load_sessions(self, conn, cutoff, max_sessions, max_messages):
+        active = conn.execute("""
+            SELECT session_id, MAX(created) AS last_activity FROM journal
+            WHERE created >= ?
+            GROUP BY session_id
+            ORDER BY last_activity DESC
+            LIMIT ?
+        """, (cutoff, max_sessions)).fetchall()
+
+        sessions = []
+        for session_id, last_activity in reversed(active):
+            reset = conn.execute(
+                'SELECT COALESCE(MAX(seq), 0) FROM journal WHERE session_id = ? AND kind = ?',
+                (session_id, RESET)
+            ).fetchone()[0]
+            state = conn.execute("""
+                SELECT content FROM journal WHERE session_id = ? AND kind = ? AND seq > ?
+                ORDER BY seq DESC LIMIT 1
+            """, (session_id, STATE, reset)).fetchone()
+            messages = conn.execute("""
+                SELECT role, content, created FROM (
+                    SELECT seq, role, content, created FROM journal
+                    WHERE session_id = ? AND kind = ? AND seq > ?
+                    ORDER BY seq DESC LIMIT ?
+                ) ORDER BY seq
+            """, (session_id, MESSAGE, reset, max_messages)).fetchall()
+            if state is None and not messages:
+                continue  # la sesión se eliminó o se reinició sin actividad posterior
+            sessions.append(RestoredSession(session_id, state[0] if state else None, messages, last_activity))
+        return sessions
+
+    def _record(self, entry):
+        if len(self._pending) >= self.max_pending:
+            # El disco no da abasto: se prefiere perder registros del diario a frenar el chat
+            self.dropped += 1
+            return
+        self._ensure_started()
+        self._pending.append(entry)
+        if len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    def _after_fork(self):
+        # El hilo y la conexión del proceso padre no existen en el hijo, y lo
+        # pendiente lo escribe el padre
+        self._thread = None
+        self._pending = deque()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Camino rápido sin llamadas al sistema: se llama en cada registro
+        if self._thread is not None and not self._stopping.is_set():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._stopping.clear()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='conversation-journal', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        backoff = self.flush_interval
+        while not self._stopping.is_set():
+            self._wake.wait(backoff)
+            self._wake.clear()
+            try:
+                self.flush()
+                backoff = self.flush_interval
+            except sqlite3.Error as e:
+                self.errors += 1
+                print(f"❌ Error escribiendo el diario de conversaciones: {str(e)}")
+                backoff = min(max(backoff, 0.5) * 2, self.max_backoff)
+
+    def _write(self, batch):
+        started = time.monotonic()
+        with self._connection() as conn:
+            conn.executemany(
+                'INSERT INTO journal (session_id, kind, role, content, created) VALUES (?, ?, ?, ?, ?)',
+                batch
+            )
+        elapsed = time.monotonic() - started
+        FLUSH_SECONDS.observe(elapsed)
+        self.last_flush_ms = elapsed * 1000
+        self.written += len(batch)
+        self.batches += 1
+
+    def _read_connection(self):
+        # Las lecturas usan su propia conexión para no mezclarse con la transacción del escritor
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _connection(self):
+        # Las conexiones no sobreviven a un fork; las escrituras se serializan con _flush_lock
+        if self._conn is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=5000')
+            self._conn = conn
+            self._conn_pid = os.getpid()
+        return self._conn
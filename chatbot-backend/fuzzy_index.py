@@ -0,0 +1,191 @@
+"""
+Corrección de errores de escritura para RSC Chain Chatbot
+Un índice de trigramas propone candidatos y una distancia de edición acotada
+los confirma, sin comparar cada palabra contra todo el vocabulario
+"""
+import re
+from collections import defaultdict
+
+from rsc_knowledge import normalize_text
+
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Las palabras más cortas no se corrigen ni son destino de una corrección: con 4
+# letras casi todo está a distancia 1 de otra palabra real ("rojo" -> "roto", "casa" -> "cada")
+MIN_WORD_LENGTH = 5
+
+# Terminaciones que separan formas de una misma palabra ("bloque"/"bloquea",
+# "contraseña"/"contraseñas", "sale"/"salen"): esas diferencias no son errores
+INFLECTION_SUFFIXES = frozenset([
+    'a', 'o', 'e', 's', 'n', 'r', 'd',
+    'as', 'os', 'es', 'an', 'en', 'ar', 'er', 'ir', 'ed'
+])
+
+
+def max_distance(word):
+    """Errores tolerados según la longitud de la palabra"""
+    return 1 if len(word) <= 7 else 2
+
+
+def is_inflection(word, term):
+    """True si word y term parecen formas de la misma palabra ("bloquea"/"bloques", "sola"/"solo")"""
+    common = 0
+    for a, b in zip(word, term):
+        if a != b:
+            break
+        common += 1
+    if common < 3:
+        return False
+    endings = (word[common:], term[common:])
+    return all(not ending or ending in INFLECTION_SUFFIXES for ending in endings)
+
+
+def trigrams(word):
+    padded = f'^{word}$'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_edit_distance(a, b, limit):
+    """
+    Distancia de edición (con transposiciones) entre a y b, o limit + 1 si la supera
+
+    Solo se calcula la banda de ancho 2 * limit + 1 alrededor de la diagonal y se
+    abandona en cuanto una fila completa pasa del límite.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    too_far = limit + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [too_far] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        low = max(1, i - limit)
+        high = min(len(b), i + limit)
+        row_min = current[0]
+        for j in range(low, high + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and j > 1 and a[i - 1] == b[j - 2]
+                    and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return too_far
+        previous_previous, previous = previous, current
+    return min(previous[len(b)], too_far)
+
+
+class FuzzyMatcher:
+    """
+    Corrige palabras desconocidas hacia el vocabulario conocido
+
+    El vocabulario son los términos a los que se puede corregir, tal como se
+    escriben en la base de conocimiento y en las palabras clave (con acentos).
+    known son otras palabras válidas (palabras vacías, textos de respuesta) que
+    nunca se corrigen ni son destino de una corrección. Una palabra del mensaje
+    que ya es válida, con o sin acentos, no se toca; si no lo es, se prueba
+    primero sin acentos ("mineria" -> "minería") y después con el índice de
+    trigramas ("walet" -> "wallet", "funsiona" -> "funciona"). Las otras formas
+    de un término ("bloquea" para "bloque") tampoco se corrigen.
+    """
+
+    def __init__(self, vocabulary, known=(), version=0, cache_size=10000):
+        self.version = version  # versión de la base de conocimiento de la que sale el vocabulario
+        self.words = set(known)
+        self.known_normalized = {normalize_text(word) for word in known}
+        self.by_normalized = {}  # forma sin acentos -> forma escrita
+        for word in vocabulary:
+            self.words.add(word)
+            if len(word) >= MIN_WORD_LENGTH:
+                self.by_normalized.setdefault(normalize_text(word), word)
+
+        self.terms = sorted(self.by_normalized)
+        self.postings = defaultdict(list)  # trigrama -> [índice del término]
+        for term_id, term in enumerate(self.terms):
+            for gram in trigrams(term):
+                self.postings[gram].append(term_id)
+        self.postings = dict(self.postings)
+
+        self.cache_size = cache_size
+        self._cache = {}
+        self.corrections = 0
+
+    def correct(self, text):
+        """Devuelve el texto (ya en minúsculas) con las palabras mal escritas corregidas"""
+        changed = False
+        parts = []
+        position = 0
+        for match in WORD_PATTERN.finditer(text):
+            word = match.group()
+            if word in self.words or len(word) < MIN_WORD_LENGTH or word.isdigit():
+                continue
+            replacement = self.match(word)
+            if replacement is None:
+                continue
+            parts.append(text[position:match.start()])
+            parts.append(replacement)
+            position = match.end()
+            changed = True
+        if not changed:
+            return text
+        parts.append(text[position:])
+        return ''.join(parts)
+
+    def match(self, word):
+        """Palabra del vocabulario más parecida a word, o None"""
+        cached = self._cache.get(word, False)
+        if cached is not False:
+            return cached
+        result = self._match(word)
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[word] = result
+        if result is not None:
+            self.corrections += 1
+        return result
+
+    def _match(self, word):
+        normalized = normalize_text(word)
+        exact = self.by_normalized.get(normalized)
+        if exact is not None:
+            return exact
+        if normalized in self.known_normalized:
+            # Palabra válida escrita sin acentos ("esta", "cuanto"): se deja como está
+            return None
+
+        limit = max_distance(normalized)
+        grams = trigrams(normalized)
+        shared = defaultdict(int)
+        for gram in grams:
+            for term_id in self.postings.get(gram, ()):
+                shared[term_id] += 1
+
+        # Cada edición destruye como mucho 3 trigramas
+        min_shared = max(1, len(grams) - 3 * limit)
+        candidates = sorted(
+            (count, term_id) for term_id, count in shared.items()
+            if count >= min_shared
+        )
+        best = None
+        best_key = None
+        for count, term_id in reversed(candidates):
+            term = self.terms[term_id]
+            # Casi nunca se equivoca la primera letra; exigirla evita correcciones absurdas
+            if term[0] != normalized[0] or abs(len(term) - len(normalized)) > limit:
+                continue
+            if is_inflection(normalized, term):
+                continue
+            distance = bounded_edit_distance(normalized, term, limit)
+            if distance > limit:
+                continue
+            key = (distance, -count, term)
+            if best_key is None or key < best_key:
+                best, best_key = term, key
+        return self.by_normalized[best] if best is not None else None
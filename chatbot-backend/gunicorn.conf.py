@@ -0,0 +1,63 @@
+"""
+Configuración de producción de gunicorn para el chatbot
+
+Uso:
+    gunicorn -c gunicorn.conf.py
+
+El proceso maestro importa app.py una sola vez (preload_app): construye la base
+de conocimiento, el índice, las tablas de respuestas, el corrector y el resto
+de los componentes, los calienta con warm_up() y congela el heap con
+gc.freeze() antes de crear los workers con fork. Los workers comparten esas
+páginas de solo lectura (copy-on-write) en lugar de tener cada uno su copia.
+
+Reinicios sin cortar conexiones:
+    kill -HUP <pid del maestro>   # workers nuevos desde el maestro ya caliente;
+                                  # los viejos terminan sus peticiones primero
+    kill -TTIN / -TTOU <pid>      # un worker más / uno menos
+Con preload_app el código de la aplicación no se recarga con HUP: para
+desplegar una versión nueva hay que reiniciar el maestro (o USR2 + QUIT).
+"""
+import gc
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+# Las variables de .env tienen que estar cargadas antes de leer la configuración
+load_dotenv()
+
+wsgi_app = 'app:app'
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', 5000)}")
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+# GUNICORN_PRELOAD=false carga la aplicación en cada worker (solo para comparar memoria)
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() != 'false'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# Reciclar cada worker tras N peticiones (0 = nunca); el reemplazo nace del maestro ya caliente
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max(1, max_requests // 10) if max_requests else 0
+
+# Sin recolecciones en el maestro mientras se carga la aplicación: así no quedan
+# huecos de objetos liberados repartidos por las páginas que se van a compartir
+if preload_app:
+    gc.disable()
+
+
+def when_ready(server):
+    """En el maestro, con la aplicación ya cargada y antes de crear los workers"""
+    if not preload_app:
+        return
+    import app
+
+    elapsed = app.warm_up()
+    # Todo lo que existe ahora pasa a la generación permanente: el recolector de
+    # los workers no lo recorre, así que no escribe en esas páginas compartidas
+    gc.collect()
+    gc.freeze()
+    server.log.info('🔥 Aplicación precalentada en %.0f ms, %d objetos congelados',
+                    elapsed * 1000, gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    # Cada worker vuelve a recolectar basura normalmente (solo sus propios objetos)
+    gc.enable()
@@ -0,0 +1,133 @@
+"""
+Exportación completa de la base de conocimiento
+El JSON se serializa y se comprime con gzip una sola vez por contenido; las
+peticiones solo comparan el ETag y devuelven los bytes ya preparados (o un 304)
+"""
+import gzip
+import hashlib
+import json
+import threading
+from collections import namedtuple
+
+
+ExportPayload = namedtuple('ExportPayload', ['content_hash', 'etag', 'gzip_etag', 'body', 'gzip_body'])
+
+CONTENT_TYPE = 'application/json; charset=utf-8'
+
+
+def parse_if_none_match(header):
+    """Etiquetas de un encabezado If-None-Match, sin el prefijo W/ ('*' se conserva)"""
+    if not header:
+        return set()
+    tags = set()
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag:
+            tags.add(tag)
+    return tags
+
+
+def accepts_gzip(header):
+    """True si Accept-Encoding acepta gzip (y no lo excluye con q=0)"""
+    if not header:
+        return False
+    for coding in header.split(','):
+        name, _, params = coding.partition(';')
+        if name.strip().lower() not in ('gzip', '*'):
+            continue
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def build_payload(knowledge_base):
+    """Serializa y comprime el contenido actual de la base de conocimiento"""
+    # El hash se lee antes que el contenido: si cambia mientras se serializa,
+    # la próxima petición ve otro hash y vuelve a generar el payload
+    content_hash = knowledge_base.content_hash
+    content = knowledge_base.knowledge_base
+    body = json.dumps({
+        'content_hash': content_hash,
+        'total_topics': len(content),
+        'categories': list(content.keys()),
+        'knowledge': content
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    # mtime=0 hace que la compresión sea determinista entre procesos
+    gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+    return ExportPayload(content_hash, f'"{digest}"', f'"{digest}-gzip"', body, gzip_body)
+
+
+class KnowledgeExport:
+    """
+    Payload de /api/chatbot/knowledge/export para la versión vigente del conocimiento
+
+    Se regenera solo cuando cambia el hash del contenido (recarga o snapshot
+    nuevo); una recarga con el mismo contenido conserva el ETag. Cada
+    representación tiene su propio ETag (el comprimido termina en -gzip) y
+    cualquiera de los dos en If-None-Match produce un 304.
+    """
+
+    def __init__(self, knowledge_base, max_age=60):
+        self.knowledge_base = knowledge_base
+        self.max_age = max_age
+        self._payload = None
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.not_modified = 0
+        self.served = 0
+
+    def payload(self):
+        payload = self._payload
+        if payload is not None and payload.content_hash == self.knowledge_base.content_hash:
+            return payload
+        with self._lock:
+            payload = self._payload
+            if payload is None or payload.content_hash != self.knowledge_base.content_hash:
+                payload = self._payload = build_payload(self.knowledge_base)
+                self.builds += 1
+        return payload
+
+    def respond(self, if_none_match=None, accept_encoding=None):
+        """
+        Resuelve una petición GET
+
+        Returns:
+            tuple: (estado, encabezados, cuerpo en bytes)
+        """
+        payload = self.payload()
+        use_gzip = accepts_gzip(accept_encoding)
+        headers = {
+            'ETag': payload.gzip_etag if use_gzip else payload.etag,
+            'Cache-Control': f'public, max-age={self.max_age}',
+            'Vary': 'Accept-Encoding'
+        }
+        tags = parse_if_none_match(if_none_match)
+        if '*' in tags or payload.etag in tags or payload.gzip_etag in tags:
+            self.not_modified += 1
+            return 304, headers, b''
+
+        self.served += 1
+        headers['Content-Type'] = CONTENT_TYPE
+        if use_gzip:
+            headers['Content-Encoding'] = 'gzip'
+            return 200, headers, payload.gzip_body
+        return 200, headers, payload.body
+
+    def stats(self):
+        payload = self._payload
+        return {
+            'builds': self.builds,
+            'served': self.served,
+            'not_modified': self.not_modified,
+            'etag': payload.etag if payload else None,
+            'bytes': len(payload.body) if payload else 0,
+            'gzip_bytes': len(payload.gzip_body) if payload else 0
+        }
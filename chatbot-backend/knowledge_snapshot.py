@@ -0,0 +1,219 @@
+"""
+Snapshots precompilados de la base de conocimiento
+
+Un snapshot guarda, para cada idioma, el contenido y el índice de búsqueda
+ya construido (postings y longitudes de las entradas), de modo que un worker
+arranca sin tokenizar el conocimiento y el contenido puede cambiarse sin
+tocar código ni reiniciar procesos. Es JSON: cargarlo no ejecuta código,
+aunque la ruta venga de la configuración. Cada proceso arma su propia copia
+en memoria (no se comparte entre workers salvo por el fork de gunicorn con
+preload_app).
+
+Uso:
+    # Exportar el contenido actual de todos los idiomas a JSON para editarlo
+    python knowledge_snapshot.py export --output knowledge.json
+
+    # Compilar el snapshot (desde el JSON editado o, sin --source, desde locales/)
+    python knowledge_snapshot.py build --source knowledge.json --output knowledge.snapshot
+
+Con KNOWLEDGE_SNAPSHOT=knowledge.snapshot la app carga el snapshot al arrancar
+y lo recarga en caliente cuando el archivo se reemplaza. La matriz TF-IDF
+(RETRIEVAL_MODE=tfidf) no viaja en el snapshot: se construye en warm_up.
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+from locales import LOCALES
+from rsc_knowledge import KnowledgeIndex, KnowledgeState, RSCKnowledgeBase, collect_entries
+
+
+SNAPSHOT_FORMAT = 4
+
+
+def compile_snapshot(knowledge_bases, path):
+    """
+    Construye el estado de cada idioma y lo escribe de forma atómica en path
+
+    knowledge_bases: {idioma: contenido}
+
+    Returns:
+        dict: el snapshot escrito, con los estados construidos en 'states'
+    """
+    states = {locale: KnowledgeState(content) for locale, content in knowledge_bases.items()}
+    payload = {
+        'format': SNAPSHOT_FORMAT,
+        'created_at': datetime.now().isoformat(),
+        'locales': {
+            locale: {
+                'content_hash': state.content_hash,
+                'knowledge_base': state.knowledge_base,
+                'postings': state.index.postings,
+                'doc_lengths': state.index.doc_lengths
+            }
+            for locale, state in states.items()
+        }
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.knowledge-', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        # os.replace es atómico: los lectores ven el archivo viejo o el nuevo, nunca uno a medias
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    payload['states'] = states
+    return payload
+
+
+def load_snapshot(path):
+    """
+    Lee un snapshot y arma el estado de cada idioma sin reconstruir los índices
+
+    Returns:
+        dict: el snapshot, con {idioma: KnowledgeState} en 'states'
+    """
+    with open(path, encoding='utf-8') as f:
+        payload = json.load(f)
+    if not isinstance(payload, dict) or payload.get('format') != SNAPSHOT_FORMAT:
+        found = payload.get('format') if isinstance(payload, dict) else None
+        raise ValueError(f"Formato de snapshot no soportado: {found}")
+    states = {}
+    for locale, data in payload['locales'].items():
+        if locale not in LOCALES:
+            raise ValueError(f'Idioma no soportado en el snapshot: {locale}')
+        postings = {
+            term: [(entry_id, frequency) for entry_id, frequency in posting]
+            for term, posting in data['postings'].items()
+        }
+        index = KnowledgeIndex(collect_entries(data['knowledge_base']), postings=postings,
+                               doc_lengths=data['doc_lengths'])
+        state = KnowledgeState(data['knowledge_base'], index=index)
+        if state.content_hash != data['content_hash']:
+            raise ValueError(f'El contenido del snapshot ({locale}) no coincide con su hash')
+        states[locale] = state
+    payload['states'] = states
+    return payload
+
+
+class SnapshotWatcher:
+    """
+    Vigila el archivo de snapshot y publica los nuevos estados cuando cambia
+
+    on_reload recibe {idioma: KnowledgeState} (RSCAI.swap_knowledge);
+    content_hashes son los del snapshot que ya se cargó al arrancar.
+    """
+
+    def __init__(self, path, on_reload, interval=5.0, content_hashes=None):
+        self.path = path
+        self.on_reload = on_reload
+        self.interval = interval
+        self.content_hashes = dict(content_hashes or {})
+        self.reloads = 0
+        self.errors = 0
+        self.loaded_at = None
+        self._stamp = self._file_stamp()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        """Arranca el hilo de vigilancia en este proceso (también después de un fork)"""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='knowledge-watcher', daemon=True)
+                self._thread.start()
+
+    def check(self):
+        """Recarga el snapshot si el archivo cambió; devuelve True si se recargó"""
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        try:
+            payload = load_snapshot(self.path)
+        except Exception as e:
+            # Se reintenta en la próxima revisión; mientras tanto sigue el estado anterior
+            self.errors += 1
+            print(f"❌ Error cargando snapshot de conocimiento: {str(e)}")
+            return False
+        states = payload['states']
+        self.on_reload(states)
+        self.content_hashes = {locale: state.content_hash for locale, state in states.items()}
+        self._stamp = stamp
+        self.reloads += 1
+        self.loaded_at = datetime.now().isoformat()
+        print(f"🔄 Base de conocimiento recargada ({', '.join(sorted(states))})")
+        return True
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'reloads': self.reloads,
+            'errors': self.errors,
+            'content_hashes': dict(self.content_hashes),
+            'loaded_at': self.loaded_at
+        }
+
+    def _run(self):
+        stop = threading.Event()
+        while not stop.wait(self.interval):
+            self.check()
+
+    def _file_stamp(self):
+        try:
+            info = os.stat(self.path)
+        except OSError:
+            return None
+        return (info.st_ino, info.st_size, info.st_mtime_ns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Snapshots de la base de conocimiento de RSC Chain')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help='exportar el contenido de locales/ a JSON ({idioma: contenido})')
+    export.add_argument('--output', default='knowledge.json')
+
+    build = commands.add_parser('build', help='compilar un snapshot')
+    build.add_argument('--source', help='JSON con el contenido de cada idioma (por defecto, el de locales/)')
+    build.add_argument('--output', default='knowledge.snapshot')
+
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(default_knowledge_bases(), f, indent=2, ensure_ascii=False)
+        print(f"✅ Contenido exportado a {args.output}")
+        return
+
+    if args.source:
+        with open(args.source, encoding='utf-8') as f:
+            knowledge_bases = json.load(f)
+    else:
+        knowledge_bases = default_knowledge_bases()
+    payload = compile_snapshot(knowledge_bases, args.output)
+    for locale, state in payload['states'].items():
+        print(f"✅ {locale}: {len(state.index.entries)} entradas, "
+              f"{len(state.index.postings)} términos, hash {state.content_hash[:12]}")
+    print(f"✅ Snapshot escrito en {args.output}")
+
+
+def default_knowledge_bases():
+    """Contenido de cada idioma de locales/"""
+    return {locale: RSCKnowledgeBase(locale=locale).knowledge_base for locale in LOCALES}
+
+
+if __name__ == '__main__':
+    main()
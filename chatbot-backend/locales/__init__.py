@@ -0,0 +1,130 @@
+"""
+Paquetes de idioma del chatbot
+Cada módulo (es, en) trae el contenido de la base de conocimiento, las
+palabras clave, los patrones de problemas y los textos de respuesta de un
+idioma. Solo se importa el paquete de los idiomas que se usan, y el modelo
+armado con él (índice, tablas de respuestas, corrector) vive en un LocaleCache
+que lo construye la primera vez que llega un mensaje en ese idioma y lo
+libera cuando deja de usarse.
+"""
+import importlib
+import threading
+import time
+
+
+DEFAULT_LOCALE = 'es'
+LOCALES = ('es', 'en')
+
+
+def load_pack(code):
+    """Módulo con el contenido del idioma (locales/<code>.py)"""
+    if code not in LOCALES:
+        raise ValueError(f'Idioma no soportado: {code}')
+    return importlib.import_module(f'{__name__}.{code}')
+
+
+class LocaleCache:
+    """
+    Modelos por idioma construidos bajo demanda
+
+    Se mantienen como mucho max_loaded modelos; al pasar el límite se libera el
+    usado hace más tiempo y un modelo sin uso durante idle_seconds también se
+    libera. Los idiomas de pinned (el idioma por defecto) no se liberan nunca.
+    Las peticiones que ya tenían el modelo lo siguen usando hasta terminar.
+    """
+
+    def __init__(self, loader, max_loaded=3, idle_seconds=600, pinned=()):
+        self.loader = loader  # code -> modelo del idioma
+        self.max_loaded = max(1, max_loaded)
+        self.idle_seconds = idle_seconds
+        self.pinned = frozenset(pinned)
+        self._models = {}  # code -> modelo
+        self._last_used = {}
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + idle_seconds if idle_seconds else None
+        self.loads = 0
+        self.evictions = 0
+        self.load_seconds = {}  # code -> duración de la última construcción
+
+    def get(self, code):
+        """Modelo del idioma; lo construye si no está cargado"""
+        now = time.monotonic()
+        if self._next_sweep is not None and now >= self._next_sweep:
+            self.evict_idle(now)
+        model = self._models.get(code)
+        if model is not None:
+            self._last_used[code] = now
+            return model
+
+        with self._lock:
+            model = self._models.get(code)
+            if model is None:
+                # Se construye con el lock tomado: dos peticiones simultáneas en un
+                # idioma nuevo no lo arman dos veces
+                started = time.perf_counter()
+                model = self.loader(code)
+                self.load_seconds[code] = time.perf_counter() - started
+                self.loads += 1
+                self._insert(code, model, now)
+            else:
+                self._last_used[code] = now
+        return model
+
+    def put(self, code, model):
+        """Registra un modelo ya construido (el del idioma por defecto)"""
+        with self._lock:
+            self._insert(code, model, time.monotonic())
+
+    def evict_idle(self, now=None):
+        """Libera los modelos sin uso durante idle_seconds"""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            if self.idle_seconds:
+                self._next_sweep = now + self.idle_seconds
+            for code in list(self._models):
+                if code not in self.pinned and now - self._last_used.get(code, now) >= self.idle_seconds:
+                    self._evict(code)
+
+    def loaded(self):
+        return list(self._models)
+
+    def models(self):
+        """Modelos cargados ({code: modelo}) sin marcarlos como usados"""
+        return dict(self._models)
+
+    def stats(self):
+        now = time.monotonic()
+        return {
+            'loaded': {
+                code: round(now - self._last_used.get(code, now), 1) for code in self._models
+            },
+            'pinned': sorted(self.pinned),
+            'max_loaded': self.max_loaded,
+            'idle_seconds': self.idle_seconds,
+            'loads': self.loads,
+            'evictions': self.evictions,
+            'load_ms': {code: round(seconds * 1000, 1) for code, seconds in self.load_seconds.items()}
+        }
+
+    def _insert(self, code, model, now):
+        # Se publica un diccionario nuevo: get() lee self._models sin tomar el lock
+        models = dict(self._models)
+        models[code] = model
+        self._last_used[code] = now
+        while len(models) > self.max_loaded:
+            candidates = [name for name in models if name not in self.pinned and name != code]
+            if not candidates:
+                break
+            victim = min(candidates, key=lambda name: self._last_used.get(name, 0))
+            del models[victim]
+            self._last_used.pop(victim, None)
+            self.evictions += 1
+        self._models = models
+
+    def _evict(self, code):
+        models = dict(self._models)
+        del models[code]
+        self._last_used.pop(code, None)
+        self.evictions += 1
+        self._models = models
@@ -0,0 +1,414 @@
+"""
+Paquete de idioma: inglés
+Contenido de la base de conocimiento, palabras clave, patrones de problemas y
+textos de respuesta del chatbot en inglés (misma estructura que locales/es.py)
+"""
+
+
+def build_knowledge_base():
+    """Construye la base de conocimiento completa"""
+    return {
+        'general': {
+            'rsc_chain': {
+                'description': """RSC Chain is a next-generation blockchain that combines the best features of Proof of Work (PoW), Proof of Stake (PoS) and Artificial Intelligence (AI). It is a decentralized platform that offers fast transactions, quantum security and true decentralization.""",
+                'features': [
+                    'Ultra-fast transactions (10,000+ TPS)',
+                    'Quantum-resistant security',
+                    'Hybrid PoW + PoS + AI consensus',
+                    'No ICO or pre-sale',
+                    'Fair distribution through web mining',
+                    'Decentralized network with 99.99% uptime'
+                ],
+                'tech_specs': {
+                    'tps': '10,000+ transactions per second',
+                    'finality': '1.8 seconds',
+                    'security': '512-bit, Quantum Safe',
+                    'uptime': '99.99%',
+                    'total_supply': '2.1M RSC tokens total supply',
+                    'burned': '50% already burned (1.05M RSC in circulation)'
+                }
+            },
+            'what_is': """RSC Chain is a revolutionary blockchain that uses cutting-edge technology to offer:
+• Web mining from any browser
+• Advanced staking system with validators
+• Decentralized P2P trading
+• Secure non-custodial wallet
+• Full blockchain explorer
+• No need for KYC or traditional banks"""
+        },
+
+        'mining': {
+            'how_to_start': """To start mining RSC Chain:
+1. Go to the Mining page (pages/mine.html)
+2. Click "Start Mining"
+3. The system will automatically start a 24-hour session
+4. Your rewards accumulate during the session
+5. You can claim your rewards when the session ends
+
+Mining is completely web-based, you don't need to install any software.""",
+
+            'session_duration': """Each mining session lasts exactly 24 hours. Once it ends, you must wait for a cooldown period before starting a new session.""",
+
+            'rewards': """Mining rewards are calculated automatically and distributed at the end of each 24-hour session. The system is fully automatic and requires no manual intervention.""",
+
+            'troubleshooting': {
+                'cannot_start': """If you can't start mining:
+• Check that your previous session has fully ended
+• Make sure you are not in the cooldown period
+• Clear your browser cache and reload the page
+• Check your internet connection
+• If the problem persists, contact support""",
+
+                'no_rewards': """If you are not receiving rewards:
+• Check that you completed a full 24-hour session
+• Make sure you started mining correctly
+• Review your session history on the Mining page
+• Wait a few minutes after the session ends
+• Contact support if the problem persists"""
+            },
+
+            'tips': """Tips to get the most out of mining:
+• Keep the browser open for the full 24 hours
+• Use a stable internet connection
+• Don't close the browser tab while mining
+• Check your session status regularly
+• Claim your rewards as soon as they are available"""
+        },
+
+        'wallet': {
+            'creation': """To create a wallet on RSC Chain:
+1. Go to the Wallet page (pages/wallet.html)
+2. Click "Create Wallet"
+3. Carefully store your private key
+4. Store your mnemonic phrase if one is provided
+5. Never share your private key with anyone
+
+IMPORTANT: Your wallet is non-custodial, only you have access to your funds.""",
+
+            'security': """Wallet security:
+• Private keys NEVER leave your browser
+• Keep your private key in a safe place
+• Consider using a password manager
+• Back up your private key in several safe places
+• Never share your private key by email, message or social media
+• Always check that you are on the official RSC Chain site""",
+
+            'balance': """To check your balance:
+1. Go to the Wallet page
+2. Enter your wallet address
+3. The system automatically looks up your balance on the blockchain
+4. Your balance updates in real time""",
+
+            'send_transaction': """To send a transaction:
+1. Go to the "Send" section of your wallet
+2. Enter the destination address
+3. Enter the amount of RSC to send
+4. Review the details carefully
+5. Confirm the transaction
+6. Wait for the confirmation on the blockchain (1.8 seconds on average)""",
+
+            'troubleshooting': {
+                'cannot_create': """If you can't create a wallet:
+• Check that your browser supports JavaScript
+• Make sure you are connected to the internet
+• Try another browser (Chrome, Firefox, Edge)
+• Clear your browser cache
+• Contact support if the problem persists""",
+
+                'wrong_balance': """If your balance is wrong:
+• Wait a few seconds and reload the page
+• Check that you are using the correct address
+• Make sure your transactions have been confirmed
+• Look up your transactions in the Explorer
+• If the problem persists, contact support"""
+            }
+        },
+
+        'staking': {
+            'what_is': """Staking on RSC Chain lets you:
+• Delegate your RSC tokens to validators
+• Earn passive rewards for helping secure the network
+• Contribute to the decentralization of the network
+• Withdraw your tokens whenever you want (no lock period)""",
+
+            'how_to_stake': """To stake:
+1. Go to the Staking page (pages/staking.html)
+2. Review the available staking pools
+3. Select a validator or pool
+4. Enter the amount of RSC to delegate
+5. Confirm the delegation
+6. Your rewards start accumulating automatically""",
+
+            'strategies': """Staking strategies:
+• Diversification: delegating to several validators reduces risk
+• Active validators: choose validators with a good track record
+• Rewards: compare reward rates between validators
+• Decentralization: support smaller validators to help decentralize the network""",
+
+            'rewards': """Staking rewards:
+• Are calculated automatically
+• Depend on the validator and the delegated amount
+• Are distributed periodically
+• Can be withdrawn whenever you want""",
+
+            'troubleshooting': {
+                'cannot_delegate': """If you can't delegate:
+• Check that you have enough RSC tokens
+• Make sure you are connected to the internet
+• Check that the validator is active
+• Reload the page and try again""",
+
+                'no_rewards': """If you are not receiving staking rewards:
+• Check that you delegated correctly
+• Make sure the validator is active
+• Wait for the reward distribution period
+• Review your delegation history
+• Contact support if the problem persists"""
+            }
+        },
+
+        'p2p': {
+            'what_is': """P2P Trading on RSC Chain lets you:
+• Exchange RSC tokens in a decentralized way
+• Create and answer buy/sell listings
+• Make safe trades with an escrow system
+• Talk directly with other traders""",
+
+            'how_to_trade': """To use P2P Trading:
+1. Go to the P2P page (pages/p2p.html)
+2. Browse the available listings
+3. Create your own listing if you want to buy or sell
+4. Answer the listings you are interested in
+5. Complete the trade following the instructions
+6. The escrow system keeps the funds safe until the trade is complete""",
+
+            'safety': """P2P Trading safety:
+• Always use the escrow system
+• Check the trader's reputation
+• Communicate clearly before starting a trade
+• Never share your private key
+• Report any suspicious activity"""
+        },
+
+        'explorer': {
+            'features': """The RSC Chain Explorer lets you:
+• See transactions in real time
+• Browse the blocks of the blockchain
+• Look up wallet addresses
+• See network statistics
+• Analyze the growth of the blockchain""",
+
+            'how_to_use': """To use the Explorer:
+1. Go to the Explorer page (pages/explorer.html)
+2. Search by wallet address, transaction hash or block number
+3. Browse the network statistics
+4. Review the transaction history
+5. Analyze the blockchain data"""
+        },
+
+        'technical': {
+            'consensus': """RSC Chain uses a unique hybrid consensus:
+• Proof of Work (PoW): for security and fair distribution
+• Proof of Stake (PoS): for efficiency and speed
+• Artificial Intelligence (AI): for optimization and smart decisions
+This combination offers the best of all worlds.""",
+
+            'security': """RSC Chain security:
+• Post-quantum cryptography (PQC)
+• Resistant to future quantum attacks
+• Decentralized validation
+• No single points of failure
+• Globally distributed network""",
+
+            'api': """RSC Chain API:
+• Base URL: https://rsc-chain-production.up.railway.app/
+• Main endpoints:
+  - /api/v1/wallet/* - Wallet operations
+  - /api/v1/mining/* - Mining operations
+  - /api/v1/blockchain/* - Blockchain information
+  - /api/v1/tx/* - Transactions"""
+        },
+
+        'troubleshooting': {
+            'general': """Common problems and solutions:
+• Connection problems: check your internet, clear the cache
+• Page errors: reload, try another browser
+• Slow transactions: they are normally confirmed in 1.8 seconds
+• Wrong balance: wait a few seconds, reload the page
+• If nothing works: contact support with your email and username""",
+
+            'contact_support': """If you need more help:
+1. Give us your email
+2. Give us your username
+3. Describe the problem in detail
+4. Our team will contact you soon"""
+        }
+    }
+
+
+# Palabras clave por intención, en orden de prioridad
+INTENT_KEYWORDS = {
+    'greeting': ['hi', 'hello', 'hey', 'good morning', 'good afternoon', 'good evening', 'greetings'],
+    'help': ['how', 'help', 'problem', 'error', 'not working', "can't", 'cannot'],
+    'information': ['what', 'who', 'when', 'where', 'why', 'which', 'explain', 'tell me'],
+    'technical_issue': ['error', 'failure', 'fails', 'bug', 'broken', 'not working', 'not loading', "can't",
+                        'cannot', 'problem', 'issue', 'crash']
+}
+
+# Palabras clave por categoría; en caso de empate gana la que aparece antes
+CATEGORY_KEYWORDS = {
+    'mining': ['mining', 'miner', 'mine', 'session', 'reward'],
+    'wallet': ['wallet', 'balance', 'address', 'private key', 'seed phrase'],
+    'staking': ['staking', 'stake', 'delegate', 'delegation', 'validator', 'pool'],
+    'p2p': ['p2p', 'trading', 'trade', 'exchange', 'listing', 'buy', 'sell', 'escrow'],
+    'explorer': ['explorer', 'block', 'transaction'],
+    'technical': ['consensus', 'security', 'api', 'blockchain', 'network']
+}
+
+# Problemas comunes por categoría: (expresión, clave en la guía de troubleshooting)
+ISSUE_PATTERNS = {
+    'mining': [
+        (r"(can't|cannot|unable to|won't let me).*(start|mine)|mining.*(not working|won't start|doesn't start)",
+         'cannot_start'),
+        (r"(not receiving|not getting|didn't get|haven't received|no|missing).*reward", 'no_rewards')
+    ],
+    'wallet': [
+        (r"(can't|cannot|unable to|error).*create.*wallet", 'cannot_create'),
+        (r'balance.*(wrong|incorrect|not updat|doesn.t match)|(wrong|incorrect) balance', 'wrong_balance')
+    ],
+    'staking': [
+        (r"(can't|cannot|unable to|error).*delegat", 'cannot_delegate'),
+        (r"(not receiving|not getting|didn't get|no|missing).*staking", 'no_rewards')
+    ]
+}
+
+ISSUE_TITLES = {
+    ('mining', 'cannot_start'): 'start mining',
+    ('mining', 'no_rewards'): 'receive your mining rewards',
+    ('wallet', 'cannot_create'): 'create a wallet',
+    ('wallet', 'wrong_balance'): 'see the correct balance in your wallet',
+    ('staking', 'cannot_delegate'): 'delegate your tokens for staking',
+    ('staking', 'no_rewards'): 'receive staking rewards'
+}
+DEFAULT_ISSUE_TITLE = 'the issue'
+
+# Palabras que indican un problema técnico concreto (bajan la confianza si no hay resultados)
+TECHNICAL_INDICATORS = ['error', 'code', 'log', 'bug', 'failure', 'crash']
+
+
+GREETINGS = {
+    'morning': "Good morning! 👋",
+    'afternoon': "Good afternoon! 👋",
+    'night': "Good evening! 👋"
+}
+
+GREETING_BODY = """I'm the RSC Chain virtual assistant. I can help you with:
+• ⛏️ Mining RSC tokens
+• 💼 Managing wallets
+• 🔒 Staking and delegation
+• 🔄 P2P trading
+• 🔍 Blockchain explorer
+• And much more...
+
+How can I help you today?"""
+
+# Respuestas genéricas por categoría (cuando no hay resultados de conocimiento)
+CATEGORY_RESPONSES = {
+    'mining': """About mining on RSC Chain:
+
+⛏️ **How to start?**
+Go to the Mining page and click "Start Mining". Each session lasts 24 hours and is fully automatic.
+
+**Features:**
+• Web-based mining (no software needed)
+• 24-hour sessions
+• Automatic rewards
+• No specialized hardware needed
+
+Do you have a specific question about mining?""",
+
+    'wallet': """About wallets on RSC Chain:
+
+💼 **Create a wallet**
+You can create a non-custodial wallet right in your browser. Your private keys never leave your device.
+
+**Features:**
+• Non-custodial (you control your funds)
+• Free and instant creation
+• Support for fast transactions
+• Integrated with the Explorer
+
+**Security:**
+• Keep your private key in a safe place
+• Never share it with anyone
+• Back it up in several places
+
+Do you need help with something specific about your wallet?""",
+
+    'staking': """About staking on RSC Chain:
+
+🔒 **What is staking?**
+Staking lets you delegate your RSC tokens to validators and earn passive rewards.
+
+**Benefits:**
+• Passive income
+• You help secure the network
+• You can withdraw whenever you want
+• Diversified rewards
+
+Would you like to know more about how to stake or about strategies?"""
+}
+
+GENERIC_RESPONSE = """I understand your question and I want to help you as best I can.
+
+RSC Chain is an advanced blockchain with several important areas:
+
+**Main features:**
+• ⛏️ Web Mining - Mine tokens from your browser
+• 💼 Wallet - Manage your tokens safely
+• 🔒 Staking - Earn rewards by delegating tokens
+• 🔄 P2P Trading - Exchange tokens with other users
+• 🔍 Explorer - Browse blocks and transactions
+
+Tell me which part you are exploring or which specific problem you see and I'll guide you step by step. If an error message appears, let me know so I can give you the exact solution."""
+
+ADDITIONAL_INFO_HEADER = "\n\n📌 More information:\n"
+
+TROUBLESHOOTING_TEMPLATE = (
+    "Thanks for letting me know. I see you're having trouble trying to {title}. "
+    "Let's go through it step by step:\n\n{steps}"
+    "\n\nWhen you finish these steps, tell me which one failed or if something different shows up and we'll keep going."
+)
+
+# Todos los pasos de una categoría, cuando no se reconoce el problema concreto
+COMBINED_TROUBLESHOOTING_TEMPLATE = (
+    "I understand something isn't working as it should. "
+    "Please check these key points:\n\n"
+    "{steps}\n\n"
+    "If any of them fails or you see an error message, tell me and I'll look for a specific solution."
+)
+
+GENERAL_TROUBLESHOOTING_TEMPLATE = (
+    "I understand you're having a problem and I want to help. "
+    "While we look into it, please check the following:\n\n{steps}\n\n"
+    "Tell me which step you already tried or which message appears and we'll go through it together."
+)
+
+ESCALATION_MESSAGE = """I understand your question is very specific or that you're having a technical problem that needs personal attention.
+
+So that our support team can help you in the best way, I need some details:
+
+📧 **Your email**: Could you share your email address?
+👤 **Your username**: What is your username on RSC Chain?
+
+Once we have this information, our team will contact you to solve your problem as soon as possible.
+
+**Please share your email and username when you're ready.**"""
+
+# Mensajes del flujo de contacto con soporte
+CONTACT_MESSAGES = {
+    'received': "✅ Great! I've received your information. Our support team will contact you soon by email.",
+    'failed': '⚠️ There was a problem sending your request. Please try again or contact support@rscchain.com directly',
+    'ask_email': '📧 Please share your email address so our team can contact you.',
+    'ask_username': '👤 Please share your RSC Chain username.'
+}
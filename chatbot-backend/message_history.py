@@ -0,0 +1,117 @@
+"""
+Historial compacto de mensajes de una sesión
+Un buffer circular de capacidad fija con registros __slots__: el rol se guarda
+como código y la fecha como epoch en float; los textos (fecha ISO, rol en
+mayúsculas, transcripción) se arman solo cuando alguien los pide
+"""
+import time
+from datetime import datetime
+
+
+ROLES = ('user', 'assistant')
+ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+
+
+class HistoryRecord:
+    """Un mensaje del historial"""
+
+    __slots__ = ('role_code', 'content', 'created')
+
+    def __init__(self, role_code, content, created):
+        self.role_code = role_code
+        self.content = content
+        self.created = created  # segundos desde epoch
+
+    @property
+    def role(self):
+        return ROLES[self.role_code]
+
+    @property
+    def timestamp(self):
+        """Fecha en formato ISO, calculada al consultarla"""
+        return datetime.fromtimestamp(self.created).isoformat()
+
+    def get(self, key, default=None):
+        # Compatibilidad con el formato anterior de mensajes como dict
+        if key in ('role', 'content', 'timestamp'):
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key):
+        if key not in ('role', 'content', 'timestamp'):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def to_dict(self):
+        return {'role': self.role, 'content': self.content, 'timestamp': self.timestamp}
+
+    def __repr__(self):
+        return f'HistoryRecord({self.role!r}, {self.content!r}, {self.created!r})'
+
+
+class MessageHistory:
+    """
+    Últimos capacity mensajes de una sesión, del más antiguo al más reciente
+
+    La lista crece hasta la capacidad y a partir de ahí cada mensaje nuevo
+    reemplaza al más antiguo, sin mover los demás.
+    """
+
+    __slots__ = ('capacity', '_records', '_start')
+
+    def __init__(self, capacity=50):
+        self.capacity = capacity
+        self._records = []
+        self._start = 0  # posición del mensaje más antiguo cuando la lista está llena
+
+    def append(self, role, content, created=None):
+        """Agrega un mensaje; devuelve el registro desplazado (o None si había lugar)"""
+        record = HistoryRecord(ROLE_CODES[role], content, time.time() if created is None else created)
+        return self.append_record(record)
+
+    def append_record(self, record):
+        records = self._records
+        if len(records) < self.capacity:
+            records.append(record)
+            return None
+        if not self.capacity:
+            return record
+        evicted = records[self._start]
+        records[self._start] = record
+        self._start = (self._start + 1) % self.capacity
+        return evicted
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        records = self._records
+        start = self._start
+        for offset in range(len(records)):
+            yield records[(start + offset) % len(records)]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        size = len(self._records)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError('índice fuera del historial')
+        return self._records[(self._start + index) % size]
+
+    def last(self, count):
+        """Los últimos count mensajes, del más antiguo al más reciente"""
+        size = len(self._records)
+        count = min(count, size)
+        return [self[index] for index in range(size - count, size)]
+
+    def format_transcript(self, limit=10):
+        """Transcripción de los últimos mensajes en texto ('[fecha] ROL: contenido' por línea)"""
+        return '\n'.join(
+            f"[{record.timestamp}] {record.role.upper()}: {record.content}"
+            for record in self.last(limit)
+        )
+
+    def to_list(self):
+        return [record.to_dict() for record in self]
@@ -0,0 +1,202 @@
+"""
+Métricas del chatbot en formato de texto de Prometheus
+Contadores, histogramas y métricas calculadas con un costo mínimo por observación
+"""
+import bisect
+import threading
+
+
+# Límites de los buckets en segundos (de 50µs a 5s)
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_labels(label_name, label_value, extra=None):
+    pairs = []
+    if label_name is not None:
+        pairs.append((label_name, label_value))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + escaped + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Conjunto de métricas expuestas en /api/chatbot/metrics"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        # Registrar de nuevo con el mismo nombre reemplaza la métrica anterior
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """Devuelve todas las métricas en formato de exposición de Prometheus"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Pone a cero los contadores e histogramas conservando sus series (las métricas calculadas no cambian)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            reset = getattr(metric, 'reset', None)
+            if reset is not None:
+                reset()
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Counter:
+    """Contador monótono, opcionalmente con una etiqueta"""
+
+    type = 'counter'
+
+    def __init__(self, name, help, label=None, registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.label = label
+        self._values = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def inc(self, amount=1, label_value=None):
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def value(self, label_value=None):
+        return self._values.get(label_value, 0)
+
+    def reset(self):
+        with self._lock:
+            self._values = dict.fromkeys(self._values, 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items(), key=lambda item: str(item[0]))
+        if not values and self.label is None:
+            values = [(None, 0)]
+        return [
+            f'{self.name}{_format_labels(self.label, label_value)} {_format_value(value)}'
+            for label_value, value in values
+        ]
+
+
+class _HistogramChild:
+    __slots__ = ('buckets', 'counts', 'sum', 'count', 'lock')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def reset(self):
+        with self.lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.sum = 0.0
+            self.count = 0
+
+
+class Histogram:
+    """Histograma acumulativo con buckets fijos, opcionalmente con una etiqueta"""
+
+    type = 'histogram'
+
+    def __init__(self, name, help, label=None, buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = tuple(buckets)
+        self._children = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, label_value):
+        """Devuelve la serie de una etiqueta; conviene guardarla para no buscarla en cada observación"""
+        child = self._children.get(label_value)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(label_value, _HistogramChild(self.buckets))
+        return child
+
+    def observe(self, value, label_value=None):
+        self.labels(label_value).observe(value)
+
+    def reset(self):
+        # Las series se conservan: los módulos guardan las de cada etiqueta en variables
+        with self._lock:
+            children = list(self._children.values())
+        for child in children:
+            child.reset()
+
+    def samples(self):
+        lines = []
+        with self._lock:
+            children = sorted(self._children.items(), key=lambda item: str(item[0]))
+        for label_value, child in children:
+            with child.lock:
+                counts = list(child.counts)
+                total = child.sum
+                count = child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label, label_value, ('le', _format_value(float(bound))))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.label, label_value)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class CallbackMetric:
+    """Métrica cuyo valor se calcula al exportar (gauge o counter mantenido por otro componente)"""
+
+    def __init__(self, name, help, callback, type='gauge', registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.type = type
+        self.callback = callback
+        if registry is not None:
+            registry.register(self)
+
+    def samples(self):
+        return [f'{self.name} {_format_value(self.callback())}']
@@ -0,0 +1,150 @@
+"""
+Control de admisión del chatbot
+Token buckets por cliente y por sesión más un límite global de peticiones en
+curso; cada decisión es O(1) y el tráfico excedente recibe 429 con Retry-After
+"""
+import math
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+
+Decision = namedtuple('Decision', ['allowed', 'reason', 'retry_after'])
+
+ADMITTED = Decision(True, 'admitted', 0)
+
+
+class TokenBucketLimiter:
+    """
+    Un token bucket por clave, rellenado de forma perezosa al consultarlo
+
+    Los buckets viven en un OrderedDict en orden de uso: cuando hay más de
+    max_keys se descarta el menos usado, que de todos modos estaría lleno.
+    Una petición que cuesta más que burst (un lote grande) se admite con el
+    bucket lleno y lo deja en negativo: las siguientes esperan a que se pague.
+    """
+
+    def __init__(self, rate, burst, max_keys=100000):
+        if rate <= 0 or burst <= 0:
+            raise ValueError(f'rate y burst tienen que ser positivos (rate={rate}, burst={burst})')
+        self.rate = float(rate)  # tokens por segundo
+        self.burst = float(burst)
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # clave -> [tokens, último relleno]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def acquire(self, key, cost=1.0, now=None):
+        """Consume cost tokens; devuelve 0 si se admite o los segundos hasta que alcancen"""
+        needed = min(cost, self.burst)
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= needed:
+                bucket[0] -= cost
+                return 0.0
+            return (needed - bucket[0]) / self.rate
+
+    def refund(self, key, cost=1.0):
+        """Devuelve los tokens de un acquire() admitido cuya petición se rechazó después"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(self.burst, bucket[0] + cost)
+
+
+class ConcurrencyLimiter:
+    """Límite de peticiones procesándose al mismo tiempo en este proceso"""
+
+    def __init__(self, max_concurrent):
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            if self.in_flight >= self.max_concurrent:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+class AdmissionController:
+    """
+    Decide si una petición de chat se atiende: cliente, luego sesión, luego concurrencia
+
+    Solo las peticiones admitidas gastan tokens: si una petición pasa el bucket
+    del cliente pero la rechaza la sesión o la concurrencia, se devuelven.
+    """
+
+    def __init__(self, client_rate=5, client_burst=20, session_rate=1, session_burst=5,
+                 max_concurrent=64, max_keys=100000):
+        self.clients = TokenBucketLimiter(client_rate, client_burst, max_keys)
+        self.sessions = TokenBucketLimiter(session_rate, session_burst, max_keys)
+        self.concurrency = ConcurrencyLimiter(max_concurrent)
+        self.decisions = {
+            'admitted': 0,
+            'client_rate': 0,
+            'session_rate': 0,
+            'concurrency': 0
+        }
+
+    def admit(self, client, session_id=None, cost=1):
+        """
+        Evalúa una petición; si se admite ocupa un lugar de concurrencia que
+        hay que devolver con release()
+
+        cost es la cantidad de mensajes de la petición (un lote cuesta uno por
+        mensaje en el bucket del cliente).
+
+        Returns:
+            Decision: (allowed, reason, retry_after en segundos)
+        """
+        now = time.monotonic()
+        retry_after = self.clients.acquire(client, cost, now=now)
+        if retry_after:
+            return self._reject('client_rate', retry_after)
+        if session_id is not None:
+            retry_after = self.sessions.acquire(session_id, now=now)
+            if retry_after:
+                self.clients.refund(client, cost)
+                return self._reject('session_rate', retry_after)
+        if not self.concurrency.try_acquire():
+            self.clients.refund(client, cost)
+            if session_id is not None:
+                self.sessions.refund(session_id)
+            return self._reject('concurrency', 1)
+        self.decisions['admitted'] += 1
+        return ADMITTED
+
+    def release(self):
+        self.concurrency.release()
+
+    def stats(self):
+        return {
+            'in_flight': self.concurrency.in_flight,
+            'max_concurrent': self.concurrency.max_concurrent,
+            'tracked_clients': len(self.clients),
+            'tracked_sessions': len(self.sessions),
+            'decisions': dict(self.decisions)
+        }
+
+    def _reject(self, reason, retry_after):
+        self.decisions[reason] += 1
+        # Retry-After se expresa en segundos enteros
+        return Decision(False, reason, max(1, math.ceil(retry_after)))
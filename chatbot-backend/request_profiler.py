@@ -0,0 +1,177 @@
+"""
+Perfilado de peticiones bajo demanda
+Con PROFILE_TOKEN configurado se perfila con cProfile una muestra de los
+mensajes (PROFILE_SAMPLE_RATE) y los que llegan con el encabezado
+X-Profile-Token; cada perfil se guarda con el id de la petición y un endpoint
+de administración devuelve las funciones más costosas, agregadas o de una
+petición. Sin PROFILE_TOKEN no se crea el perfilador y no cuesta nada.
+"""
+import cProfile
+import hmac
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+
+
+PROFILE_HEADER = 'X-Profile-Token'
+REQUEST_ID_HEADER = 'X-Request-ID'
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9._-]{1,64}')
+
+# Orden de las funciones: tiempo propio, tiempo acumulado (con lo que llaman) o llamadas
+SORT_KEYS = {'tottime': 2, 'cumtime': 3, 'calls': 1}
+
+# stats: {(archivo, línea, función): (llamadas primitivas, llamadas, tiempo propio, tiempo acumulado)}
+ProfileRecord = namedtuple('ProfileRecord', ['request_id', 'created', 'elapsed_ms', 'message', 'stats'])
+
+
+class RequestProfiler:
+    """Perfila peticiones elegidas y guarda los últimos max_profiles perfiles"""
+
+    def __init__(self, token, sample_rate=0.0, max_profiles=200, directory=None):
+        self.token = token
+        self.sample_rate = sample_rate
+        self.max_profiles = max_profiles
+        self.directory = directory  # si se indica, también se guarda <request_id>.prof para pstats
+        self._profiles = OrderedDict()  # request_id -> ProfileRecord
+        # Un solo perfil a la vez por proceso: cProfile no admite dos activos en paralelo
+        self._active = threading.Lock()
+        self._lock = threading.Lock()
+        self.profiled = 0
+        self.skipped = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def authorized(self, headers):
+        """True si el encabezado X-Profile-Token trae el token configurado"""
+        supplied = headers.get(PROFILE_HEADER)
+        return supplied is not None and hmac.compare_digest(supplied.encode(), self.token.encode())
+
+    def call(self, headers, func, data):
+        """
+        Ejecuta func(data), perfilándola si la petición fue marcada o cae en la muestra
+
+        Returns:
+            tuple: (resultado de func, request_id del perfil o None si no se perfiló)
+        """
+        if not (self.authorized(headers) or (self.sample_rate and random.random() < self.sample_rate)):
+            return func(data), None
+        if not self._active.acquire(blocking=False):
+            self.skipped += 1
+            return func(data), None
+        try:
+            profile = cProfile.Profile()
+            started = time.perf_counter()
+            profile.enable()
+            try:
+                result = func(data)
+            finally:
+                profile.disable()
+            elapsed = time.perf_counter() - started
+        finally:
+            self._active.release()
+        request_id = self._request_id(headers)
+        message = data.get('message') if isinstance(data, dict) else None
+        self._store(request_id, profile, elapsed, message)
+        return result, request_id
+
+    def get(self, request_id):
+        with self._lock:
+            return self._profiles.get(request_id)
+
+    def hot_functions(self, request_id=None, sort='tottime', limit=30):
+        """
+        Funciones más costosas de un perfil o, sin request_id, de todos los guardados
+
+        Returns:
+            list | None: [{'function', 'calls', 'primitive_calls', 'tottime_ms',
+            'cumtime_ms', 'tottime_per_request_ms'}] o None si el perfil no existe
+        """
+        with self._lock:
+            if request_id is None:
+                records = list(self._profiles.values())
+            else:
+                record = self._profiles.get(request_id)
+                if record is None:
+                    return None
+                records = [record]
+
+        totals = {}
+        for record in records:
+            for func, (primitive_calls, calls, tottime, cumtime) in record.stats.items():
+                total = totals.get(func)
+                if total is None:
+                    totals[func] = [primitive_calls, calls, tottime, cumtime]
+                else:
+                    total[0] += primitive_calls
+                    total[1] += calls
+                    total[2] += tottime
+                    total[3] += cumtime
+
+        column = SORT_KEYS.get(sort, SORT_KEYS['tottime'])
+        ranked = sorted(totals.items(), key=lambda item: item[1][column], reverse=True)[:limit]
+        count = len(records) or 1
+        return [{
+            'function': function_label(func),
+            'calls': calls,
+            'primitive_calls': primitive_calls,
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3),
+            'tottime_per_request_ms': round(tottime * 1000 / count, 3)
+        } for func, (primitive_calls, calls, tottime, cumtime) in ranked]
+
+    def profiles(self):
+        """Resumen de los perfiles guardados, del más reciente al más antiguo"""
+        with self._lock:
+            records = list(self._profiles.values())
+        return [{
+            'request_id': record.request_id,
+            'created': record.created,
+            'elapsed_ms': round(record.elapsed_ms, 3),
+            'message': record.message
+        } for record in reversed(records)]
+
+    def stats(self):
+        return {
+            'stored': len(self._profiles),
+            'profiled': self.profiled,
+            'skipped': self.skipped,
+            'sample_rate': self.sample_rate,
+            'max_profiles': self.max_profiles
+        }
+
+    def _request_id(self, headers):
+        # El id que manda el cliente (si es razonable) permite cruzar el perfil con sus logs
+        supplied = headers.get(REQUEST_ID_HEADER)
+        if supplied and REQUEST_ID_PATTERN.fullmatch(supplied):
+            with self._lock:
+                if supplied not in self._profiles:
+                    return supplied
+        return uuid.uuid4().hex[:16]
+
+    def _store(self, request_id, profile, elapsed, message):
+        if self.directory:
+            profile.dump_stats(os.path.join(self.directory, f'{request_id}.prof'))
+        # Sin los llamadores: solo se necesitan los totales por función
+        stats = {func: row[:4] for func, row in pstats.Stats(profile).stats.items()}
+        if isinstance(message, str) and len(message) > 200:
+            message = message[:200] + '…'
+        record = ProfileRecord(request_id, time.time(), elapsed * 1000, message, stats)
+        with self._lock:
+            self._profiles[request_id] = record
+            self._profiles.move_to_end(request_id)
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+            self.profiled += 1
+
+
+def function_label(func):
+    """'archivo.py:línea(función)' como en pstats, sin la ruta completa"""
+    filename, line, name = func
+    if filename == '~' and line == 0:
+        return name  # función nativa, por ejemplo <method 'search' of 're.Pattern' objects>
+    return f'{os.path.basename(filename)}:{line}({name})'
@@ -0,0 +1,87 @@
+"""
+Tabla de respuestas precalculadas del chatbot
+Todos los textos fijos y los derivados de la base de conocimiento se arman una
+vez por versión del conocimiento con los textos del paquete de idioma
+(locales/); generar una respuesta queda en búsquedas en diccionarios y, como
+mucho, una concatenación
+"""
+
+
+# Longitud del fragmento de cada resultado adicional
+PREVIEW_LENGTH = 100
+
+
+def format_troubleshooting(pack, title, steps):
+    """Crea un mensaje amigable con los pasos a seguir"""
+    return pack.TROUBLESHOOTING_TEMPLATE.format(title=title, steps=steps)
+
+
+def format_combined_troubleshooting(pack, troubleshooting):
+    """Todos los pasos de una categoría, cuando no se reconoce el problema concreto"""
+    combined_steps = '\n\n'.join(steps for steps in troubleshooting.values())
+    return pack.COMBINED_TROUBLESHOOTING_TEMPLATE.format(steps=combined_steps)
+
+
+def format_general_troubleshooting(pack, general_text):
+    return pack.GENERAL_TROUBLESHOOTING_TEMPLATE.format(steps=general_text)
+
+
+def format_preview(content):
+    return f"• {content[:PREVIEW_LENGTH]}..."
+
+
+class ResponseTable:
+    """Respuestas ya formateadas para una versión de la base de conocimiento"""
+
+    def __init__(self, knowledge_base, pack):
+        # La versión se lee primero: si el contenido cambia mientras se arma la
+        # tabla, la próxima consulta ve una versión distinta y la reconstruye
+        self.version = knowledge_base.version
+        self.greetings = {
+            band: f"{greeting}\n\n{pack.GREETING_BODY}" for band, greeting in pack.GREETINGS.items()
+        }
+        self.category_responses = pack.CATEGORY_RESPONSES
+        self.generic_response = pack.GENERIC_RESPONSE
+        self.additional_info_header = pack.ADDITIONAL_INFO_HEADER
+
+        self.troubleshooting = {}
+        self.combined_troubleshooting = {}
+        for category, content in knowledge_base.knowledge_base.items():
+            steps_by_issue = knowledge_base.get_troubleshooting_info(category)
+            if not steps_by_issue:
+                continue
+            for issue_key, steps in steps_by_issue.items():
+                title = pack.ISSUE_TITLES.get((category, issue_key), pack.DEFAULT_ISSUE_TITLE)
+                self.troubleshooting[(category, issue_key)] = format_troubleshooting(pack, title, steps)
+            self.combined_troubleshooting[category] = format_combined_troubleshooting(pack, steps_by_issue)
+
+        general = knowledge_base.get_category_info('troubleshooting')
+        general_text = general.get('general') if isinstance(general, dict) else ''
+        self.general_troubleshooting = format_general_troubleshooting(pack, general_text) if general_text else None
+
+        self.previews = {
+            entry['content']: format_preview(entry['content'])
+            for entry in knowledge_base.index.entries
+            if entry.get('content')
+        }
+
+    def greeting(self, time_band):
+        return self.greetings[time_band]
+
+    def knowledge_answer(self, knowledge_results):
+        """Mejor resultado más los fragmentos de hasta dos resultados adicionales"""
+        response = knowledge_results[0].get('content', '')
+        additional_info = []
+        for result in knowledge_results[1:3]:
+            content = result.get('content')
+            if content:
+                preview = self.previews.get(content)
+                additional_info.append(preview if preview is not None else format_preview(content))
+        if additional_info:
+            return response + self.additional_info_header + '\n'.join(additional_info)
+        return response
+
+    def category_answer(self, category):
+        if category:
+            return self.category_responses.get(category, self.generic_response)
+        return self.generic_response
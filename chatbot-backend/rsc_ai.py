@@ -4,28 +4,156 @@ Procesa mensajes y genera respuestas inteligentes
 """
 import re
 from datetime import datetime
+from time import perf_counter
+
+from metrics import Counter, Histogram
+from rsc_classifier import MessageClassifier
+from conversation_context import reports_issue
+from language_detector import MARKERS, LanguageDetector
+from locales import LOCALES, LocaleCache, load_pack
+from response_cache import ResponseCache
+from response_table import ResponseTable, format_troubleshooting
+from fuzzy_index import MIN_WORD_LENGTH, WORD_PATTERN, FuzzyMatcher
+from rsc_knowledge import STOPWORDS, RSCKnowledgeBase, normalize_text
+
+
+STAGE_SECONDS = Histogram(
+    'chatbot_ai_stage_seconds',
+    'Duración de cada etapa de RSCAI.process_message',
+    label='stage'
+)
+LANGUAGE_SECONDS = STAGE_SECONDS.labels('language')
+CLASSIFY_SECONDS = STAGE_SECONDS.labels('classify')
+SPELLING_SECONDS = STAGE_SECONDS.labels('spelling')
+CACHE_LOOKUP_SECONDS = STAGE_SECONDS.labels('cache_lookup')
+SEARCH_SECONDS = STAGE_SECONDS.labels('knowledge_search')
+CONFIDENCE_SECONDS = STAGE_SECONDS.labels('confidence')
+GENERATE_SECONDS = STAGE_SECONDS.labels('generate')
+RESPONSES_TOTAL = Counter(
+    'chatbot_ai_responses_total',
+    'Respuestas producidas por RSCAI según su origen',
+    label='source'
+)
+
+LOCALE_TOTAL = Counter(
+    'chatbot_ai_locale_total',
+    'Mensajes procesados por RSCAI según su idioma',
+    label='locale'
+)
+
+
+def pack_words(value, words=None):
+    """Palabras (en minúsculas) de todos los textos de un valor del paquete de idioma"""
+    if words is None:
+        words = set()
+    if isinstance(value, str):
+        words.update(WORD_PATTERN.findall(value.lower()))
+    elif isinstance(value, dict):
+        for item in value.values():
+            pack_words(item, words)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            pack_words(item, words)
+    return words
+
+
+class LocaleModel:
+    """
+    Todo lo que RSCAI necesita para responder en un idioma
+
+    Base de conocimiento con su índice, clasificador, patrones de problemas,
+    tabla de respuestas y corrector, armados con el paquete del idioma.
+    """
+
+    def __init__(self, knowledge_base, pack):
+        self.locale = knowledge_base.locale
+        self.pack = pack
+        self.knowledge = knowledge_base
+        self.classifier = MessageClassifier(pack.INTENT_KEYWORDS, pack.CATEGORY_KEYWORDS, locale=self.locale)
+        self.issue_patterns = {
+            category: [(re.compile(pattern), issue_key) for pattern, issue_key in patterns]
+            for category, patterns in pack.ISSUE_PATTERNS.items()
+        }
+        # Textos de respuesta ya formateados, armados al cargar el conocimiento
+        self._table = ResponseTable(knowledge_base, pack)
+        # Corrector de errores de escritura sobre el vocabulario del conocimiento
+        self._fuzzy = self._build_fuzzy_matcher()
+
+    def response_table(self):
+        """Tabla de respuestas de la versión actual del conocimiento (se rearma tras una recarga)"""
+        table = self._table
+        if table.version != self.knowledge.version:
+            table = self._table = ResponseTable(self.knowledge, self.pack)
+        return table
+
+    def correct(self, message_lower):
+        """Corrige errores de escritura ("walet" -> "wallet", "mineria" -> "minería")"""
+        matcher = self._fuzzy
+        if matcher.version != self.knowledge.version:
+            matcher = self._fuzzy = self._build_fuzzy_matcher()
+        return matcher.correct(message_lower)
+
+    def detect_issue_type(self, category, message):
+        """Detecta el tipo de problema específico mediante patrones"""
+        patterns = self.issue_patterns.get(category, [])
+        for pattern, issue_key in patterns:
+            if pattern.search(message.lower()):
+                return issue_key
+        return None
+
+    def _build_fuzzy_matcher(self):
+        """
+        Vocabulario: palabras clave y términos del conocimiento, sin palabras vacías
+        ("perro" no pasa a "pero"). Las palabras funcionales del idioma y las de
+        los textos del paquete son válidas: nunca se corrigen
+        """
+        version = self.knowledge.version
+        known = set(STOPWORDS) | MARKERS.get(self.locale, frozenset())
+        known |= pack_words([getattr(self.pack, name) for name in dir(self.pack) if name.isupper()])
+        words = set()
+        for keywords in list(self.pack.INTENT_KEYWORDS.values()) + list(self.pack.CATEGORY_KEYWORDS.values()):
+            for keyword in keywords:
+                words.update(keyword.split())
+        for entry in self.knowledge.index.entries:
+            words.update(WORD_PATTERN.findall(entry['content'].lower()))
+        vocabulary = [
+            word for word in words
+            if len(word) >= MIN_WORD_LENGTH and not word.isdigit() and normalize_text(word) not in STOPWORDS
+        ]
+        return FuzzyMatcher(vocabulary, known=known | words, version=version)
 
 
 class RSCAI:
     """Sistema de IA especializado en RSC Chain"""
     
-    def __init__(self, knowledge_base):
+    def __init__(self, knowledge_base, cache_size=1024, locales=LOCALES, max_loaded_locales=3,
+                 locale_idle_seconds=600, knowledge_states=None):
         self.knowledge = knowledge_base
         self.confidence_threshold = 0.7  # Umbral de confianza para escalar a humano
-        self.issue_patterns = self._build_issue_patterns()
-        self.issue_titles = {
-            ('mining', 'cannot_start'): 'iniciar la minería',
-            ('mining', 'no_rewards'): 'recibir tus recompensas de minería',
-            ('wallet', 'cannot_create'): 'crear una wallet',
-            ('wallet', 'wrong_balance'): 'ver el balance correcto en tu wallet',
-            ('staking', 'cannot_delegate'): 'delegar tus tokens en staking',
-            ('staking', 'no_rewards'): 'recibir recompensas de staking'
-        }
+        self.response_cache = ResponseCache(cache_size)
+        # El idioma de knowledge_base es el de por defecto y su modelo queda siempre
+        # cargado; los demás se construyen con el primer mensaje en ese idioma y se
+        # liberan cuando dejan de usarse
+        self.default_locale = knowledge_base.locale
+        self.supported_locales = tuple(dict.fromkeys((self.default_locale,) + tuple(locales)))
+        self._default_model = LocaleModel(knowledge_base, load_pack(self.default_locale))
+        self.locales = LocaleCache(self._load_locale, max_loaded=max_loaded_locales,
+                                   idle_seconds=locale_idle_seconds, pinned=(self.default_locale,))
+        self.locales.put(self.default_locale, self._default_model)
+        # Estados ya construidos por idioma (snapshot); sin estado, el idioma se arma desde locales/
+        self.knowledge_states = dict(knowledge_states or {})
+        self.detector = None
+        if len(self.supported_locales) > 1:
+            self.detector = LanguageDetector({code: MARKERS[code] for code in self.supported_locales})
         
-    def process_message(self, message, conversation_history=None, user_email=None, username=None):
+    def process_message(self, message, conversation_history=None, user_email=None, username=None,
+                        context=None):
         """
         Procesa un mensaje y genera una respuesta
         
+        Con context (ConversationContext de la sesión) un seguimiento corto hereda
+        la categoría anterior y el contexto se actualiza con este turno.
+        
         Returns:
             dict: {
                 'message': str - respuesta del bot,
@@ -33,35 +161,234 @@ class RSCAI:
                 'confidence': float - nivel de confianza (0-1)
             }
         """
+        message_lower, classification = self.classify_message(message, context)
+        return self.respond(message, message_lower, classification, conversation_history, context)
+    
+    def classify_message(self, message, context=None):
+        """
+        Primera mitad de process_message: normaliza el mensaje, detecta su idioma y lo clasifica
+        
+        Returns:
+            tuple: (mensaje normalizado, Classification)
+        """
+        message_lower = ' '.join(message.lower().split())
+        model = self._locale_model(message_lower, context)
+        message_lower, classification = self._classify(model, message_lower)
+        if context is not None:
+            classification = context.resolve(classification, message_lower)
+        return message_lower, classification
+    
+    def respond(self, message, message_lower, classification, conversation_history=None, context=None):
+        """Segunda mitad de process_message: responde a un mensaje ya clasificado"""
         if conversation_history is None:
             conversation_history = []
+        result = self._respond(message, message_lower, classification, conversation_history, context)
+        if context is not None:
+            issue_key = None
+            if classification.category and reports_issue(classification):
+                issue_key = self._detect_issue_type(classification.category, message_lower,
+                                                    self._model_for(classification))
+            context.update(classification, issue_key, message, result['needs_escalation'])
+        return result
+    
+    def process_messages(self, messages):
+        """
+        Procesa un lote de mensajes independientes, sin historial ni sesión
         
-        message_lower = message.lower()
+        Los mensajes repetidos dentro del lote se clasifican y responden una sola vez.
         
-        # Detectar intención
-        intent = self._detect_intent(message_lower)
+        Returns:
+            list: un dict por mensaje, en el mismo orden, con las claves de
+            process_message más 'intent', 'category' y 'locale'
+        """
+        answered = {}
+        results = []
+        for message in messages:
+            message_lower = ' '.join(message.lower().split())
+            model = self._locale_model(message_lower)
+            key = (model.locale, message_lower)
+            result = answered.get(key)
+            if result is None:
+                message_lower, classification = self._classify(model, message_lower)
+                result = self._respond(message, message_lower, classification, [], None)
+                result['intent'] = classification.intent
+                result['category'] = classification.category
+                result['locale'] = classification.locale
+                answered[key] = result
+            results.append(dict(result))
+        return results
+    
+    def _classify(self, model, message_lower):
+        """
+        Corrige los errores de escritura y detecta intención y categoría en una sola pasada
+
+        Se revisa cada palabra por separado: las del vocabulario o válidas en el
+        idioma no se tocan y las desconocidas se corrigen ("walet" -> "wallet"),
+        aunque el resto del mensaje ya tenga palabras clave ("como creo una walet").
+
+        Returns:
+            tuple: (mensaje corregido, Classification)
+        """
+        started = perf_counter()
+        message_lower = model.correct(message_lower)
+        SPELLING_SECONDS.observe(perf_counter() - started)
+        started = perf_counter()
+        classification = model.classifier.classify(message_lower)
+        CLASSIFY_SECONDS.observe(perf_counter() - started)
+        return message_lower, classification
+    
+    def _locale_model(self, message_lower, context=None):
+        """
+        Modelo del idioma del mensaje
         
-        # Determinar categoría
-        category = self._detect_category(message_lower)
+        Si el mensaje no trae pistas suficientes ("staking?") se sigue con el
+        idioma de la conversación y, si no lo hay, con el idioma por defecto.
+        """
+        locale = None
+        if self.detector is not None:
+            started = perf_counter()
+            locale = self.detector.detect(message_lower)
+            LANGUAGE_SECONDS.observe(perf_counter() - started)
+        if locale is None and context is not None:
+            locale = context.locale
+        if locale not in self.supported_locales:
+            locale = self.default_locale
+        LOCALE_TOTAL.inc(label_value=locale)
+        return self.locales.get(locale)
+    
+    def _model_for(self, classification):
+        """Modelo del idioma en que se clasificó el mensaje"""
+        locale = classification.locale
+        if locale is None or locale == self.default_locale:
+            return self._default_model
+        return self.locales.get(locale)
+    
+    def _load_locale(self, locale):
+        """Construye el modelo de un idioma que no es el de por defecto (lo llama LocaleCache)"""
+        knowledge_base = RSCKnowledgeBase(state=self.knowledge_states.get(locale),
+                                          retrieval=self.knowledge.retrieval, locale=locale)
+        return LocaleModel(knowledge_base, load_pack(locale))
+    
+    def swap_knowledge(self, states):
+        """
+        Publica el conocimiento de un snapshot recargado ({idioma: KnowledgeState})
+        
+        Los idiomas cargados cambian de estado en el momento y los demás usan el
+        nuevo cuando se construyen. El idioma por defecto cambia último: su
+        versión nueva invalida la caché de respuestas.
+        """
+        self.knowledge_states = dict(states)
+        for locale, model in self.locales.models().items():
+            if locale != self.default_locale and locale in states:
+                model.knowledge.swap_state(states[locale])
+        if self.default_locale in states:
+            self.knowledge.swap_state(states[self.default_locale])
+        else:
+            self.response_cache.clear()
+    
+    def preload_locales(self):
+        """
+        Construye los modelos de los idiomas soportados (PRELOAD_LOCALES=true)
         
+        Con gunicorn se construyen una vez en el proceso maestro y los workers
+        los heredan. Quedan sujetos a las mismas reglas que los demás: si no
+        se usan durante idle_seconds se liberan y se vuelven a construir con
+        el siguiente mensaje en ese idioma.
+        
+        Returns:
+            list: idiomas cargados
+        """
+        for locale in self.supported_locales:
+            self.locales.get(locale)
+        return self.locales.loaded()
+    
+    def locale_loaded(self, message):
+        """
+        Indica si el modelo del idioma del mensaje ya está construido
+        
+        El servidor asíncrono lo consulta para no construir un idioma (15-60 ms)
+        dentro del event loop. Si el mensaje no trae pistas de idioma puede
+        seguir el de la conversación, así que solo se da por cargado si lo
+        están todos los idiomas soportados.
+        """
+        loaded = self.locales.loaded()
+        locale = None
+        if self.detector is not None:
+            locale = self.detector.detect(' '.join(message.lower().split()))
+        if locale is None:
+            return all(code in loaded for code in self.supported_locales)
+        return locale in loaded
+    
+    def contact_message(self, key, locale=None):
+        """Mensaje del flujo de contacto con soporte en el idioma de la conversación"""
+        pack = load_pack(locale if locale in self.supported_locales else self.default_locale)
+        return pack.CONTACT_MESSAGES[key]
+    
+    def locale_stats(self):
+        stats = self.locales.stats()
+        stats['default'] = self.default_locale
+        stats['supported'] = list(self.supported_locales)
+        return stats
+    
+    def _respond(self, message, message_lower, classification, conversation_history, context):
+        """Devuelve la respuesta desde la caché o la genera"""
+        intent = classification.intent
+        category = classification.category
+        model = self._model_for(classification)
+        
+        # La respuesta solo depende del mensaje, su idioma, su clasificación, (en
+        # saludos) la franja horaria y (en problemas técnicos) el problema activo de la sesión
+        time_band = self._time_band(datetime.now().hour) if intent == 'greeting' else None
+        context_key = context.response_key(category) if context is not None else None
+        cache_key = (message_lower, model.locale, intent, category, time_band, context_key)
+        version = self.knowledge.version
+        started = perf_counter()
+        cached = self.response_cache.get(cache_key, version)
+        CACHE_LOOKUP_SECONDS.observe(perf_counter() - started)
+        if cached is not None:
+            RESPONSES_TOTAL.inc(label_value='cache')
+            return cached
+        
+        result = self._answer(message, message_lower, intent, category, conversation_history, time_band, context,
+                              model)
+        self.response_cache.put(cache_key, version, result)
+        return result
+    
+    def _answer(self, message, message_lower, intent, category, conversation_history, time_band=None,
+                context=None, locale_model=None):
+        """Busca conocimiento, calcula la confianza y genera la respuesta"""
+        model = locale_model or self._default_model
         # Buscar información relevante
-        knowledge_results = self.knowledge.search(message_lower, category)
+        started = perf_counter()
+        knowledge_results = model.knowledge.search(message_lower, category)
+        searched = perf_counter()
+        SEARCH_SECONDS.observe(searched - started)
+        if (category and knowledge_results
+                and self._match_confidence(knowledge_results[0]) < self.confidence_threshold):
+            # Un resultado débil no responde: con categoría se usa su respuesta genérica
+            knowledge_results = []
         
         # Calcular confianza
-        confidence = self._calculate_confidence(message_lower, knowledge_results, category)
+        confidence = self._calculate_confidence(message_lower, knowledge_results, category, context, model)
+        CONFIDENCE_SECONDS.observe(perf_counter() - searched)
         
         needs_escalation = confidence < self.confidence_threshold
         
         # Si necesita escalación y no es un saludo, pedir información de contacto
         if needs_escalation and intent != 'greeting':
+            RESPONSES_TOTAL.inc(label_value='escalation')
             return {
-                'message': self._generate_escalation_message(message),
+                'message': self._generate_escalation_message(message, model),
                 'needs_escalation': True,
                 'confidence': confidence
             }
         
         # Generar respuesta basada en intención y conocimiento
-        response = self._generate_response(intent, category, knowledge_results, message_lower, conversation_history)
+        started = perf_counter()
+        response = self._generate_response(intent, category, knowledge_results, message_lower, conversation_history,
+                                           time_band, context, model)
+        GENERATE_SECONDS.observe(perf_counter() - started)
+        RESPONSES_TOTAL.inc(label_value='generated')
         
         return {
             'message': response,
@@ -71,48 +398,30 @@ class RSCAI:
     
     def _detect_intent(self, message):
         """Detecta la intención del mensaje"""
-        # Saludos
-        if re.search(r'\b(hola|hi|hello|buenos días|buenas tardes|buenas noches|saludos|hey)\b', message):
-            return 'greeting'
-        
-        # Preguntas de ayuda
-        if re.search(r'\b(cómo|como|how|ayuda|help|problema|error|no funciona|no puedo)\b', message):
-            return 'help'
-        
-        # Preguntas informativas
-        if re.search(r'\b(qué|que|what|quien|who|cuándo|when|dónde|where|por qué|why|explica|explicar)\b', message):
-            return 'information'
-        
-        # Problemas técnicos
-        if re.search(r'\b(error|fallo|bug|roto|no funciona|no carga|no puedo|problema|tengo un problema)\b', message):
-            return 'technical_issue'
-        
-        return 'general'
+        return self.classify_message(message)[1].intent
     
-    def _detect_category(self, message):
-        """Detecta la categoría del mensaje"""
-        categories = {
-            'mining': ['minar', 'minería', 'mining', 'minero', 'sesión', 'recompensa'],
-            'wallet': ['wallet', 'cartera', 'balance', 'dirección', 'address', 'clave', 'private key'],
-            'staking': ['staking', 'stake', 'delegar', 'delegación', 'validador', 'pool'],
-            'p2p': ['p2p', 'trading', 'intercambio', 'anuncio', 'trade', 'compra', 'venta'],
-            'explorer': ['explorer', 'explorador', 'bloque', 'block', 'transacción', 'transaction'],
-            'technical': ['consenso', 'consensus', 'seguridad', 'security', 'api', 'blockchain', 'red']
-        }
-        
-        message_words = set(message.lower().split())
-        
-        for category, keywords in categories.items():
-            if any(keyword in message for keyword in keywords):
-                return category
-        
-        return None
+    def _detect_category(self, message, context=None):
+        """Detecta la categoría del mensaje (la de más coincidencias; en un seguimiento, la anterior)"""
+        return self.classify_message(message, context)[1].category
     
-    def _calculate_confidence(self, message, knowledge_results, category):
+    @staticmethod
+    def _time_band(hour):
+        """Franja horaria usada para el saludo"""
+        if 6 <= hour < 12:
+            return 'morning'
+        if 12 <= hour < 20:
+            return 'afternoon'
+        return 'night'
+    
+    def _calculate_confidence(self, message, knowledge_results, category, context=None, locale_model=None):
         """Calcula el nivel de confianza en la respuesta"""
-        # Si hay resultados relevantes, confianza alta
+        # El mismo problema reportado una y otra vez: los pasos no alcanzaron, mejor un humano
+        if context is not None and context.repeated_issue(category):
+            return 0.5
+        
+        # Si hay resultados relevantes, la confianza sale de qué tan bien cubren la consulta
         if knowledge_results:
-            return 0.9
+            return self._match_confidence(knowledge_results[0])
         
         # Si detectamos categoría pero no hay resultados exactos
         if category:
@@ -123,200 +432,76 @@ class RSCAI:
             return 0.5
         
         # Preguntas muy específicas o técnicas que no encontramos
-        technical_indicators = ['error', 'código', 'log', 'bug', 'fallo']
+        technical_indicators = (locale_model or self._default_model).pack.TECHNICAL_INDICATORS
         if any(indicator in message for indicator in technical_indicators):
             return 0.4
         
         return 0.6
     
-    def _generate_response(self, intent, category, knowledge_results, message, conversation_history):
-        """Genera la respuesta del bot"""
+    @staticmethod
+    def _match_confidence(result):
+        """
+        Confianza que da un resultado de búsqueda: en 'bm25' según su cobertura
+        (completa: 0.9; hacen falta 2/3 de la información de la consulta para el
+        umbral de 0.7) y en 'tfidf' según su similitud (0.2 alcanza)
+        """
+        similarity = result.get('similarity')
+        if similarity is not None:
+            return round(min(0.95, 0.5 + similarity), 4)
+        return round(0.3 + 0.6 * result.get('coverage', 1.0), 4)
+    
+    def _generate_response(self, intent, category, knowledge_results, message, conversation_history, time_band=None,
+                           context=None, locale_model=None):
+        """Genera la respuesta del bot a partir de la tabla de respuestas precalculadas"""
+        model = locale_model or self._default_model
+        table = model.response_table()
         
         # Respuestas según intención
         if intent == 'greeting':
-            hour = datetime.now().hour
-            if 6 <= hour < 12:
-                greeting = "¡Buenos días! 👋"
-            elif 12 <= hour < 20:
-                greeting = "¡Buenas tardes! 👋"
-            else:
-                greeting = "¡Buenas noches! 👋"
-            
-            return f"""{greeting}
-
-Soy el asistente virtual de RSC Chain. Estoy aquí para ayudarte con:
-• ⛏️ Minería de RSC tokens
-• 💼 Gestión de wallets
-• 🔒 Staking y delegación
-• 🔄 Trading P2P
-• 🔍 Explorer de blockchain
-• Y mucho más...
-
-¿En qué puedo ayudarte hoy?"""
+            return table.greeting(time_band or self._time_band(datetime.now().hour))
         
         # Si es un problema técnico, ofrecer asistencia guiada
         if intent == 'technical_issue':
-            troubleshooting_response = self._handle_troubleshooting(category, message)
+            troubleshooting_response = self._handle_troubleshooting(category, message, context, model)
             if troubleshooting_response:
                 return troubleshooting_response
 
-        # Si tenemos resultados de conocimiento, usarlos
+        # Si tenemos resultados de conocimiento, usarlos (con hasta 2 fragmentos adicionales)
         if knowledge_results:
-            best_result = knowledge_results[0]
-            response = best_result.get('content', '')
-            
-            # Agregar contexto adicional si hay más información
-            if len(knowledge_results) > 1:
-                additional_info = []
-                for result in knowledge_results[1:3]:  # Máximo 2 adicionales
-                    if result.get('content'):
-                        additional_info.append(f"• {result['content'][:100]}...")
-                
-                if additional_info:
-                    response += "\n\n📌 Información adicional:\n" + "\n".join(additional_info)
-            
-            return response
+            return table.knowledge_answer(knowledge_results)
         
-        # Respuestas genéricas por categoría
-        category_responses = {
-            'mining': """Sobre minería en RSC Chain:
-
-⛏️ **¿Cómo empezar?**
-Ve a la página de Mining y haz clic en "Iniciar Minería". Cada sesión dura 24 horas y es completamente automática.
-
-**Características:**
-• Minería web-based (no necesitas software)
-• Sesiones de 24 horas
-• Recompensas automáticas
-• Sin necesidad de hardware especializado
-
-¿Tienes alguna pregunta específica sobre la minería?""",
-            
-            'wallet': """Sobre Wallets en RSC Chain:
-
-💼 **Crear una Wallet**
-Puedes crear una wallet no-custodial directamente en tu navegador. Tus claves privadas nunca salen de tu dispositivo.
-
-**Características:**
-• No-custodial (tú controlas tus fondos)
-• Creación gratuita e instantánea
-• Soporte para transacciones rápidas
-• Integración con Explorer
-
-**Seguridad:**
-• Guarda tu clave privada en un lugar seguro
-• Nunca la compartas con nadie
-• Haz backup en múltiples lugares
-
-¿Necesitas ayuda con algo específico de tu wallet?""",
-            
-            'staking': """Sobre Staking en RSC Chain:
-
-🔒 **¿Qué es Staking?**
-Staking te permite delegar tus tokens RSC a validadores y ganar recompensas pasivas.
-
-**Ventajas:**
-• Ingresos pasivos
-• Contribuyes a la seguridad de la red
-• Puedes retirar cuando quieras
-• Diversificación de recompensas
-
-¿Quieres saber más sobre cómo hacer staking o sobre estrategias?"""
-        }
-        
-        if category and category in category_responses:
-            return category_responses[category]
-        
-        # Respuesta genérica si no encontramos nada específico
-        return """Entiendo tu pregunta y quiero ayudarte lo mejor posible.
-
-RSC Chain es una blockchain avanzada con varias áreas importantes:
-
-**Funcionalidades principales:**
-• ⛏️ Minería Web - Minar tokens desde tu navegador
-• 💼 Wallet - Gestionar tus tokens de forma segura
-• 🔒 Staking - Generar recompensas delegando tokens
-• 🔄 P2P Trading - Intercambiar tokens con otros usuarios
-• 🔍 Explorer - Revisar bloques y transacciones
-
-Cuéntame qué parte estás explorando o qué problema específico ves y te guiaré paso a paso. Si aparece un mensaje de error, indícamelo para darte la solución exacta."""
+        # Respuestas genéricas por categoría o, si no hay categoría conocida, la general
+        return table.category_answer(category)
+    
+    def _response_table(self):
+        """Tabla de respuestas del idioma por defecto"""
+        return self._default_model.response_table()
     
-    def _generate_escalation_message(self, original_message):
+    def _generate_escalation_message(self, original_message, locale_model=None):
         """Genera mensaje cuando necesita escalar a soporte humano"""
-        return """Entiendo que tu pregunta es muy específica o que estás experimentando un problema técnico que requiere atención personalizada.
-
-Para que nuestro equipo de soporte pueda ayudarte de la mejor manera, necesito algunos datos:
+        return (locale_model or self._default_model).pack.ESCALATION_MESSAGE
 
-📧 **Tu email**: ¿Podrías compartir tu dirección de email?
-👤 **Tu nombre de usuario**: ¿Cuál es tu nombre de usuario en RSC Chain?
-
-Una vez que tengamos esta información, nuestro equipo se pondrá en contacto contigo para resolver tu problema lo antes posible.
-
-**Por favor, comparte tu email y username cuando estés listo.**"""
-
-    def _build_issue_patterns(self):
-        """Crea los patrones para detectar problemas comunes por categoría"""
-        return {
-            'mining': [
-                (re.compile(r'(no puedo|minar no|no me deja|minar.*no funciona|no inicia|no arranca)'), 'cannot_start'),
-                (re.compile(r'(no recibo|no veo|sin recompensa|no me dieron|no aparecen).*recompensa'), 'no_rewards')
-            ],
-            'wallet': [
-                (re.compile(r'(no puedo|no me deja|error).*crear.*wallet'), 'cannot_create'),
-                (re.compile(r'(balance|saldo).*(incorrecto|no coincide|no se actualiza)'), 'wrong_balance')
-            ],
-            'staking': [
-                (re.compile(r'(no puedo|no me deja|error).*delegar'), 'cannot_delegate'),
-                (re.compile(r'(no recibo|sin recompensa|no llegan).*staking'), 'no_rewards')
-            ]
-        }
-
-    def _handle_troubleshooting(self, category, message):
+    def _handle_troubleshooting(self, category, message, context=None, locale_model=None):
         """Devuelve una respuesta de troubleshooting conversacional"""
+        model = locale_model or self._default_model
+        table = model.response_table()
         if category:
-            troubleshooting = self.knowledge.get_troubleshooting_info(category)
-            if troubleshooting:
-                issue_key = self._detect_issue_type(category, message)
-                if issue_key and issue_key in troubleshooting:
-                    steps = troubleshooting[issue_key]
-                    return self._format_troubleshooting_response(category, issue_key, steps)
-                else:
-                    combined_steps = '\n\n'.join(steps for steps in troubleshooting.values())
-                    return (
-                        "Entiendo que algo no está funcionando como debería. "
-                        "Revisa estos puntos clave por favor:\n\n"
-                        f"{combined_steps}\n\n"
-                        "Si alguno falla o ves un mensaje de error, cuéntamelo y busco una solución específica."
-                    )
-
-        general_troubleshooting = self.knowledge.get_category_info('troubleshooting')
-        general_text = general_troubleshooting.get('general') if general_troubleshooting else ''
-        if general_text:
-            return (
-                "Entiendo que estás experimentando un problema y quiero ayudarte. "
-                f"Mientras lo revisamos, revisa lo siguiente:\n\n{general_text}\n\n"
-                "Indícame qué paso ya probaste o qué mensaje aparece y lo revisamos juntos."
-            )
+            combined = table.combined_troubleshooting.get(category)
+            if combined:
+                # Si el mensaje no dice cuál es el problema, seguir con el que ya se estaba tratando
+                issue_key = model.detect_issue_type(category, message)
+                if issue_key is None and context is not None:
+                    issue_key = context.issue_for(category)
+                return table.troubleshooting.get((category, issue_key), combined)
 
-        return None
+        return table.general_troubleshooting
 
-    def _detect_issue_type(self, category, message):
+    def _detect_issue_type(self, category, message, locale_model=None):
         """Detecta el tipo de problema específico mediante patrones"""
-        patterns = self.issue_patterns.get(category, [])
-        for pattern, issue_key in patterns:
-            if pattern.search(message.lower()):
-                return issue_key
-        return None
+        return (locale_model or self._default_model).detect_issue_type(category, message)
 
-    def _format_troubleshooting_response(self, category, issue_key, steps):
+    def _format_troubleshooting_response(self, category, issue_key, steps, locale_model=None):
         """Crea un mensaje amigable con los pasos a seguir"""
-        title = self.issue_titles.get((category, issue_key), 'el problema')
-        intro = (
-            f"Gracias por avisar. Veo que estás teniendo dificultades para {title}. "
-            "Vamos a revisarlo paso a paso:"
-        )
-        closing = (
-            "\n\nCuando termines estos pasos dime cuál te falló o si aparece algo distinto y seguimos avanzando."
-        )
-        return f"{intro}\n\n{steps}{closing}"
-
+        pack = (locale_model or self._default_model).pack
+        title = pack.ISSUE_TITLES.get((category, issue_key), pack.DEFAULT_ISSUE_TITLE)
+        return format_troubleshooting(pack, title, steps)
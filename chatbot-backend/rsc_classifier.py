@@ -0,0 +1,89 @@
+"""
+Clasificador de mensajes para RSC Chain Chatbot
+Detecta intenciones y categorías recorriendo el mensaje una sola vez con una expresión compilada
+"""
+import re
+from collections import namedtuple
+
+
+# locale: idioma en que se clasificó el mensaje (None si no se indicó)
+Classification = namedtuple('Classification', ['intent', 'category', 'intents', 'categories', 'locale'],
+                            defaults=(None,))
+
+
+class MessageClassifier:
+    """
+    Compila todas las palabras clave en una única alternancia
+
+    Las intenciones se buscan como palabras completas (igual que con \\b) y las
+    categorías como subcadenas. Si una palabra clave contiene a otra, ambas cuentan.
+    """
+
+    def __init__(self, intents, categories, default_intent='general', locale=None):
+        self.locale = locale
+        self.intent_order = list(intents)
+        self.category_order = list(categories)
+        self.default_intent = default_intent
+        self.category_rank = {name: -position for position, name in enumerate(self.category_order)}
+
+        # término -> [(tipo, etiqueta, requiere_limites_de_palabra)]
+        self.term_labels = {}
+        for intent, keywords in intents.items():
+            for keyword in keywords:
+                self.term_labels.setdefault(keyword, []).append(('intent', intent, True))
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                self.term_labels.setdefault(keyword, []).append(('category', category, False))
+
+        # Para cada término, los términos más cortos que aparecen dentro de él
+        self.nested_terms = {}
+        for term in self.term_labels:
+            nested = []
+            for other in self.term_labels:
+                if other == term:
+                    continue
+                start = term.find(other)
+                while start != -1:
+                    nested.append((other, start))
+                    start = term.find(other, start + 1)
+            self.nested_terms[term] = nested
+
+        alternatives = sorted(self.term_labels, key=lambda term: (-len(term), term))
+        self.pattern = re.compile('|'.join(re.escape(term) for term in alternatives))
+
+    def classify(self, message):
+        """
+        Clasifica un mensaje ya en minúsculas
+
+        Returns:
+            Classification: intención y categoría elegidas junto con la puntuación de cada una
+        """
+        intents = {}
+        categories = {}
+        for match in self.pattern.finditer(message):
+            term = match.group()
+            start = match.start()
+            self._count(message, term, start, intents, categories)
+            for nested, offset in self.nested_terms[term]:
+                self._count(message, nested, start + offset, intents, categories)
+
+        # Las intenciones mantienen su prioridad; la categoría con más coincidencias gana
+        intent = next((name for name in self.intent_order if name in intents), self.default_intent)
+        category = None
+        if categories:
+            category = max(categories, key=lambda name: (categories[name], self.category_rank[name]))
+        return Classification(intent, category, intents, categories, self.locale)
+
+    def _count(self, message, term, start, intents, categories):
+        end = start + len(term)
+        for kind, label, bounded in self.term_labels[term]:
+            if bounded and not self._is_word(message, start, end):
+                continue
+            scores = intents if kind == 'intent' else categories
+            scores[label] = scores.get(label, 0) + 1
+
+    @staticmethod
+    def _is_word(message, start, end):
+        before = message[start - 1] if start > 0 else ' '
+        after = message[end] if end < len(message) else ' '
+        return not (before.isalnum() or before == '_') and not (after.isalnum() or after == '_')
@@ -2,290 +2,421 @@
 Base de Conocimiento de RSC Chain
 Contiene toda la información necesaria para que el bot responda preguntas
 """
+import hashlib
+import json
+import math
+import re
+import unicodedata
+from collections import defaultdict
+
+from locales import DEFAULT_LOCALE, load_pack
+
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Palabras vacías (español e inglés) que no aportan a la búsqueda
+STOPWORDS = frozenset("""
+a al algo ante como con cual cuando de del desde donde el ella ellos en entre
+es esa ese eso esta este esto estoy fue ha hay la las le les lo los me mi mis
+muy no o para pero por puedo que se si sin sobre su sus te tengo ti tu tus un
+una uno y ya yo puede hacer quiero necesito saber hola gracias favor
+an and are as at be by can do does for from how i in is it me my of on or the
+to what when where which who why with you your have has had not if this that
+there get got am was were its any some please hello thanks need want
+""".split())
+
+
+class _AccentTable(dict):
+    """
+    Tabla para str.translate: cada carácter se descompone (NFKD) y pierde sus
+    marcas combinantes la primera vez que aparece; después es una consulta al
+    diccionario. Guarda como mucho MAX_SIZE caracteres distintos.
+    """
+
+    MAX_SIZE = 4096
+
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        stripped = ''.join(
+            ch for ch in unicodedata.normalize('NFKD', char) if not unicodedata.combining(ch)
+        )
+        value = codepoint if stripped == char else (stripped or None)
+        if len(self) < self.MAX_SIZE:
+            self[codepoint] = value
+        return value
+
+
+ACCENT_TABLE = _AccentTable()
+
+
+def normalize_text(text):
+    """Pasa el texto a minúsculas y elimina los acentos"""
+    lowered = text.lower()
+    if lowered.isascii():
+        return lowered
+    return lowered.translate(ACCENT_TABLE)
+
+
+def stem_token(token):
+    """Reduce plurales simples para que 'recompensas' coincida con 'recompensa'"""
+    if len(token) > 4 and not token.endswith('ss'):
+        if token.endswith('es') and token[-3] not in 'aeiou':
+            return token[:-2]
+        if token.endswith('s'):
+            return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Divide un texto en términos normalizados para el índice"""
+    return normalized_terms(normalize_text(text))
+
+
+def normalized_terms(normalized):
+    """Términos de un texto ya pasado por normalize_text"""
+    return [
+        stem_token(token)
+        for token in TOKEN_PATTERN.findall(normalized)
+        if token not in STOPWORDS and len(token) > 1
+    ]
+
+
+# Preguntas de definición ("¿qué es el staking?", "what is p2p"): suman el término
+# del tema 'what_is' para que ganen las entradas que explican qué es cada cosa.
+# Los pares de palabras seguidas de la consulta ("rsc chain") suman las claves
+# compuestas con el mismo nombre ('rsc_chain')
+DEFINITION_PATTERN = re.compile(r'(?<!por )\b(?:que (?:es|son)|what (?:is|are))\b')
+DEFINITION_TERM = 'what_is'
+# Reportes de problemas ("no puedo iniciar la minería", "my balance is wrong"): suman
+# el término 'troubleshooting' para que ganen las guías de resolución de problemas
+ISSUE_PATTERN = re.compile(
+    r"\b(?:no (?:puedo|recibo|me deja|funciona|carga|inicia|arranca|aparece|llega|veo)"
+    r"|problemas?|error(?:es)?|fallo|falla|bug"
+    r"|can ?not|can't|doesn't work|not working|problems?|issues?|wrong|broken)\b"
+)
+ISSUE_TERM = 'troubleshooting'
+
+
+def key_terms(entry):
+    """Términos de las claves de una entrada: categoría, tema y subtema ('staking', 'what_is', 'stake'...)"""
+    terms = []
+    for key in (entry['category'], entry.get('topic'), entry.get('subtopic')):
+        if not key:
+            continue
+        key = key.lower()
+        if '_' in key:
+            # La clave completa ('rsc_chain') coincide con las mismas palabras seguidas en la consulta
+            terms.append('_'.join(stem_token(part) for part in key.split('_')))
+        terms.extend(tokenize(key.replace('_', ' ')))
+    return terms
+
+
+def split_query(query):
+    """
+    Términos de búsqueda de una consulta
+
+    Returns:
+        tuple: (términos del texto, pares de palabras seguidas ('rsc_chain'),
+        términos extra que solo suman puntuación)
+    """
+    normalized = normalize_text(query)
+    terms = normalized_terms(normalized)
+    phrases = [f'{first}_{second}' for first, second in zip(terms, terms[1:])]
+    boost = []
+    if DEFINITION_PATTERN.search(normalized):
+        boost.append(DEFINITION_TERM)
+    if ISSUE_PATTERN.search(normalized):
+        boost.append(ISSUE_TERM)
+    return terms, phrases, boost
+
+
+class KnowledgeIndex:
+    """
+    Índice invertido con puntuación BM25 sobre las entradas de la base de conocimiento
+
+    Cada entrada se indexa con los términos de su texto y los de sus claves
+    (categoría, tema y subtema), así "qué es el staking" encuentra
+    staking/what_is. Una entrada solo cuenta como resultado si contiene al
+    menos min_coverage de la información de la consulta (sus términos
+    distintos ponderados por idf): una sola palabra en común ("asdf qwer zxcv
+    tokens") o un término que aparece en casi todas las entradas ("rsc") no alcanza.
+    """
+
+    def __init__(self, entries, k1=1.2, b=0.75, postings=None, doc_lengths=None):
+        """postings y doc_lengths ya calculados (de un snapshot) evitan volver a tokenizar las entradas"""
+        self.entries = entries
+        self.k1 = k1
+        self.b = b
+        if postings is None:
+            postings, doc_lengths = self._build_postings(entries)
+        self.postings = postings  # término -> [(entry_id, frecuencia)]
+        self.doc_lengths = doc_lengths
+        self.category_sizes = defaultdict(int)
+        for entry in entries:
+            self.category_sizes[entry['category']] += 1
+        entry_terms = [set() for _ in entries]
+        for term, posting in postings.items():
+            for entry_id, _ in posting:
+                entry_terms[entry_id].add(term)
+        self.entry_terms = [frozenset(terms) for terms in entry_terms]  # entry_id -> términos distintos
+
+        total = len(entries)
+        self.avg_length = (sum(self.doc_lengths) / total) if total else 0.0
+        self.idf = {
+            term: math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self.postings.items()
+        }
+        self.max_idf = max(self.idf.values(), default=0.0)
+        self.min_idf = min(self.idf.values(), default=0.0)
+        self.entry_categories = [entry['category'] for entry in entries]
+        # k1 * normalización por longitud de cada entrada, el denominador de BM25
+        self.length_norms = [
+            self.k1 * (1 - self.b + self.b * length / self.avg_length) for length in self.doc_lengths
+        ]
+
+    @staticmethod
+    def _build_postings(entries):
+        postings = defaultdict(list)
+        doc_lengths = []
+        for entry_id, entry in enumerate(entries):
+            terms = tokenize(entry['content']) + key_terms(entry)
+            doc_lengths.append(len(terms))
+            frequencies = defaultdict(int)
+            for term in terms:
+                frequencies[term] += 1
+            for term, frequency in frequencies.items():
+                postings[term].append((entry_id, frequency))
+        return dict(postings), doc_lengths
+
+    def score(self, query_terms, category=None):
+        """Devuelve {entry_id: puntuación} para los términos de la consulta"""
+        scores = defaultdict(float)
+        self._accumulate(set(query_terms), category, scores)
+        return scores
+
+    def _accumulate(self, terms, category, scores, matched=None):
+        """Suma a scores la puntuación BM25 de terms y, con matched, el idf de los términos que contiene cada entrada"""
+        k1_plus_one = self.k1 + 1
+        for term in terms:
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = self.idf[term]
+            for entry_id, frequency in posting:
+                if category and self.entry_categories[entry_id] != category:
+                    continue
+                scores[entry_id] += idf * frequency * k1_plus_one / (frequency + self.length_norms[entry_id])
+                if matched is not None:
+                    matched[entry_id] += idf
+
+    def query_weight(self, query_terms, category=None):
+        """
+        Información de los términos distintos de una consulta: la suma de sus idf
+
+        Sin categoría la consulta tiene que explicarse solo con el conocimiento:
+        un término que no está en el índice pesa como el más raro ("asdf") y el
+        total nunca es menor que el idf de un término de una sola entrada, así
+        un término común a muchas entradas ("rsc", "token") no alcanza por sí
+        solo una cobertura completa. Con categoría el clasificador ya confirmó
+        el tema y un término desconocido ("hago", "empiezo") pesa como el más común.
+        """
+        if category:
+            return sum(self.idf.get(term, self.min_idf) for term in query_terms)
+        total = sum(self.idf.get(term, self.max_idf) for term in query_terms)
+        return max(total, self.max_idf)
+
+    def coverage(self, query_terms, entry_id, query_weight=None):
+        """Fracción de la información de la consulta (sus términos ponderados por idf) que contiene la entrada (0 a 1)"""
+        distinct = query_terms if isinstance(query_terms, frozenset) else frozenset(query_terms)
+        if not distinct:
+            return 0.0
+        if query_weight is None:
+            query_weight = self.query_weight(distinct)
+        matched = sum(self.idf[term] for term in distinct & self.entry_terms[entry_id])
+        return min(1.0, matched / query_weight)
+
+    def top(self, query_terms, category=None, limit=5, min_score=0.0, min_coverage=0.0, boost_terms=()):
+        """
+        Devuelve las mejores entradas ordenadas por puntuación
+
+        boost_terms suman puntuación pero no cuentan para la cobertura.
+
+        Returns:
+            list: [(puntuación, cobertura, entry_id)]
+        """
+        distinct = frozenset(query_terms)
+        scores = defaultdict(float)
+        matched = defaultdict(float)  # entry_id -> idf de los términos de la consulta que contiene
+        self._accumulate(distinct, category, scores, matched)
+        self._accumulate(set(boost_terms) - distinct, category, scores)
+        query_weight = self.query_weight(distinct, category)
+        ranked = []
+        for entry_id, score in scores.items():
+            if score < min_score:
+                continue
+            coverage = min(1.0, matched[entry_id] / query_weight)
+            if coverage >= min_coverage:
+                ranked.append((score, coverage, entry_id))
+        ranked.sort(key=lambda item: (-item[0], item[2]))
+        return ranked[:limit]
+
+
+def collect_entries(knowledge_base):
+    """Aplana la base de conocimiento en entradas indexables"""
+    entries = []
+    for cat, content in knowledge_base.items():
+        if not isinstance(content, dict):
+            continue
+        for key, value in content.items():
+            if isinstance(value, dict):
+                for sub_key, sub_value in value.items():
+                    if isinstance(sub_value, str):
+                        entries.append({
+                            'category': cat,
+                            'topic': key,
+                            'subtopic': sub_key,
+                            'content': sub_value
+                        })
+            elif isinstance(value, str):
+                entries.append({
+                    'category': cat,
+                    'topic': key,
+                    'content': value
+                })
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, str):
+                        entries.append({
+                            'category': cat,
+                            'topic': key,
+                            'content': item
+                        })
+    return entries
+
+
+class KnowledgeState:
+    """Contenido de la base de conocimiento junto con todo lo que se deriva de él"""
+
+    def __init__(self, knowledge_base, version=0, index=None):
+        self.knowledge_base = knowledge_base
+        self.version = version
+        serialized = json.dumps(knowledge_base, sort_keys=True, ensure_ascii=False)
+        self.content_hash = hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+        # index: KnowledgeIndex ya construido para este contenido (de un snapshot)
+        self.index = index if index is not None else KnowledgeIndex(collect_entries(knowledge_base))
+        self.troubleshooting = {
+            category: dict(content['troubleshooting'])
+            for category, content in knowledge_base.items()
+            if isinstance(content, dict) and isinstance(content.get('troubleshooting'), dict)
+        }
+        self.vectors = None
+
+    def vector_index(self):
+        """Matriz TF-IDF de las entradas; se construye la primera vez que se usa (requiere NumPy)"""
+        vectors = getattr(self, 'vectors', None)
+        if vectors is None:
+            from vector_index import TfidfIndex
+            vectors = self.vectors = TfidfIndex(self.index)
+        return vectors
 
 
 class RSCKnowledgeBase:
     """Base de conocimiento completa sobre RSC Chain"""
     
-    def __init__(self):
-        self.knowledge_base = self._build_knowledge_base()
+    # Puntuación mínima para considerar relevante una entrada
+    MIN_SCORE = 1.5
+    # Fracción mínima de los términos de la consulta que tiene que contener la entrada;
+    # menor si el mensaje ya trae una categoría y la búsqueda se limita a ella
+    MIN_COVERAGE = 0.5
+    MIN_CATEGORY_COVERAGE = 0.3
+    # Similitud coseno mínima en el modo 'tfidf'
+    MIN_SIMILARITY = 0.1
+
+    def __init__(self, state=None, retrieval='bm25', locale=DEFAULT_LOCALE):
+        # Idioma del contenido (módulo de locales/ del que sale la base de conocimiento)
+        self.locale = locale
+        # Todo el estado vive en un único objeto para poder reemplazarlo de forma atómica
+        self._state = state if state is not None else KnowledgeState(self._build_knowledge_base())
+        # 'bm25' (índice invertido) o 'tfidf' (similitud coseno con NumPy)
+        self.retrieval = retrieval
+        if retrieval == 'tfidf':
+            # NumPy es opcional: sin él, fallar al arrancar y no en la primera búsqueda
+            import vector_index  # noqa: F401
+
+    @property
+    def knowledge_base(self):
+        return self._state.knowledge_base
+
+    @property
+    def index(self):
+        return self._state.index
+
+    @property
+    def version(self):
+        return self._state.version
+
+    @property
+    def content_hash(self):
+        return self._state.content_hash
+
+    def reload(self, knowledge_base=None):
+        """Reemplaza el contenido, reconstruye el índice e incrementa la versión"""
+        if knowledge_base is None:
+            knowledge_base = self._build_knowledge_base()
+        self.swap_state(KnowledgeState(knowledge_base))
+
+    def swap_state(self, state):
+        """
+        Publica un nuevo estado ya construido (por ejemplo, cargado de un snapshot)
+
+        Las peticiones en curso siguen usando el estado que ya leyeron.
+        """
+        state.version = self._state.version + 1
+        self._state = state
     
     def _build_knowledge_base(self):
-        """Construye la base de conocimiento completa"""
-        return {
-            'general': {
-                'rsc_chain': {
-                    'description': """RSC Chain es una blockchain de próxima generación que combina las mejores características de Proof of Work (PoW), Proof of Stake (PoS) e Inteligencia Artificial (AI). Es una plataforma descentralizada que ofrece transacciones rápidas, seguridad cuántica y verdadera descentralización.""",
-                    'features': [
-                        'Transacciones ultra-rápidas (10,000+ TPS)',
-                        'Seguridad cuántica resistente',
-                        'Consenso híbrido PoW + PoS + AI',
-                        'Sin ICO o pre-venta',
-                        'Distribución justa mediante minería web',
-                        'Red descentralizada con 99.99% uptime'
-                    ],
-                    'tech_specs': {
-                        'tps': '10,000+ transacciones por segundo',
-                        'finality': '1.8 segundos',
-                        'security': '512-bit, Quantum Safe',
-                        'uptime': '99.99%',
-                        'total_supply': '2.1M RSC tokens',
-                        'burned': '50% ya quemados (1.05M RSC circulando)'
-                    }
-                },
-                'what_is': """RSC Chain es una blockchain revolucionaria que utiliza tecnología de vanguardia para ofrecer:
-• Minería web accesible desde cualquier navegador
-• Sistema de staking avanzado con validadores
-• Trading P2P descentralizado
-• Wallet no-custodial segura
-• Explorer completo de la blockchain
-• Sin necesidad de KYC o bancos tradicionales"""
-            },
-            
-            'mining': {
-                'how_to_start': """Para empezar a minar RSC Chain:
-1. Ve a la página de Mining (pages/mine.html)
-2. Haz clic en "Iniciar Minería" o "Start Mining"
-3. El sistema iniciará automáticamente una sesión de 24 horas
-4. Tus recompensas se acumularán durante la sesión
-5. Puedes reclamar tus recompensas al finalizar la sesión
-
-La minería es completamente web-based, no necesitas instalar software.""",
-                
-                'session_duration': """Cada sesión de minería dura exactamente 24 horas. Una vez que finaliza, debes esperar un período de cooldown antes de iniciar una nueva sesión.""",
-                
-                'rewards': """Las recompensas de minería se calculan automáticamente y se distribuyen al finalizar cada sesión de 24 horas. El sistema es completamente automático y no requiere intervención manual.""",
-                
-                'troubleshooting': {
-                    'cannot_start': """Si no puedes iniciar la minería:
-• Verifica que tu sesión anterior haya finalizado completamente
-• Asegúrate de que no estés en período de cooldown
-• Limpia la caché del navegador y recarga la página
-• Verifica tu conexión a internet
-• Si el problema persiste, contacta al soporte""",
-                    
-                    'no_rewards': """Si no recibes recompensas:
-• Verifica que hayas completado una sesión completa de 24 horas
-• Asegúrate de haber iniciado correctamente la minería
-• Revisa tu historial de sesiones en la página de Mining
-• Espera unos minutos después de finalizar la sesión
-• Contacta al soporte si el problema persiste"""
-                },
-                
-                'tips': """Consejos para optimizar tu minería:
-• Mantén el navegador abierto durante las 24 horas
-• Usa una conexión estable a internet
-• No cierres la pestaña del navegador durante la minería
-• Verifica regularmente el estado de tu sesión
-• Reclama tus recompensas tan pronto como estén disponibles"""
-            },
-            
-            'wallet': {
-                'creation': """Para crear una wallet en RSC Chain:
-1. Ve a la página de Wallet (pages/wallet.html)
-2. Haz clic en "Crear Wallet" o "Create Wallet"
-3. Guarda cuidadosamente tu clave privada (private key)
-4. Guarda tu frase mnemotécnica si se proporciona
-5. Nunca compartas tu clave privada con nadie
-
-IMPORTANTE: Tu wallet es no-custodial, solo tú tienes acceso a tus fondos.""",
-                
-                'security': """Seguridad de la Wallet:
-• Las claves privadas NUNCA salen de tu navegador
-• Guarda tu clave privada en un lugar seguro
-• Considera usar un gestor de contraseñas
-• Haz backup de tu clave privada en múltiples lugares seguros
-• Nunca compartas tu clave privada por email, mensaje o redes sociales
-• Verifica siempre que estés en el sitio oficial de RSC Chain""",
-                
-                'balance': """Para consultar tu balance:
-1. Ve a la página de Wallet
-2. Ingresa tu dirección de wallet
-3. El sistema consultará automáticamente tu balance en la blockchain
-4. Tu balance se actualiza en tiempo real""",
-                
-                'send_transaction': """Para enviar una transacción:
-1. Ve a la sección "Enviar" en tu wallet
-2. Ingresa la dirección de destino
-3. Especifica la cantidad de RSC a enviar
-4. Revisa los detalles cuidadosamente
-5. Confirma la transacción
-6. Espera la confirmación en la blockchain (1.8 segundos promedio)""",
-                
-                'troubleshooting': {
-                    'cannot_create': """Si no puedes crear una wallet:
-• Verifica que tu navegador soporte JavaScript
-• Asegúrate de tener conexión a internet
-• Intenta en otro navegador (Chrome, Firefox, Edge)
-• Limpia la caché del navegador
-• Contacta al soporte si el problema persiste""",
-                    
-                    'wrong_balance': """Si tu balance no es correcto:
-• Espera unos segundos y recarga la página
-• Verifica que estés usando la dirección correcta
-• Asegúrate de que tus transacciones hayan sido confirmadas
-• Consulta el Explorer para ver tus transacciones
-• Si el problema persiste, contacta al soporte"""
-                }
-            },
-            
-            'staking': {
-                'what_is': """Staking en RSC Chain te permite:
-• Delegar tus tokens RSC a validadores
-• Ganar recompensas pasivas por participar en la seguridad de la red
-• Contribuir a la descentralización de la red
-• Retirar tus tokens cuando quieras (sin período de lock)""",
-                
-                'how_to_stake': """Para hacer staking:
-1. Ve a la página de Staking (pages/staking.html)
-2. Revisa los pools de staking disponibles
-3. Selecciona un validador o pool
-4. Especifica la cantidad de RSC a delegar
-5. Confirma la delegación
-6. Tus recompensas comenzarán a acumularse automáticamente""",
-                
-                'strategies': """Estrategias de Staking:
-• Diversificación: Delegar a múltiples validadores reduce riesgos
-• Validadores activos: Elige validadores con buen historial
-• Recompensas: Compara las tasas de recompensa entre validadores
-• Descentralización: Apoya validadores más pequeños para ayudar a descentralizar la red""",
-                
-                'rewards': """Las recompensas de staking:
-• Se calculan automáticamente
-• Dependen del validador y la cantidad delegada
-• Se distribuyen periódicamente
-• Puedes retirar tus recompensas cuando quieras""",
-                
-                'troubleshooting': {
-                    'cannot_delegate': """Si no puedes delegar:
-• Verifica que tengas suficientes tokens RSC
-• Asegúrate de tener conexión a internet
-• Verifica que el validador esté activo
-• Recarga la página e intenta nuevamente""",
-                    
-                    'no_rewards': """Si no recibes recompensas de staking:
-• Verifica que hayas delegado correctamente
-• Asegúrate de que el validador esté activo
-• Espera el período de distribución de recompensas
-• Consulta tu historial de delegaciones
-• Contacta al soporte si el problema persiste"""
-                }
-            },
-            
-            'p2p': {
-                'what_is': """P2P Trading en RSC Chain permite:
-• Intercambiar tokens RSC de forma descentralizada
-• Crear y responder a anuncios de compra/venta
-• Realizar trades seguros con sistema de escrow
-• Comunicarte directamente con otros traders""",
-                
-                'how_to_trade': """Para usar P2P Trading:
-1. Ve a la página P2P (pages/p2p.html)
-2. Explora los anuncios disponibles
-3. Crea tu propio anuncio si quieres comprar o vender
-4. Responde a anuncios que te interesen
-5. Completa el trade siguiendo las instrucciones
-6. El sistema de escrow mantendrá los fondos seguros hasta completar el trade""",
-                
-                'safety': """Seguridad en P2P Trading:
-• Usa el sistema de escrow siempre
-• Verifica la reputación del trader
-• Comunícate claramente antes de iniciar un trade
-• No compartas tu clave privada nunca
-• Reporta cualquier actividad sospechosa"""
-            },
-            
-            'explorer': {
-                'features': """El Explorer de RSC Chain te permite:
-• Ver transacciones en tiempo real
-• Explorar bloques de la blockchain
-• Consultar direcciones de wallets
-• Ver estadísticas de la red
-• Analizar el crecimiento de la blockchain""",
-                
-                'how_to_use': """Para usar el Explorer:
-1. Ve a la página Explorer (pages/explorer.html)
-2. Busca por dirección de wallet, hash de transacción o número de bloque
-3. Explora las estadísticas de la red
-4. Revisa el historial de transacciones
-5. Analiza los datos de la blockchain"""
-            },
-            
-            'technical': {
-                'consensus': """RSC Chain usa un consenso híbrido único:
-• Proof of Work (PoW): Para seguridad y distribución justa
-• Proof of Stake (PoS): Para eficiencia y velocidad
-• Inteligencia Artificial (AI): Para optimización y decisiones inteligentes
-Esta combinación ofrece lo mejor de todos los mundos.""",
-                
-                'security': """Seguridad de RSC Chain:
-• Criptografía post-cuántica (PQC)
-• Resistente a ataques cuánticos futuros
-• Validación descentralizada
-• Sin puntos únicos de fallo
-• Red distribuida globalmente""",
-                
-                'api': """API de RSC Chain:
-• Base URL: https://rsc-chain-production.up.railway.app/
-• Endpoints principales:
-  - /api/v1/wallet/* - Operaciones de wallet
-  - /api/v1/mining/* - Operaciones de minería
-  - /api/v1/blockchain/* - Información de blockchain
-  - /api/v1/tx/* - Transacciones"""
-            },
-            
-            'troubleshooting': {
-                'general': """Problemas comunes y soluciones:
-• Problemas de conexión: Verifica tu internet, limpia caché
-• Errores de página: Recarga, prueba otro navegador
-• Transacciones lentas: Normalmente se confirman en 1.8 segundos
-• Balance incorrecto: Espera unos segundos, recarga la página
-• Si nada funciona: Contacta al soporte con tu email y username""",
-                
-                'contact_support': """Si necesitas ayuda adicional:
-1. Proporciona tu email
-2. Proporciona tu nombre de usuario
-3. Describe el problema en detalle
-4. Nuestro equipo te contactará pronto"""
-            }
-        }
+        """Construye la base de conocimiento completa desde el paquete del idioma"""
+        return load_pack(self.locale).build_knowledge_base()
     
-    def search(self, query, category=None):
-        """Busca información relevante en la base de conocimiento"""
-        query_lower = query.lower()
-        results = []
-        
+    def search(self, query, category=None, limit=5):
+        """
+        Busca información relevante en la base de conocimiento
+
+        Returns:
+            list: entradas ordenadas de mayor a menor relevancia, cada una con su
+            'score', su 'coverage' (fracción de la información de la consulta
+            que contiene) y, en el modo 'tfidf', su 'similarity'; ambas entre 0 y 1
+        """
+        query_terms, phrases, boost_terms = split_query(query)
+        if not query_terms:
+            return []
+
+        state = self._state
+        index = state.index
+        # Un par de palabras que es una clave del conocimiento ("rsc chain") cuenta como un término más
+        query_terms += [phrase for phrase in phrases if phrase in index.idf]
+
         # Si se especifica categoría, buscar solo ahí
-        search_base = {category: self.knowledge_base[category]} if category and category in self.knowledge_base else self.knowledge_base
-        
-        for cat, content in search_base.items():
-            if isinstance(content, dict):
-                for key, value in content.items():
-                    if isinstance(value, dict):
-                        # Buscar en sub-diccionarios
-                        for sub_key, sub_value in value.items():
-                            if isinstance(sub_value, str) and query_lower in sub_value.lower():
-                                results.append({
-                                    'category': cat,
-                                    'topic': key,
-                                    'subtopic': sub_key,
-                                    'content': sub_value
-                                })
-                    elif isinstance(value, str) and query_lower in value.lower():
-                        results.append({
-                            'category': cat,
-                            'topic': key,
-                            'content': value
-                        })
-                    elif isinstance(value, list):
-                        for item in value:
-                            if isinstance(item, str) and query_lower in item.lower():
-                                results.append({
-                                    'category': cat,
-                                    'topic': key,
-                                    'content': item
-                                })
-        
+        if category not in index.category_sizes:
+            category = None
+
+        results = []
+        min_coverage = self.MIN_CATEGORY_COVERAGE if category else self.MIN_COVERAGE
+        if self.retrieval == 'tfidf':
+            for similarity, coverage, entry_id in state.vector_index().top(
+                    query_terms, category, limit, self.MIN_SIMILARITY, min_coverage, boost_terms):
+                result = dict(index.entries[entry_id])
+                result['score'] = result['similarity'] = round(similarity, 4)
+                result['coverage'] = round(coverage, 4)
+                results.append(result)
+            return results
+
+        for score, coverage, entry_id in index.top(query_terms, category, limit, self.MIN_SCORE,
+                                                   min_coverage, boost_terms):
+            result = dict(index.entries[entry_id])
+            result['score'] = round(score, 4)
+            result['coverage'] = round(coverage, 4)
+            results.append(result)
         return results
     
     def get_category_info(self, category):
@@ -294,8 +425,7 @@ Esta combinación ofrece lo mejor de todos los mundos.""",
 
     def get_troubleshooting_info(self, category):
         """Devuelve los pasos de resolución de problemas para una categoría"""
-        category_info = self.knowledge_base.get(category, {})
-        return category_info.get('troubleshooting', {})
+        return self._state.troubleshooting.get(category, {})
 
     def list_troubleshooting_topics(self, category):
         """Lista las claves disponibles de troubleshooting para una categoría"""
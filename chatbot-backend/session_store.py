@@ -0,0 +1,453 @@
+"""
+Almacén de sesiones del chatbot
+Mantiene las conversaciones con límites de tiempo, cantidad y tamaño
+
+Hay dos implementaciones con la misma interfaz:
+- SessionStore: en memoria del proceso (un solo worker)
+- SQLiteSessionStore: archivo SQLite en modo WAL compartido por todos los workers del nodo
+
+Uso en cada turno de conversación:
+    session = store.get_or_create(session_id)
+    store.append_message(session_id, session, 'user', texto)
+    session['requires_contact_info'] = True
+    store.save(session_id, session)  # puede lanzar SessionConflict
+
+Con un ConversationJournal (conversation_journal.py) ambos registran además
+los mensajes y los cambios de estado en el diario, sin esperar a que se escriban.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from message_history import ROLE_CODES, HistoryRecord, MessageHistory
+
+
+# Estimaciones de memoria usadas para el contador aproximado de bytes
+# (un HistoryRecord con su float, su lugar en el buffer y la cabecera del str)
+SESSION_OVERHEAD_BYTES = 1024
+MESSAGE_OVERHEAD_BYTES = 140
+
+
+class SessionConflict(Exception):
+    """Otro worker guardó la sesión después de que la leímos"""
+
+
+def session_fields(session):
+    """
+    Estado de la sesión sin los mensajes ni las claves internas (las que empiezan con _)
+
+    Los valores con to_dict() (el contexto de la conversación) se guardan como dict
+    """
+    return {
+        key: value.to_dict() if hasattr(value, 'to_dict') else value
+        for key, value in session.items() if key != 'messages' and not key.startswith('_')
+    }
+
+
+def session_state(session):
+    """Estado de la sesión en JSON"""
+    return json.dumps(session_fields(session))
+
+
+def new_session(email='', username='', max_messages=50):
+    return {
+        'messages': MessageHistory(max_messages),
+        'requires_contact_info': False,
+        'contact_attempts': 0,
+        'email': email,
+        'username': username
+    }
+
+
+class SessionStore:
+    """Sesiones en memoria con expiración por inactividad y desalojo LRU"""
+
+    # Las operaciones no hacen E/S, se pueden llamar desde un event loop
+    blocking = False
+
+    def __init__(self, ttl_seconds=1800, max_sessions=10000, max_messages=50, journal=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.journal = journal
+        self._sessions = OrderedDict()  # session_id -> sesión, del menos al más reciente
+        self._last_seen = {}
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+        self.trimmed_messages = 0
+        self.approx_bytes = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            return session_id in self._sessions
+
+    def get(self, session_id):
+        """Devuelve la sesión si existe y sigue activa, marcándola como usada"""
+        with self._lock:
+            now = time.monotonic()
+            self._purge_expired(now)
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._touch(session_id, now)
+            return session
+
+    def get_or_create(self, session_id, email='', username=''):
+        """Devuelve la sesión existente o crea una nueva"""
+        with self._lock:
+            now = time.monotonic()
+            self._purge_expired(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = new_session(email, username, self.max_messages)
+                self._insert(session_id, session)
+                if self.journal is not None:
+                    self.journal.record_reset(session_id)
+            self._touch(session_id, now)
+            return session
+
+    def restore(self, session_id, state, messages, last_activity):
+        """
+        Vuelve a cargar una sesión leída del diario al arrancar
+
+        Args:
+            state: estado en JSON (o None)
+            messages: [(rol, contenido, created)] del más antiguo al más reciente
+            last_activity: epoch del último registro, para conservar el tiempo que le queda
+        """
+        session = new_session(max_messages=self.max_messages)
+        if state is not None:
+            fields = json.loads(state)
+            session.update(fields)
+            session['_journal_state'] = fields
+        history = session['messages']
+        size = SESSION_OVERHEAD_BYTES
+        for role, content, created in messages:
+            history.append_record(HistoryRecord(ROLE_CODES[role], content, created))
+        for record in history:
+            size += MESSAGE_OVERHEAD_BYTES + len(record.content)
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+            self._insert(session_id, session, size)
+            self._touch(session_id, time.monotonic() - max(0.0, time.time() - last_activity))
+        return session
+
+    def append_message(self, session_id, session, role, content):
+        """Agrega un mensaje a la sesión respetando el máximo de mensajes"""
+        record = HistoryRecord(ROLE_CODES[role], content, time.time())
+        if self.journal is not None:
+            self.journal.record_message(session_id, role, content, record.created)
+        with self._lock:
+            dropped = session['messages'].append_record(record)
+            added = MESSAGE_OVERHEAD_BYTES + len(content)
+            if dropped is not None:
+                self.trimmed_messages += 1
+                added -= MESSAGE_OVERHEAD_BYTES + len(dropped.content)
+            if session_id in self._sizes:
+                self._sizes[session_id] += added
+                self.approx_bytes += added
+
+    def save(self, session_id, session):
+        """
+        Las sesiones en memoria se modifican en el lugar: solo se registra en el
+        diario el estado, si cambió desde la última vez
+        """
+        if self.journal is None:
+            return
+        # Comparar el dict es mucho más barato que serializarlo en cada turno
+        fields = session_fields(session)
+        if fields != session.get('_journal_state'):
+            session['_journal_state'] = fields
+            self.journal.record_state(session_id, json.dumps(fields))
+
+    def delete(self, session_id):
+        """Elimina una sesión"""
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+                if self.journal is not None:
+                    self.journal.record_reset(session_id)
+
+    def purge_expired(self):
+        """Elimina todas las sesiones inactivas y devuelve cuántas se eliminaron"""
+        with self._lock:
+            before = self.expirations
+            self._purge_expired(time.monotonic())
+            return self.expirations - before
+
+    def stats(self):
+        """Contadores del almacén para monitoreo"""
+        return {
+            'backend': 'memory',
+            'live_sessions': len(self._sessions),
+            'max_sessions': self.max_sessions,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'trimmed_messages': self.trimmed_messages,
+            'approx_bytes': self.approx_bytes
+        }
+
+    def _touch(self, session_id, now):
+        self._last_seen[session_id] = now
+        self._sessions.move_to_end(session_id)
+
+    def _purge_expired(self, now):
+        # El OrderedDict está ordenado por último uso, así que basta mirar el inicio
+        while self._sessions:
+            oldest_id = next(iter(self._sessions))
+            if now - self._last_seen[oldest_id] < self.ttl_seconds:
+                break
+            self._remove(oldest_id)
+            self.expirations += 1
+
+    def _insert(self, session_id, session, size=SESSION_OVERHEAD_BYTES):
+        self._sessions[session_id] = session
+        self._sizes[session_id] = size
+        self.approx_bytes += size
+        while len(self._sessions) > self.max_sessions:
+            self._evict_oldest()
+            self.evictions += 1
+
+    def _evict_oldest(self):
+        oldest_id = next(iter(self._sessions))
+        self._remove(oldest_id)
+
+    def _remove(self, session_id):
+        del self._sessions[session_id]
+        del self._last_seen[session_id]
+        self.approx_bytes -= self._sizes.pop(session_id)
+
+
+class SQLiteSessionStore:
+    """
+    Sesiones en un archivo SQLite (modo WAL) compartido entre procesos
+
+    Cada sesión tiene un número de versión: save() solo escribe si nadie la
+    modificó desde que se leyó y, si no, lanza SessionConflict para que el
+    turno se reintente. Cada lectura trae la sesión y sus últimos mensajes en
+    una sola consulta y cada save() escribe estado y mensajes nuevos en una
+    sola transacción.
+    """
+
+    # Cada operación toca el disco: desde un event loop hay que llamarla en un hilo
+    blocking = True
+
+    # Cada cuántas escrituras se revisan expiración y límite de sesiones
+    MAINTENANCE_EVERY = 200
+
+    def __init__(self, path, ttl_seconds=1800, max_sessions=10000, max_messages=50, journal=None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.journal = journal
+        self._local = threading.local()
+        self._writes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.trimmed_messages = 0
+        self.conflicts = 0
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                last_seen REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions(last_seen);
+            CREATE TABLE IF NOT EXISTS session_messages (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS session_messages_session ON session_messages(session_id, seq);
+        """)
+
+    def __len__(self):
+        row = self._connection().execute(
+            'SELECT COUNT(*) FROM sessions WHERE last_seen >= ?', (time.time() - self.ttl_seconds,)
+        ).fetchone()
+        return row[0]
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+    @property
+    def approx_bytes(self):
+        page_count = self._connection().execute('PRAGMA page_count').fetchone()[0]
+        page_size = self._connection().execute('PRAGMA page_size').fetchone()[0]
+        return page_count * page_size
+
+    def get(self, session_id):
+        """Lee la sesión con sus últimos mensajes; None si no existe o expiró"""
+        rows = self._connection().execute("""
+            SELECT s.state, s.version, s.last_seen, m.role, m.content, m.created
+            FROM sessions s
+            LEFT JOIN (
+                SELECT seq, role, content, created FROM session_messages
+                WHERE session_id = ? ORDER BY seq DESC LIMIT ?
+            ) m
+            WHERE s.id = ?
+            ORDER BY m.seq
+        """, (session_id, self.max_messages, session_id)).fetchall()
+        if not rows:
+            return None
+        state, version, last_seen = rows[0][:3]
+        if time.time() - last_seen >= self.ttl_seconds:
+            return None
+        session = json.loads(state)
+        messages = MessageHistory(self.max_messages)
+        for _, _, _, role, content, created in rows:
+            if role is not None:
+                messages.append_record(HistoryRecord(ROLE_CODES[role], content, created))
+        session['messages'] = messages
+        session['_version'] = version
+        session['_new_messages'] = []
+        session['_journal_state'] = state
+        return session
+
+    def get_or_create(self, session_id, email='', username=''):
+        """Devuelve la sesión guardada o una nueva (que se crea al hacer save)"""
+        session = self.get(session_id)
+        if session is None:
+            session = new_session(email, username, self.max_messages)
+            session['_version'] = None
+            session['_new_messages'] = []
+        return session
+
+    def append_message(self, session_id, session, role, content):
+        """Agrega un mensaje; se escribe en la base al llamar a save()"""
+        messages = session['messages']
+        messages.append(role, content)
+        session['_new_messages'].append(messages[-1])
+
+    def save(self, session_id, session):
+        """Escribe estado y mensajes nuevos si la versión no cambió; si cambió lanza SessionConflict"""
+        state = session_state(session)
+        version = session.get('_version')
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            if version is None:
+                # Sesión nueva (o expirada): ocupar el id solo si sigue libre o venció
+                cursor = conn.execute("""
+                    INSERT INTO sessions (id, state, version, last_seen) VALUES (?, ?, 1, ?)
+                    ON CONFLICT(id) DO UPDATE SET state = excluded.state, version = sessions.version + 1,
+                        last_seen = excluded.last_seen
+                    WHERE sessions.last_seen < ?
+                """, (session_id, state, now, now - self.ttl_seconds))
+                reset = cursor.rowcount > 0
+                if reset:
+                    conn.execute('DELETE FROM session_messages WHERE session_id = ?', (session_id,))
+            else:
+                reset = False
+                cursor = conn.execute(
+                    'UPDATE sessions SET state = ?, version = version + 1, last_seen = ? WHERE id = ? AND version = ?',
+                    (state, now, session_id, version)
+                )
+            if cursor.rowcount == 0:
+                self.conflicts += 1
+                raise SessionConflict(session_id)
+
+            new_messages = session['_new_messages']
+            if new_messages:
+                conn.executemany(
+                    'INSERT INTO session_messages (session_id, role, content, created) VALUES (?, ?, ?, ?)',
+                    [(session_id, m.role, m.content, m.created) for m in new_messages]
+                )
+                if len(session['messages']) >= self.max_messages:
+                    trimmed = conn.execute("""
+                        DELETE FROM session_messages WHERE session_id = ? AND seq NOT IN (
+                            SELECT seq FROM session_messages WHERE session_id = ? ORDER BY seq DESC LIMIT ?
+                        )
+                    """, (session_id, session_id, self.max_messages)).rowcount
+                    self.trimmed_messages += trimmed
+            session['_version'] = conn.execute(
+                'SELECT version FROM sessions WHERE id = ?', (session_id,)
+            ).fetchone()[0]
+
+        # Al diario solo va lo que quedó guardado: un turno repetido por conflicto no se duplica
+        if self.journal is not None:
+            if reset:
+                self.journal.record_reset(session_id)
+            for message in session['_new_messages']:
+                self.journal.record_message(session_id, message.role, message.content, message.created)
+            if state != session.get('_journal_state'):
+                self.journal.record_state(session_id, state)
+        session['_journal_state'] = state
+        session['_new_messages'] = []
+        self._writes += 1
+        if self._writes % self.MAINTENANCE_EVERY == 0:
+            self.purge_expired()
+            self._enforce_max_sessions()
+
+    def delete(self, session_id):
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+            conn.execute('DELETE FROM session_messages WHERE session_id = ?', (session_id,))
+        if self.journal is not None:
+            self.journal.record_reset(session_id)
+
+    def purge_expired(self):
+        """Elimina las sesiones inactivas y devuelve cuántas se eliminaron"""
+        conn = self._connection()
+        with conn:
+            removed = conn.execute(
+                'DELETE FROM sessions WHERE last_seen < ?', (time.time() - self.ttl_seconds,)
+            ).rowcount
+            if removed:
+                conn.execute('DELETE FROM session_messages WHERE session_id NOT IN (SELECT id FROM sessions)')
+        self.expirations += removed
+        return removed
+
+    def stats(self):
+        return {
+            'backend': 'sqlite',
+            'live_sessions': len(self),
+            'max_sessions': self.max_sessions,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'trimmed_messages': self.trimmed_messages,
+            'conflicts': self.conflicts,
+            'approx_bytes': self.approx_bytes
+        }
+
+    def _enforce_max_sessions(self):
+        conn = self._connection()
+        with conn:
+            excess = conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0] - self.max_sessions
+            if excess <= 0:
+                return
+            conn.execute("""
+                DELETE FROM sessions WHERE id IN (
+                    SELECT id FROM sessions ORDER BY last_seen LIMIT ?
+                )
+            """, (excess,))
+            conn.execute('DELETE FROM session_messages WHERE session_id NOT IN (SELECT id FROM sessions)')
+        self.evictions += excess
+
+    def _connection(self):
+        # Una conexión por hilo y por proceso (las conexiones no sobreviven a un fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=5000')
+            # Las transacciones toman el lock de escritura al empezar: sin deadlocks entre lectores que escriben
+            conn.isolation_level = 'IMMEDIATE'
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
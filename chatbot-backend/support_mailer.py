@@ -0,0 +1,225 @@
+"""
+Envío de correos de soporte en segundo plano
+Mantiene una conexión SMTP autenticada y envía los tickets en lotes sin bloquear las peticiones
+"""
+import os
+import queue
+import smtplib
+import threading
+import time
+
+from metrics import Histogram
+
+
+SEND_SECONDS = Histogram(
+    'chatbot_support_email_send_seconds',
+    'Tiempo de envío SMTP de cada correo de soporte'
+)
+DELIVERY_SECONDS = Histogram(
+    'chatbot_support_email_delivery_seconds',
+    'Tiempo desde que se encola un correo de soporte hasta que se envía'
+)
+
+
+class SupportMailer:
+    """
+    Cola de correos de soporte con un hilo emisor y una conexión SMTP reutilizada
+
+    Si un lote no se puede enviar, los tickets pendientes vuelven a la cola y el
+    hilo espera min_backoff segundos, el doble en cada fallo seguido hasta
+    max_backoff. Cada fallo (al conectar o al enviar) consume un intento del
+    ticket; al llegar a max_attempts el ticket se descarta. Que el servidor haya
+    cerrado la conexión reutilizada mientras estaba ociosa no es un fallo: se
+    reconecta en el momento, sin gastar un intento ni esperar.
+    """
+
+    def __init__(self, config, batch_size=20, max_queue=1000, idle_timeout=60,
+                 min_backoff=1, max_backoff=60, max_attempts=5):
+        self.config = config
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+        self.idle_timeout = idle_timeout  # segundos sin tickets antes de cerrar la conexión
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._server = None
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.connections = 0
+        self.batches = 0
+        self.retries = 0
+        self.last_send_ms = 0.0
+        self.avg_send_ms = 0.0
+        self.avg_delivery_ms = 0.0
+
+    def enqueue(self, message):
+        """Encola un email.message.Message; devuelve False si la cola está llena"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((message, time.monotonic(), 0))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def stats(self):
+        """Métricas de la cola y de la latencia de envío"""
+        return {
+            'queue_depth': self._queue.qsize(),
+            'sent': self.sent,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'connections': self.connections,
+            'batches': self.batches,
+            'retries': self.retries,
+            'connected': self._server is not None,
+            'last_send_ms': round(self.last_send_ms, 2),
+            'avg_send_ms': round(self.avg_send_ms, 2),
+            'avg_delivery_ms': round(self.avg_delivery_ms, 2)
+        }
+
+    def stop(self, timeout=10):
+        """Intenta vaciar la cola y detiene el hilo emisor"""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid():
+            return
+        deadline = time.monotonic() + timeout
+        while not self._queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self._stopping.set()
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+    def _ensure_started(self):
+        # Tras un fork el hilo del proceso padre no existe en el hijo: se crea uno nuevo
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.max_queue)
+                self._server = None
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._stopping.clear()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='support-mailer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        backoff = self.min_backoff
+        idle_since = time.monotonic()
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                if self._server is not None and time.monotonic() - idle_since >= self.idle_timeout:
+                    self._disconnect()
+                continue
+
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            pending = self._send_batch(batch)
+            if pending:
+                # No se pudo enviar todo: reintentar tras una espera creciente
+                self.retries += 1
+                for item in pending:
+                    self._requeue(item)
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            else:
+                backoff = self.min_backoff
+            idle_since = time.monotonic()
+        self._disconnect()
+
+    def _send_batch(self, batch):
+        """Envía un lote por la conexión abierta; devuelve los tickets pendientes"""
+        self.batches += 1
+        for position, (message, queued_at, attempts) in enumerate(batch):
+            reused = self._server is not None
+            try:
+                server = self._connection()
+            except (smtplib.SMTPException, OSError) as e:
+                # Ningún ticket pendiente del lote se pudo enviar: todos gastan un intento,
+                # así un servidor caído no los hace reintentar para siempre
+                print(f"❌ Error conectando al servidor SMTP: {str(e)}")
+                self._disconnect()
+                return [(queued, at, tries + 1) for queued, at, tries in batch[position:]]
+
+            try:
+                started = time.monotonic()
+                self._deliver(server, message, reused)
+            except smtplib.SMTPRecipientsRefused as e:
+                # El destinatario fue rechazado: reintentar no lo va a arreglar. La
+                # conexión sigue sirviendo (smtplib ya hizo RSET) para el resto del lote
+                print(f"❌ Destinatario rechazado: {str(e)}")
+                self.failed += 1
+                continue
+            except (smtplib.SMTPException, OSError) as e:
+                print(f"❌ Error enviando email: {str(e)}")
+                self._disconnect()
+                return [(message, queued_at, attempts + 1)] + batch[position + 1:]
+
+            finished = time.monotonic()
+            SEND_SECONDS.observe(finished - started)
+            DELIVERY_SECONDS.observe(finished - queued_at)
+            self.sent += 1
+            self.last_send_ms = (finished - started) * 1000
+            self.avg_send_ms += (self.last_send_ms - self.avg_send_ms) / self.sent
+            self.avg_delivery_ms += ((finished - queued_at) * 1000 - self.avg_delivery_ms) / self.sent
+            print(f"✅ Email enviado al soporte: {message['Subject']}")
+        return []
+
+    def _requeue(self, item):
+        message, queued_at, attempts = item
+        if attempts >= self.max_attempts:
+            self.failed += 1
+            print(f"❌ Email descartado tras {attempts} intentos: {message['Subject']}")
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _deliver(self, server, message, reused):
+        try:
+            server.send_message(message)
+        except smtplib.SMTPServerDisconnected as e:
+            if not reused:
+                raise
+            # El servidor cerró la conexión ociosa: una conexión nueva y un único reenvío
+            print(f"🔌 Conexión SMTP cerrada por el servidor ({str(e)}), reconectando")
+            self._disconnect()
+            self._connection().send_message(message)
+
+    def _connection(self):
+        if self._server is None:
+            server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'], timeout=30)
+            try:
+                if self.config.get('use_tls', True):
+                    server.starttls()
+                server.login(self.config['email_user'], self.config['email_password'])
+            except BaseException:
+                # Sin esto el socket queda abierto hasta que lo recoja el GC
+                server.close()
+                raise
+            self._server = server
+            self.connections += 1
+        return self._server
+
+    def _disconnect(self):
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
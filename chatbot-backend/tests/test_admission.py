@@ -0,0 +1,103 @@
+"""
+Pruebas del control de admisión (rate_limiter.py) en los endpoints de chat de app.py
+
+Uso:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import app as chatbot  # noqa: E402
+from rate_limiter import AdmissionController, TokenBucketLimiter  # noqa: E402
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_cost_above_burst_leaves_the_bucket_in_debt(self):
+        bucket = TokenBucketLimiter(rate=1, burst=5)
+        self.assertEqual(bucket.acquire('cliente', cost=8, now=0), 0)
+        # Quedó en -3: hacen falta 4 segundos para volver a tener un token
+        self.assertAlmostEqual(bucket.acquire('cliente', now=0), 4)
+        self.assertAlmostEqual(bucket.acquire('cliente', now=2), 2)
+        self.assertEqual(bucket.acquire('cliente', now=4), 0)
+
+    def test_cost_above_burst_waits_for_a_full_bucket(self):
+        bucket = TokenBucketLimiter(rate=1, burst=5)
+        self.assertEqual(bucket.acquire('cliente', cost=2, now=0), 0)
+        self.assertAlmostEqual(bucket.acquire('cliente', cost=50, now=0), 2)
+
+    def test_rate_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            TokenBucketLimiter(rate=0, burst=1)
+        with self.assertRaises(ValueError):
+            AdmissionController(client_rate=0, client_burst=1)
+
+
+class AdmissionControllerTest(unittest.TestCase):
+
+    def test_rejected_requests_do_not_spend_tokens(self):
+        admission = AdmissionController(client_rate=0.001, client_burst=10, session_rate=0.001,
+                                        session_burst=1, max_concurrent=1)
+        self.assertTrue(admission.admit('cliente', 's1').allowed)
+
+        # La sesión ya no tiene tokens: el cliente no paga por el rechazo
+        self.assertEqual(admission.admit('cliente', 's1').reason, 'session_rate')
+        self.assertAlmostEqual(admission.clients._buckets['cliente'][0], 9, places=2)
+
+        # Sin lugar de concurrencia no pagan ni el cliente ni la sesión
+        self.assertEqual(admission.admit('cliente', 's2', cost=3).reason, 'concurrency')
+        self.assertAlmostEqual(admission.clients._buckets['cliente'][0], 9, places=2)
+        self.assertAlmostEqual(admission.sessions._buckets['s2'][0], 1, places=2)
+
+        admission.release()
+        self.assertTrue(admission.admit('cliente', 's2', cost=3).allowed)
+        self.assertAlmostEqual(admission.clients._buckets['cliente'][0], 6, places=2)
+
+
+class AdmissionEndpointsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.previous = chatbot.admission
+        chatbot.admission = AdmissionController(client_rate=0.001, client_burst=10)
+        self.client = chatbot.app.test_client()
+
+    def tearDown(self):
+        chatbot.admission = self.previous
+
+    def tokens_left(self):
+        return chatbot.admission.clients._buckets['127.0.0.1'][0]
+
+    def test_batch_is_charged_per_message(self):
+        response = self.client.post('/api/chatbot/messages', json={'messages': ['hola', 'staking', '', 'wallet']})
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(self.tokens_left(), 7, places=2)
+
+        # El bucket no alcanza para el siguiente lote
+        response = self.client.post('/api/chatbot/messages', json={'messages': ['hola'] * 8})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response.headers)
+
+    def test_invalid_requests_do_not_spend_tokens(self):
+        for path, body in [('/api/chatbot/message', {'message': '   '}),
+                           ('/api/chatbot/message', None),
+                           ('/api/chatbot/message/stream', {'message': ''}),
+                           ('/api/chatbot/message/stream', {'message': 123}),
+                           ('/api/chatbot/message', {'message': ['hola']}),
+                           ('/api/chatbot/message', {'message': 'hola', 'session_id': ['a']}),
+                           ('/api/chatbot/message/stream', {'message': 'hola', 'session_id': {'a': 1}}),
+                           ('/api/chatbot/messages', {'messages': []}),
+                           ('/api/chatbot/messages', {'messages': ['hola'] * (chatbot.MAX_BATCH_SIZE + 1)})]:
+            with self.subTest(path=path, body=str(body)[:40]):
+                response = self.client.post(path, json=body)
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(chatbot.admission.clients), 0)
+        self.assertEqual(chatbot.admission.decisions['admitted'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
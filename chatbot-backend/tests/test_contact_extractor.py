@@ -0,0 +1,88 @@
+"""
+Pruebas de contact_extractor.py: casos conocidos, equivalencia con la
+implementación anterior y entradas adversarias (sin medir tiempos; eso lo hace
+benchmarks/bench_contact_extraction.py)
+
+Uso:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import os
+import random
+import sys
+import unittest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'benchmarks'))
+
+from bench_contact_extraction import adversarial_inputs, legacy_extract  # noqa: E402
+from contact_extractor import MAX_NAME_LENGTH, ContactExtractor  # noqa: E402
+from corpus import CONTACT_MESSAGES  # noqa: E402
+
+
+def random_message(rng):
+    pieces = ['hola', 'a' * 70, 'Juan Perez ' * 10, 'mi', 'email', 'es', 'usuario:', 'Usuario', 'nombre:', 'username', ':', ' ', '\n',
+              'pepe', 'ana_1', 'Juan Perez', 'a@b.com', 'x.y+z@mail.example.org', '@', '.', 'com',
+              'user@host', '0x' + 'ab' * 20, 'wallet', ',', '/', 'ñandú', 'mi-correo@dominio.es']
+    return ''.join(rng.choice(pieces) + rng.choice(['', ' ', ' ', '\n']) for _ in range(rng.randint(1, 14)))
+
+
+def first(values):
+    return values[0] if values else None
+
+
+class ContactExtractorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = ContactExtractor()
+
+    def extract_first(self, text):
+        info = self.extractor.extract(text)
+        return first(info.emails), first(info.usernames)
+
+    def test_expected_cases(self):
+        cases = [
+            ('usuario: pepe@x.com', ['pepe@x.com'], ['pepe'], []),
+            ('Mi nombre de usuario: juan_1', [], ['juan_1', 'de usuario'], []),
+            ('wallet 0x8ba1f109551bD432803012645Ac136ddd64DBA72.', [], [],
+             ['0x8ba1f109551bD432803012645Ac136ddd64DBA72']),
+            # 41 dígitos hexadecimales no es una dirección
+            ('0x' + 'a' * 41, [], [], []),
+            ('sin datos', [], [], []),
+        ]
+        for text, emails, usernames, wallets in cases:
+            with self.subTest(text=text):
+                info = self.extractor.extract(text)
+                self.assertEqual((info.emails, info.usernames, info.wallets), (emails, usernames, wallets))
+
+    def test_matches_legacy_extraction(self):
+        rng = random.Random(42)
+        messages = list(CONTACT_MESSAGES) + [random_message(rng) for _ in range(20000)]
+        mismatches = [
+            message for message in messages
+            if self.extract_first(message) != legacy_extract(message, bounded=True)
+        ]
+        self.assertEqual(mismatches[:5], [])
+
+    def test_adversarial_inputs_match_legacy_extraction(self):
+        # La implementación anterior es cuadrática: se compara con entradas cortas
+        for name, text in adversarial_inputs(2048).items():
+            with self.subTest(name=name):
+                self.assertEqual(self.extract_first(text), legacy_extract(text, bounded=True))
+
+    def test_long_adversarial_inputs(self):
+        expected = {
+            'usuario_repetido': (None, 'usuario'),
+            'nombre_con_espacios': (None, ('a ' * MAX_NAME_LENGTH)[:MAX_NAME_LENGTH].strip()),
+            'nombre_repetido': (None, 'ab nombre'),
+        }
+        for name, text in adversarial_inputs(256 * 1024).items():
+            with self.subTest(name=name):
+                info = self.extractor.extract(text)
+                self.assertEqual((first(info.emails), first(info.usernames)), expected.get(name, (None, None)))
+                self.assertEqual(info.wallets, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
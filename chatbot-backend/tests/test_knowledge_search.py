@@ -0,0 +1,119 @@
+"""
+Pruebas del ranking de la base de conocimiento (rsc_knowledge.py) y de la confianza que da RSCAI
+
+Uso:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from rsc_ai import RSCAI  # noqa: E402
+from rsc_knowledge import RSCKnowledgeBase  # noqa: E402
+
+
+def entry_key(result):
+    return '/'.join(result[key] for key in ('category', 'topic', 'subtopic') if result.get(key))
+
+
+class KnowledgeRankingTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ai = RSCAI(RSCKnowledgeBase())
+
+    def best(self, message):
+        message_lower, classification = self.ai.classify_message(message)
+        results = self.ai.knowledge.search(message_lower, classification.category)
+        return entry_key(results[0]) if results else None
+
+    def test_issue_reports_rank_troubleshooting_first(self):
+        for message, expected in [
+            ('no puedo iniciar la minería', 'mining/troubleshooting/cannot_start'),
+            ('no recibo recompensas de la minería', 'mining/troubleshooting/no_rewards'),
+            ('tengo un problema, no me deja crear wallet', 'wallet/troubleshooting/cannot_create'),
+            ('error al delegar mis tokens', 'staking/troubleshooting/cannot_delegate'),
+        ]:
+            with self.subTest(message=message):
+                self.assertEqual(self.best(message), expected)
+
+    def test_questions_rank_their_entry_first(self):
+        for message, expected in [
+            ('¿Qué es RSC Chain?', 'general/rsc_chain/description'),
+            ('qué es staking', 'staking/what_is'),
+            ('cuánto dura una sesión de minería?', 'mining/session_duration'),
+            ('como crear una wallet', 'wallet/creation'),
+        ]:
+            with self.subTest(message=message):
+                self.assertEqual(self.best(message), expected)
+
+    def test_issue_reports_are_answered_with_their_guide(self):
+        result = self.ai.process_message('no puedo iniciar la minería')
+        self.assertTrue(result['message'].startswith('Si no puedes iniciar la minería'))
+        self.assertEqual(result['confidence'], 0.9)
+
+        result = self.ai.process_message('no recibo recompensas de la minería')
+        self.assertTrue(result['message'].startswith('Si no recibes recompensas'))
+        self.assertGreaterEqual(result['confidence'], 0.7)
+
+    def test_common_terms_are_not_full_matches(self):
+        for message in ['tokens', 'el token', 'qué es rsc', 'what is rsc']:
+            with self.subTest(message=message):
+                for result in self.ai.knowledge.search(message):
+                    self.assertLess(result['coverage'], 1.0)
+                self.assertLess(self.ai.process_message(message)['confidence'], 0.9)
+
+    def test_unclear_messages_escalate(self):
+        for message in ['qué es rsc', 'what is rsc', 'asdf qwer zxcv tokens',
+                        'la página no carga, tengo un problema', 'me robaron los tokens, qué hago']:
+            with self.subTest(message=message):
+                self.assertTrue(self.ai.process_message(message)['needs_escalation'])
+
+    def test_weak_match_in_category_uses_the_category_answer(self):
+        # "minar" y "funciona" no aparecen juntos en ninguna entrada de minería
+        result = self.ai.process_message('minar no funciona desde ayer')
+        self.assertEqual(result['confidence'], 0.7)
+        self.assertTrue(result['message'].startswith('Sobre minería en RSC Chain'))
+
+
+
+@unittest.skipIf(numpy is None, 'RETRIEVAL_MODE=tfidf requiere NumPy')
+class RetrievalModesTest(unittest.TestCase):
+    """Las mismas consultas en los modos 'bm25' y 'tfidf'"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.modes = {mode: RSCAI(RSCKnowledgeBase(retrieval=mode)) for mode in ('bm25', 'tfidf')}
+
+    def best(self, ai, message):
+        message_lower, classification = ai.classify_message(message)
+        results = ai.knowledge.search(message_lower, classification.category)
+        return entry_key(results[0]) if results else None
+
+    def test_both_modes_rank_alike(self):
+        for message in ['what is rsc chain', '¿Qué es RSC Chain?', 'qué es staking', 'what is p2p',
+                        'no puedo iniciar la minería', 'no recibo recompensas de la minería',
+                        'tengo un problema, no me deja crear wallet', 'error al delegar mis tokens',
+                        'cuánto dura una sesión de minería?', 'como crear una wallet', 'qué es rsc']:
+            with self.subTest(message=message):
+                bm25, tfidf = (self.best(ai, message) for ai in self.modes.values())
+                self.assertEqual(tfidf, bm25)
+
+    def test_both_modes_escalate_unclear_messages(self):
+        for message in ['qué es rsc', 'what is rsc', 'la página no carga, tengo un problema']:
+            with self.subTest(message=message):
+                for mode, ai in self.modes.items():
+                    self.assertTrue(ai.process_message(message)['needs_escalation'], mode)
+
+
+if __name__ == '__main__':
+    unittest.main()
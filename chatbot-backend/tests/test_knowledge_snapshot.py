@@ -0,0 +1,76 @@
+"""
+Pruebas de los snapshots de la base de conocimiento (knowledge_snapshot.py)
+
+Uso:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from knowledge_snapshot import (  # noqa: E402
+    SnapshotWatcher, compile_snapshot, default_knowledge_bases, load_snapshot
+)
+from rsc_ai import RSCAI  # noqa: E402
+from rsc_knowledge import RSCKnowledgeBase  # noqa: E402
+
+
+class KnowledgeSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'knowledge.snapshot')
+        self.contents = default_knowledge_bases()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_every_locale_loads_with_the_same_index(self):
+        compile_snapshot(self.contents, self.path)
+        states = load_snapshot(self.path)['states']
+        self.assertEqual(sorted(states), ['en', 'es'])
+        for locale, query in [('es', 'no puedo iniciar la minería'), ('en', 'how do I start mining')]:
+            with self.subTest(locale=locale):
+                fresh = RSCKnowledgeBase(locale=locale)
+                loaded = RSCKnowledgeBase(state=states[locale], locale=locale)
+                self.assertEqual(loaded.content_hash, fresh.content_hash)
+                self.assertEqual(loaded.search(query), fresh.search(query))
+
+    def test_snapshot_is_plain_json(self):
+        compile_snapshot(self.contents, self.path)
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(sorted(json.load(f)['locales']), ['en', 'es'])
+
+        with open(self.path, 'wb') as f:
+            f.write(b'\x80\x04K\x01.')  # un pickle
+        with self.assertRaises(ValueError):
+            load_snapshot(self.path)
+
+    def test_hot_reload_updates_every_locale(self):
+        compile_snapshot(self.contents, self.path)
+        states = load_snapshot(self.path)['states']
+        ai = RSCAI(RSCKnowledgeBase(state=states['es']), knowledge_states=states)
+        watcher = SnapshotWatcher(self.path, ai.swap_knowledge, interval=60)
+        ai.process_message('how do I start mining?')
+
+        self.contents['es']['mining']['how_to_start'] = 'Nuevo texto sobre cómo empezar a minar.'
+        self.contents['en']['mining']['how_to_start'] = 'New text about how to start mining.'
+        compile_snapshot(self.contents, self.path)
+        os.utime(self.path, ns=(1, 1))  # otro mtime aunque el reemplazo caiga en el mismo instante
+        self.assertTrue(watcher.check())
+
+        self.assertIn('Nuevo texto', ai.process_message('¿cómo empiezo a minar?')['message'])
+        self.assertIn('New text', ai.process_message('how do I start mining?')['message'])
+        self.assertEqual(watcher.stats()['content_hashes'], {
+            locale: state.content_hash for locale, state in load_snapshot(self.path)['states'].items()
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
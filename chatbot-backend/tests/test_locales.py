@@ -0,0 +1,140 @@
+"""
+Pruebas de la carga de idiomas (locales/__init__.py y RSCAI.preload_locales) y del paquete en español
+
+Uso:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import gc
+import os
+import sys
+import time
+import unittest
+import weakref
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from language_detector import LanguageDetector  # noqa: E402
+from locales import LocaleCache, load_pack  # noqa: E402
+from rsc_ai import RSCAI  # noqa: E402
+from rsc_knowledge import RSCKnowledgeBase  # noqa: E402
+
+
+# Mensajes de ejemplo por idioma; los que no traen pistas ("staking?") quedan sin decidir
+SAMPLES = {
+    'es': [
+        'hola', '¿cómo empiezo a minar?', 'no puedo iniciar la minería', 'mi wallet muestra un balance incorrecto',
+        'cómo hago staking', 'qué es rsc chain', 'tengo un problema con mi cartera', 'no recibo mis recompensas',
+        'buenas tardes, necesito ayuda', 'dónde veo mis transacciones', 'el explorador no carga',
+        '¿cuánto tarda una sesión de minería?'
+    ],
+    'en': [
+        'hello', 'how do I start mining?', "I can't create a wallet", 'my wallet balance is wrong',
+        'how do I stake my tokens', 'what is rsc chain', 'I have a problem with my wallet',
+        "I'm not receiving rewards", 'good morning, I need help', 'where can I see my transactions',
+        'the explorer is not loading', 'how long does a mining session take?'
+    ],
+    None: ['staking?', 'wallet', 'p2p', '0x' + 'ab' * 20, '???']
+}
+
+
+class LanguageDetectorTest(unittest.TestCase):
+
+    def test_detects_the_sample_messages(self):
+        detector = LanguageDetector()
+        for expected, messages in SAMPLES.items():
+            for message in messages:
+                with self.subTest(message=message):
+                    self.assertEqual(detector.detect(message.lower()), expected)
+
+
+class LocaleCacheTest(unittest.TestCase):
+
+    def test_pinned_locales_are_not_evicted(self):
+        cache = LocaleCache(lambda code: object(), idle_seconds=60, pinned=('es',))
+        cache.get('es')
+        cache.get('en')
+        cache.get('fr')
+        cache.evict_idle(now=10 ** 9)
+        self.assertEqual(cache.loaded(), ['es'])
+        self.assertEqual(cache.loads, 3)
+
+    def test_preloaded_locales_are_evicted_when_unused(self):
+        ai = RSCAI(RSCKnowledgeBase(), locale_idle_seconds=60)
+        self.assertEqual(ai.locales.loaded(), ['es'])
+        self.assertEqual(sorted(ai.preload_locales()), ['en', 'es'])
+
+        ai.locales.evict_idle(now=10 ** 9)
+        self.assertEqual(ai.locales.loaded(), ['es'])
+        loads = ai.locales.loads
+        result = ai.process_message('how do I start mining?')
+        self.assertTrue(result['message'].startswith('To start mining'))
+        self.assertEqual(ai.locales.loads, loads + 1)
+
+    def test_unused_locale_is_released(self):
+        ai = RSCAI(RSCKnowledgeBase(), locale_idle_seconds=0.2)
+        self.assertEqual(ai.locales.loaded(), ['es'])
+
+        result = ai.process_message('how do I start mining?')
+        self.assertTrue(result['message'].startswith('To start mining'))
+        self.assertEqual(sorted(ai.locales.loaded()), ['en', 'es'])
+        english = weakref.ref(ai.locales.models()['en'])
+
+        # Sin mensajes en inglés durante idle_seconds: el modelo se libera con el próximo mensaje
+        time.sleep(0.3)
+        ai.process_message('hola')
+        self.assertEqual(ai.locales.loaded(), ['es'])
+        self.assertEqual(ai.locales.evictions, 1)
+        gc.collect()
+        self.assertIsNone(english())
+
+    def test_locale_loaded(self):
+        ai = RSCAI(RSCKnowledgeBase())
+        self.assertTrue(ai.locale_loaded('¿cómo empiezo a minar?'))
+        self.assertFalse(ai.locale_loaded('how do I start mining?'))
+        # Sin pistas de idioma podría seguir el inglés de la conversación
+        self.assertFalse(ai.locale_loaded('staking?'))
+
+        ai.process_message('how do I start mining?')
+        self.assertTrue(ai.locale_loaded('how do I start mining?'))
+        self.assertTrue(ai.locale_loaded('staking?'))
+
+
+# Palabras clave de RSCAI._detect_intent y RSCAI._detect_category antes de los paquetes de idioma
+BASELINE_INTENT_KEYWORDS = {
+    'greeting': ['hola', 'hi', 'hello', 'buenos días', 'buenas tardes', 'buenas noches', 'saludos', 'hey'],
+    'help': ['cómo', 'como', 'how', 'ayuda', 'help', 'problema', 'error', 'no funciona', 'no puedo'],
+    'information': ['qué', 'que', 'what', 'quien', 'who', 'cuándo', 'when', 'dónde', 'where', 'por qué', 'why',
+                    'explica', 'explicar'],
+    'technical_issue': ['error', 'fallo', 'bug', 'roto', 'no funciona', 'no carga', 'no puedo', 'problema',
+                        'tengo un problema']
+}
+BASELINE_CATEGORY_KEYWORDS = {
+    'mining': ['minar', 'minería', 'mining', 'minero', 'sesión', 'recompensa'],
+    'wallet': ['wallet', 'cartera', 'balance', 'dirección', 'address', 'clave', 'private key'],
+    'staking': ['staking', 'stake', 'delegar', 'delegación', 'validador', 'pool'],
+    'p2p': ['p2p', 'trading', 'intercambio', 'anuncio', 'trade', 'compra', 'venta'],
+    'explorer': ['explorer', 'explorador', 'bloque', 'block', 'transacción', 'transaction'],
+    'technical': ['consenso', 'consensus', 'seguridad', 'security', 'api', 'blockchain', 'red']
+}
+
+
+class SpanishPackTest(unittest.TestCase):
+
+    def test_keywords_match_the_baseline(self):
+        pack = load_pack('es')
+        self.assertEqual(pack.INTENT_KEYWORDS, BASELINE_INTENT_KEYWORDS)
+        self.assertEqual(pack.CATEGORY_KEYWORDS, BASELINE_CATEGORY_KEYWORDS)
+
+    def test_english_terms_keep_their_category(self):
+        ai = RSCAI(RSCKnowledgeBase())
+        for message, category in [('mi private key', 'wallet'), ('busco mi address', 'wallet'),
+                                  ('el block 100', 'explorer'), ('la transaction no aparece', 'explorer'),
+                                  ('el consensus de la red', 'technical')]:
+            with self.subTest(message=message):
+                self.assertEqual(ai.classify_message(message)[1].category, category)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Pruebas de las métricas (metrics.py) y de warm_up() de app.py
+
+Uso:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import app as chatbot  # noqa: E402
+import rsc_ai  # noqa: E402
+from metrics import Counter, Histogram, MetricsRegistry  # noqa: E402
+
+
+class MetricsResetTest(unittest.TestCase):
+
+    def test_reset_keeps_the_series(self):
+        registry = MetricsRegistry()
+        responses = Counter('responses_total', 'Respuestas', label='source', registry=registry)
+        stages = Histogram('stage_seconds', 'Etapas', label='stage', buckets=(0.1, 1.0), registry=registry)
+        classify = stages.labels('classify')
+        responses.inc(label_value='cache')
+        classify.observe(0.5)
+
+        registry.reset()
+        self.assertEqual(responses.value('cache'), 0)
+        self.assertIn('responses_total{source="cache"} 0', registry.render())
+        self.assertIn('stage_seconds_count{stage="classify"} 0', registry.render())
+
+        # La serie guardada en una variable sigue siendo la que se exporta
+        classify.observe(0.05)
+        self.assertIn('stage_seconds_bucket{stage="classify",le="0.1"} 1', registry.render())
+
+
+class WarmUpMetricsTest(unittest.TestCase):
+
+    def test_warm_up_is_not_counted(self):
+        chatbot.warm_up()
+        self.assertEqual(rsc_ai.RESPONSES_TOTAL.value('generated'), 0)
+        self.assertEqual(rsc_ai.RESPONSES_TOTAL.value('cache'), 0)
+        self.assertEqual(rsc_ai.LOCALE_TOTAL.value('es'), 0)
+        self.assertEqual(rsc_ai.CLASSIFY_SECONDS.count, 0)
+        self.assertEqual(chatbot.ai_system.response_cache.stats()['hits'], 0)
+        # Las respuestas calentadas siguen en la caché
+        self.assertGreater(len(chatbot.ai_system.response_cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Pruebas del corrector de errores de escritura (fuzzy_index.py) tal como lo usa RSCAI
+
+Uso:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from fuzzy_index import is_inflection  # noqa: E402
+from rsc_ai import RSCAI  # noqa: E402
+from rsc_knowledge import RSCKnowledgeBase  # noqa: E402
+
+
+class SpellingTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ai = RSCAI(RSCKnowledgeBase())
+        cls.model = cls.ai._default_model
+
+    def test_valid_words_are_not_rewritten(self):
+        for word in ['bloquea', 'rojo', 'cuánto', 'cuanto', 'perro', 'casa', 'sale', 'sola',
+                     'contraseña', 'comió', 'está']:
+            with self.subTest(word=word):
+                self.assertEqual(self.model.correct(word), word)
+
+    def test_typos_are_corrected(self):
+        for typo, expected in [('walet', 'wallet'), ('funsiona', 'funciona'), ('stakin', 'staking'),
+                               ('recompenzas', 'recompensas'), ('mineria', 'minería')]:
+            with self.subTest(typo=typo):
+                self.assertEqual(self.model.correct(typo), expected)
+
+    def test_valid_messages_are_not_changed(self):
+        message, classification = self.ai.classify_message('el botón está rojo y mi perro se comió la casa')
+        self.assertEqual(message, 'el botón está rojo y mi perro se comió la casa')
+        self.assertNotIn('technical_issue', classification.intents)
+
+    def test_each_unknown_word_is_corrected(self):
+        # Aunque el resto del mensaje ya tenga palabras clave ("minar", "como", "no")
+        for text, expected, category in [
+            ('minar no funsiona', 'minar no funciona', 'mining'),
+            ('como creo una walet', 'como creo una wallet', 'wallet'),
+            ('mi walet no funsiona', 'mi wallet no funciona', 'wallet'),
+            ('walet', 'wallet', 'wallet'),
+            ('cuanto dura una sesion de mineria', 'cuanto dura una sesión de minería', 'mining'),
+        ]:
+            with self.subTest(text=text):
+                message, classification = self.ai.classify_message(text)
+                self.assertEqual(message, expected)
+                self.assertEqual(classification.category, category)
+
+    def test_corrected_messages_are_answered(self):
+        for text in ['minar no funsiona', 'como creo una walet', 'walet']:
+            with self.subTest(text=text):
+                self.assertFalse(self.ai.process_message(text)['needs_escalation'])
+
+    def test_accents_are_always_restored(self):
+        message, classification = self.ai.classify_message('la mineria no arranca')
+        self.assertEqual(message, 'la minería no arranca')
+        self.assertEqual(classification.category, 'mining')
+
+    def test_inflections(self):
+        self.assertTrue(is_inflection('bloquea', 'bloque'))
+        self.assertTrue(is_inflection('bloquea', 'bloques'))
+        self.assertTrue(is_inflection('sola', 'solo'))
+        self.assertFalse(is_inflection('walet', 'wallet'))
+        self.assertFalse(is_inflection('stakin', 'staking'))
+
+
+if __name__ == '__main__':
+    unittest.main()
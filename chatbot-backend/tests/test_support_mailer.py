@@ -0,0 +1,206 @@
+"""
+Pruebas de support_mailer.py contra el servidor SMTP falso (tools/fake_smtp.py)
+
+Uso:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import os
+import socket
+import sys
+import threading
+import smtplib
+import time
+import unittest
+from email.message import EmailMessage
+from unittest import mock
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from support_mailer import SupportMailer  # noqa: E402
+from tools.fake_smtp import FakeSMTPServer  # noqa: E402
+
+
+def make_message(subject, to='soporte@local'):
+    message = EmailMessage()
+    message['Subject'] = subject
+    message['From'] = 'bot@local'
+    message['To'] = to
+    message.set_content('Ticket de prueba')
+    return message
+
+
+def make_config(port):
+    return {
+        'smtp_server': '127.0.0.1',
+        'smtp_port': port,
+        'use_tls': False,
+        'email_user': 'bot@local',
+        'email_password': 'x'
+    }
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def closed_port():
+    """Puerto local en el que nadie escucha: conectar falla enseguida"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class HangUpServer:
+    """Acepta conexiones TCP y las cierra sin saludar, anotando cuándo llegó cada una"""
+
+    def __init__(self):
+        self.accepted_at = []
+        self._sock = socket.socket()
+        self._sock.bind(('127.0.0.1', 0))
+        self._sock.listen()
+        self.port = self._sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.accepted_at.append(time.monotonic())
+            conn.close()
+
+    def close(self):
+        self._sock.close()
+
+
+class SupportMailerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeSMTPServer(refuse={'nadie@local'})
+        self.port = self.server.start()
+        self.mailer = None
+
+    def tearDown(self):
+        if self.mailer is not None:
+            self.mailer.stop(timeout=2)
+        self.server.stop()
+
+    def start_mailer(self, port=None, **options):
+        options.setdefault('min_backoff', 0.01)
+        options.setdefault('max_backoff', 0.05)
+        self.mailer = SupportMailer(make_config(port or self.port), **options)
+        return self.mailer
+
+    def test_batches_tickets_over_one_connection(self):
+        mailer = self.start_mailer()
+        for number in range(5):
+            self.assertTrue(mailer.enqueue(make_message(f'Ticket {number}')))
+
+        self.assertTrue(wait_for(lambda: mailer.sent == 5))
+        self.assertEqual(len(self.server.messages), 5)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(mailer.connections, 1)
+        self.assertLessEqual(mailer.batches, 5)
+        self.assertEqual(mailer.failed, 0)
+
+    def test_send_batch_reuses_the_connection(self):
+        mailer = self.start_mailer()
+        batch = [(make_message(f'Ticket {number}'), time.monotonic(), 0) for number in range(3)]
+
+        self.assertEqual(mailer._send_batch(batch), [])
+        self.assertEqual(mailer.sent, 3)
+        self.assertEqual(mailer.batches, 1)
+        self.assertEqual(self.server.connections, 1)
+        mailer._disconnect()
+
+    def test_reconnects_after_the_server_drops_the_connection(self):
+        # Con un backoff de 30 s, esperar lo haría fallar por tiempo
+        mailer = self.start_mailer(min_backoff=30, max_backoff=30)
+        mailer.enqueue(make_message('Antes del corte'))
+        self.assertTrue(wait_for(lambda: mailer.sent == 1))
+
+        self.server.drop_connections()
+        mailer.enqueue(make_message('Tras el corte'))
+
+        self.assertTrue(wait_for(lambda: mailer.sent == 2, timeout=5))
+        self.assertEqual(mailer.failed, 0)
+        self.assertEqual(mailer.retries, 0)
+        self.assertEqual(mailer.connections, 2)
+        self.assertEqual(self.server.connections, 2)
+        self.assertIn('Subject: Tras el corte', self.server.messages[-1]['data'])
+
+    def test_refused_recipient_keeps_the_connection(self):
+        mailer = self.start_mailer()
+        mailer.enqueue(make_message('Rechazado', to='nadie@local'))
+        mailer.enqueue(make_message('Aceptado'))
+
+        self.assertTrue(wait_for(lambda: mailer.sent == 1 and mailer.failed == 1))
+        self.assertEqual(mailer.retries, 0)
+        self.assertEqual(mailer.connections, 1)
+        self.assertEqual(self.server.connections, 1)
+        self.assertTrue(mailer.stats()['connected'])
+
+    def test_failed_login_closes_the_connection(self):
+        mailer = self.start_mailer()
+        error = smtplib.SMTPAuthenticationError(535, b'credenciales incorrectas')
+        with mock.patch.object(smtplib.SMTP, 'login', side_effect=error), \
+                mock.patch.object(smtplib.SMTP, 'close', autospec=True, side_effect=smtplib.SMTP.close) as close:
+            with self.assertRaises(smtplib.SMTPAuthenticationError):
+                mailer._connection()
+        self.assertEqual(close.call_count, 1)
+        self.assertIsNone(close.call_args[0][0].sock)
+        self.assertIsNone(mailer._server)
+
+    def test_backoff_doubles_up_to_max_backoff(self):
+        hang_up = HangUpServer()
+        self.addCleanup(hang_up.close)
+        mailer = self.start_mailer(hang_up.port, min_backoff=0.05, max_backoff=0.2, max_attempts=5)
+        mailer.enqueue(make_message('Servidor roto'))
+
+        self.assertTrue(wait_for(lambda: mailer.failed == 1))
+        self.assertEqual(len(hang_up.accepted_at), 5)
+        gaps = [later - earlier for earlier, later in zip(hang_up.accepted_at, hang_up.accepted_at[1:])]
+        # Solo cotas inferiores: la espera real puede alargarse en una máquina cargada
+        for gap, expected in zip(gaps, [0.05, 0.1, 0.2, 0.2]):
+            self.assertGreaterEqual(gap, expected * 0.9)
+
+    def test_gives_up_after_max_attempts_when_the_server_is_down(self):
+        mailer = self.start_mailer(closed_port(), max_attempts=3)
+        mailer.enqueue(make_message('Sin servidor 1'))
+        mailer.enqueue(make_message('Sin servidor 2'))
+
+        self.assertTrue(wait_for(lambda: mailer.failed == 2))
+        self.assertEqual(mailer.sent, 0)
+        self.assertEqual(mailer.connections, 0)
+        self.assertEqual(mailer.stats()['queue_depth'], 0)
+        # Ninguno vuelve a intentarse después de descartarse
+        retries = mailer.retries
+        time.sleep(0.2)
+        self.assertEqual(mailer.retries, retries)
+
+    def test_gives_up_after_max_attempts_when_sends_keep_failing(self):
+        mailer = self.start_mailer(max_attempts=2)
+
+        class Broken:
+            def send_message(self, message):
+                raise ConnectionResetError('conexión reiniciada')
+
+        mailer._connection = Broken
+        mailer.enqueue(make_message('Siempre falla'))
+
+        self.assertTrue(wait_for(lambda: mailer.failed == 1))
+        self.assertEqual(mailer.retries, 2)
+        self.assertEqual(mailer.sent, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
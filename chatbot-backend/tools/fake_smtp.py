@@ -0,0 +1,165 @@
+"""
+Servidor SMTP falso para desarrollo y pruebas
+Acepta cualquier login, guarda los mensajes en memoria y no usa TLS
+
+Uso:
+    python tools/fake_smtp.py --port 8025
+    SMTP_SERVER=localhost SMTP_PORT=8025 SMTP_USE_TLS=false python app.py
+"""
+import argparse
+import asyncio
+import threading
+
+
+class FakeSMTPServer:
+    """Servidor SMTP mínimo (EHLO, AUTH, MAIL, RCPT, DATA) sobre asyncio"""
+
+    def __init__(self, host='127.0.0.1', port=0, delay=0.0, verbose=False, refuse=()):
+        self.host = host
+        self.port = port
+        self.delay = delay  # segundos de espera por comando para simular un servidor lento
+        self.verbose = verbose
+        self.refuse = set(refuse)  # destinatarios rechazados en RCPT con un 550
+        self.messages = []
+        self.connections = 0
+        self._writers = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """Arranca el servidor en un hilo propio y devuelve el puerto usado"""
+        self._thread = threading.Thread(target=self._serve, name='fake-smtp', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self.port
+
+    def stop(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(5)
+
+    def drop_connections(self):
+        """Cierra las conexiones abiertas sin QUIT, como un servidor que se cae o corta por inactividad"""
+        async def drop():
+            for writer in list(self._writers):
+                writer.close()
+
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(drop(), self._loop).result(5)
+
+    async def _shutdown(self):
+        # Cerrar el socket de escucha y las conexiones abiertas antes de parar el loop
+        self._server.close()
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop.close()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+
+        async def reply(line):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            writer.write((line + '\r\n').encode())
+            await writer.drain()
+
+        await reply('220 fake-smtp listo')
+        envelope = {'from': None, 'to': []}
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+                command = line.split(' ', 1)[0].upper()
+
+                if command == 'EHLO':
+                    writer.write(b'250-fake-smtp\r\n250-AUTH PLAIN LOGIN\r\n')
+                    await reply('250 8BITMIME')
+                elif command == 'HELO':
+                    await reply('250 fake-smtp')
+                elif command == 'AUTH':
+                    parts = line.split()
+                    if len(parts) > 1 and parts[1].upper() == 'LOGIN':
+                        await reply('334 VXNlcm5hbWU6')
+                        await reader.readline()
+                        await reply('334 UGFzc3dvcmQ6')
+                        await reader.readline()
+                    elif len(parts) == 2:
+                        await reply('334 ')
+                        await reader.readline()
+                    await reply('235 Autenticado')
+                elif command == 'MAIL':
+                    envelope = {'from': line.split(':', 1)[1].strip(), 'to': []}
+                    await reply('250 OK')
+                elif command == 'RCPT':
+                    recipient = line.split(':', 1)[1].strip()
+                    if recipient.strip('<>') in self.refuse:
+                        await reply('550 Destinatario rechazado')
+                        continue
+                    envelope['to'].append(recipient)
+                    await reply('250 OK')
+                elif command == 'DATA':
+                    await reply('354 Terminar con <CRLF>.<CRLF>')
+                    data = []
+                    while True:
+                        chunk = await reader.readline()
+                        if not chunk or chunk in (b'.\r\n', b'.\n'):
+                            break
+                        data.append(chunk)
+                    self.messages.append({
+                        'from': envelope['from'],
+                        'to': envelope['to'],
+                        'data': b''.join(data).decode('utf-8', 'replace')
+                    })
+                    if self.verbose:
+                        print(f"📩 Mensaje recibido de {envelope['from']} para {', '.join(envelope['to'])}")
+                    await reply('250 Mensaje aceptado')
+                elif command in ('RSET', 'NOOP'):
+                    await reply('250 OK')
+                elif command == 'QUIT':
+                    await reply('221 Adiós')
+                    break
+                else:
+                    await reply('502 Comando no implementado')
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Servidor SMTP falso para desarrollo')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8025)
+    parser.add_argument('--delay', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeSMTPServer(args.host, args.port, args.delay, verbose=True)
+    server.start()
+    print(f"📬 Servidor SMTP falso escuchando en {args.host}:{server.port} (Ctrl+C para salir)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
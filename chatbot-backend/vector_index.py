@@ -0,0 +1,153 @@
+"""
+Búsqueda por similitud TF-IDF sobre la base de conocimiento
+Cada entrada (texto, elemento de lista o guía de troubleshooting) es una fila
+normalizada de una matriz dispersa; una consulta se puntúa con un único
+producto matriz-vector y las mejores filas se eligen con argpartition.
+Las filas llevan los mismos términos que el índice BM25 (texto y claves de
+la entrada) y la consulta los mismos términos de refuerzo, así los dos modos
+ordenan igual las preguntas de definición y los reportes de problemas
+"""
+import math
+from collections import Counter, defaultdict
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        'La búsqueda TF-IDF (RETRIEVAL_MODE=tfidf) requiere NumPy: pip install -r requirements-tfidf.txt'
+    ) from e
+
+from rsc_knowledge import key_terms, tokenize
+
+
+class TfidfIndex:
+    """
+    Matriz TF-IDF guardada por columnas (formato CSC)
+
+    Para el término t, las filas que lo contienen son
+    row_ids[col_start[t]:col_start[t + 1]] con pesos weights[...]. Las filas
+    tienen norma 1, así que el producto con la consulta normalizada es la
+    similitud coseno (entre 0 y 1). La cobertura mínima se mide con el idf de
+    index (el KnowledgeIndex de las mismas entradas), igual que en BM25.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        entries = self.entries = index.entries
+        self.size = len(entries)
+
+        rows = [Counter(tokenize(entry['content']) + key_terms(entry)) for entry in entries]
+        document_frequency = defaultdict(int)
+        for terms in rows:
+            for term in terms:
+                document_frequency[term] += 1
+        self.columns = {term: column for column, term in enumerate(sorted(document_frequency))}
+        # Por columna: idf TF-IDF e idf BM25 de index (para la cobertura)
+        terms_by_column = sorted(self.columns, key=self.columns.get)
+        self.idf = [math.log((1 + self.size) / (1 + document_frequency[term])) + 1 for term in terms_by_column]
+        self.coverage_idf = [index.idf[term] for term in terms_by_column]
+
+        # Pesos por fila: tf sublineal por idf, normalizados a norma 1
+        cells = defaultdict(list)  # columna -> [(fila, peso)]
+        for row, terms in enumerate(rows):
+            weighted = {
+                self.columns[term]: (1 + math.log(count)) * self.idf[self.columns[term]]
+                for term, count in terms.items()
+            }
+            norm = math.sqrt(sum(weight * weight for weight in weighted.values())) or 1.0
+            for column, weight in weighted.items():
+                cells[column].append((row, weight / norm))
+
+        col_start = [0]
+        row_ids = []
+        weights = []
+        for column in range(len(self.columns)):
+            for row, weight in cells[column]:
+                row_ids.append(row)
+                weights.append(weight)
+            col_start.append(len(row_ids))
+        self.col_start = col_start
+        self.row_ids = np.array(row_ids, dtype=np.int64)
+        self.weights = np.array(weights, dtype=np.float64)
+
+        category_rows = defaultdict(list)
+        for row, entry in enumerate(entries):
+            category_rows[entry['category']].append(row)
+        self.category_rows = {
+            category: np.array(row_list, dtype=np.int64) for category, row_list in category_rows.items()
+        }
+
+    def scores(self, query_terms, boost_terms=()):
+        """
+        Similitud coseno de la consulta con cada fila e idf (de index) de los
+        términos de la consulta que contiene cada fila
+
+        boost_terms ('what_is', 'troubleshooting') entran en la consulta pero no
+        suman al idf de los términos contenidos.
+
+        Returns:
+            tuple: (similitudes, idf contenido), vectores de tamaño size, o None
+        """
+        counts = Counter(term for term in query_terms if term in self.columns)
+        if not counts:
+            return None
+        boost = [term for term in dict.fromkeys(boost_terms) if term in self.columns and term not in counts]
+
+        # La consulta tiene pocos términos: sus pesos y sus columnas se juntan en Python
+        # y el producto disperso queda en dos bincount sobre las filas de esas columnas
+        query = []
+        matched_idf = []
+        lengths = []
+        row_slices = []
+        weight_slices = []
+        for term in list(counts) + boost:
+            column = self.columns[term]
+            start, end = self.col_start[column], self.col_start[column + 1]
+            query.append((1 + math.log(counts.get(term, 1))) * self.idf[column])
+            matched_idf.append(self.coverage_idf[column] if term in counts else 0.0)
+            lengths.append(end - start)
+            row_slices.append(self.row_ids[start:end])
+            weight_slices.append(self.weights[start:end])
+        norm = math.sqrt(sum(weight * weight for weight in query))
+
+        row_ids = np.concatenate(row_slices)
+        contributions = np.concatenate(weight_slices) * np.repeat(np.array(query) / norm, lengths)
+        scores = np.bincount(row_ids, weights=contributions, minlength=self.size)
+        matched = np.bincount(row_ids, weights=np.repeat(matched_idf, lengths), minlength=self.size)
+        return scores, matched
+
+    def top(self, query_terms, category=None, limit=5, min_similarity=0.0, min_coverage=0.0, boost_terms=()):
+        """
+        Devuelve las mejores entradas ordenadas por similitud
+
+        Como en KnowledgeIndex.top, una entrada solo cuenta si contiene al menos
+        min_coverage de la información de la consulta y boost_terms no cuentan
+        para la cobertura: una entrada que solo tiene esos términos no aparece.
+
+        Returns:
+            list: [(similitud, cobertura, entry_id)]
+        """
+        scored = self.scores(query_terms, boost_terms)
+        if scored is None:
+            return []
+        scores, matched = scored
+        coverage = matched / self.index.query_weight(frozenset(query_terms), category)
+        scores[coverage < min_coverage if min_coverage > 0 else matched <= 0] = 0.0
+        rows = self.category_rows.get(category) if category else None
+        if rows is not None:
+            scores = scores[rows]
+            coverage = coverage[rows]
+        if limit < len(scores):
+            candidates = np.argpartition(-scores, limit)[:limit]
+        else:
+            candidates = np.arange(len(scores))
+        candidates = np.sort(candidates)
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        results = []
+        for position in candidates:
+            similarity = float(scores[position])
+            if similarity < min_similarity or similarity <= 0.0:
+                break
+            entry_id = int(rows[position]) if rows is not None else int(position)
+            results.append((similarity, min(1.0, float(coverage[position])), entry_id))
+        return results